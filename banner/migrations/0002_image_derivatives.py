@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banner', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='banner',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
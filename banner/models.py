@@ -1,7 +1,10 @@
 from django.db import models
+from media_assets.storage import get_blob_storage
 
 class Banner(models.Model):
-    image = models.ImageField(upload_to="banners/", blank=False, null=False)
+    image = models.ImageField(upload_to="banners/", storage=get_blob_storage, blank=False, null=False)
+    # Resized WebP/JPEG copies of `image`, maintained by media_assets.
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     url = models.CharField(max_length=2083)
     label = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
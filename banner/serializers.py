@@ -1,15 +1,18 @@
 from rest_framework import serializers
+from media_assets.serializers import ImageSrcsetField
 from .models import Banner
 
 
 class BannerSerializer(serializers.ModelSerializer):
     image = serializers.ImageField(use_url=True)
+    image_srcset = ImageSrcsetField(source="image_derivatives")
 
     class Meta:
         model = Banner
         fields = (
             "id",
             "image",
+            "image_srcset",
             "url",
             "label",
             "is_active",
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brand', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brand',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:05
+
+import media_assets.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brand', '0002_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='brand',
+            name='brand_img',
+            field=models.ImageField(blank=True, null=True, storage=media_assets.storage.get_blob_storage, upload_to='brands/'),
+        ),
+    ]
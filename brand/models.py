@@ -1,4 +1,5 @@
 from django.db import models
+from media_assets.storage import get_blob_storage
 
 class Brand(models.Model):
     """Product brands"""
@@ -6,7 +7,9 @@ class Brand(models.Model):
     name = models.CharField(max_length=255, db_index=True)
     slug = models.SlugField(max_length=255, unique=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
-    brand_img= models.ImageField(upload_to='brands/', null=True, blank=True)
+    brand_img= models.ImageField(upload_to='brands/', storage=get_blob_storage, null=True, blank=True)
+    # Resized WebP/JPEG copies of `brand_img`, maintained by media_assets.
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     def __str__(self):
         return self.name
\ No newline at end of file
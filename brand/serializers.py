@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from media_assets.serializers import ImageSrcsetField
 from .models import Brand
 
 class BrandSerializer(serializers.ModelSerializer):
+    brand_img_srcset = ImageSrcsetField(source="image_derivatives")
+
     class Meta:
         model = Brand
         fields = [
@@ -9,7 +12,8 @@ class BrandSerializer(serializers.ModelSerializer):
             "name",
             "slug",
             "created_at",
-            "brand_img"
+            "brand_img",
+            "brand_img_srcset",
         ]
         read_only_fields = ["created_at"]  # created_at is set automatically
 
@@ -0,0 +1,13 @@
+"""
+Signal handlers that invalidate cached brand responses.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.caching import bump_version
+from .models import Brand
+
+
+@receiver([post_save, post_delete], sender=Brand)
+def invalidate_brand_cache(sender, **kwargs):
+    bump_version("brands")
@@ -1,10 +1,12 @@
 from rest_framework import generics, permissions
+from config.caching import VersionedCacheMixin
 from .models import Brand
 from .serializers import BrandSerializer
 
 
-# Anyone can view the list of brands
-class BrandListView(generics.ListAPIView):
+# Anyone can view the list of brands (cached until a brand changes)
+class BrandListView(VersionedCacheMixin, generics.ListAPIView):
+    cache_namespace = "brands"
     queryset = Brand.objects.all().order_by('-id')
     serializer_class = BrandSerializer
     permission_classes = [permissions.AllowAny]
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.db import models
 from user.models import User
 from product.models import Product
@@ -14,6 +16,11 @@ class Cart(models.Model):
         # Show cart owner for admin/debug
         return f"Cart - {self.user.email if self.user else 'Guest'}"
 
+    @property
+    def subtotal(self):
+        # Sums the items already loaded (prefetched by CartView) rather than querying
+        return sum((item.line_total for item in self.items.all()), Decimal("0.00"))
+
 
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="items", null=True, blank=True)
@@ -30,3 +37,8 @@ class CartItem(models.Model):
     class Meta:
         unique_together = ["cart", "product"]
 
+    @property
+    def line_total(self):
+        if self.product is None:
+            return Decimal("0.00")
+        return self.product.price * self.quantity
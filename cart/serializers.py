@@ -1,17 +1,33 @@
 from rest_framework import serializers
 from .models import Cart, CartItem
-from product.serializers import ProductSerializer
+from product.serializers import ProductCardSerializer
 
 
 
+class CartProductSerializer(ProductCardSerializer):
+    """
+    Product snapshot for a cart line: what the cart renders and checks (price,
+    primary image, stock), without the card's category, brand and ratings.
+    Expects products from `Product.objects.with_primary_image()`.
+    """
+    category_name = None
+    brand_name = None
+
+    class Meta(ProductCardSerializer.Meta):
+        fields = ['id', 'name', 'slug', 'price', 'old_price', 'primary_image', 'primary_image_srcset', 'stock']
+        read_only_fields = fields
+
+
 class CartItemSerializer(serializers.ModelSerializer):
-    # product is for display, product_id is for input
-    product = ProductSerializer(read_only=True)
+    # product is for display (a snapshot from Product.objects.with_primary_image()), product_id is for input
+    product = CartProductSerializer(read_only=True)
     product_id = serializers.PrimaryKeyRelatedField(
         queryset=CartItem._meta.get_field('product').related_model.objects.all(),
         source='product',
         write_only=True
     )
+    # price * quantity, computed from the loaded product
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
 
     class Meta:
         model = CartItem
@@ -20,12 +36,14 @@ class CartItemSerializer(serializers.ModelSerializer):
             "product",
             "product_id",
             "quantity",
+            "line_total",
         ]
 
 
 class CartSerializer(serializers.ModelSerializer):
     # items is a list of CartItemSerializer objects
     items = CartItemSerializer(many=True, read_only=True)
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
 
     class Meta:
         model = Cart
@@ -34,6 +52,7 @@ class CartSerializer(serializers.ModelSerializer):
             "user",
             "created_at",
             "items",
+            "subtotal",
         ]
         read_only_fields = ["id", "created_at"]
 
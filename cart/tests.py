@@ -1,3 +1,66 @@
+"""
+Tests for the cart app.
+"""
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from brand.models import Brand
+from cart.models import Cart, CartItem
+from category.models import Category
+from product.models import Product, ProductImage
+from user.models import User
+
+
+class CartViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(phone_number="+8801712345678", password="pass")
+        self.client.force_authenticate(self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        self.category = Category.objects.create(name="Shirts", slug="shirts")
+        self.brand = Brand.objects.create(name="Acme", slug="acme")
+
+    def add_items(self, count, start=0):
+        for idx in range(start, start + count):
+            product = Product.objects.create(
+                name=f"Shirt {idx}", slug=f"shirt-{idx}", category=self.category, brand=self.brand,
+                description="Cotton", sku=f"SKU{idx}", price=Decimal("10.50") + idx, stock=idx,
+            )
+            ProductImage.objects.create(product=product, image=f"products/{idx}-back.jpg", order=1)
+            ProductImage.objects.create(product=product, image=f"products/{idx}-front.jpg", is_primary=True)
+            CartItem.objects.create(cart=self.cart, product=product, quantity=2)
+
+    def test_items_embed_product_snapshot_and_totals(self):
+        self.add_items(2)
+        cart = self.client.get("/cart/").data["results"][0]
+        first = cart["items"][0]
+        self.assertEqual(
+            set(first["product"]),
+            {"id", "name", "slug", "price", "old_price", "primary_image", "primary_image_srcset", "stock"},
+        )
+        self.assertTrue(first["product"]["primary_image"].endswith("/media/products/0-front.jpg"))
+        self.assertEqual(first["line_total"], "21.00")
+        self.assertEqual(cart["items"][1]["line_total"], "23.00")
+        self.assertEqual(cart["subtotal"], "44.00")
+
+    def test_query_count_does_not_grow_with_items(self):
+        self.add_items(2)
+        # Page count + cart + items + products.
+        with self.assertNumQueries(4):
+            self.client.get("/cart/")
+
+        self.add_items(18, start=2)
+        with self.assertNumQueries(4):
+            response = self.client.get("/cart/")
+        self.assertEqual(len(response.data["results"][0]["items"]), 20)
 
-# Create your tests here.
+    def test_add_item_returns_line_total(self):
+        self.add_items(1)
+        product = Product.objects.get()
+        response = self.client.post("/items/", {"product_id": product.pk, "quantity": 1})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["quantity"], 3)
+        self.assertEqual(response.data["line_total"], "31.50")
+        self.assertEqual(response.data["product"]["stock"], 0)
@@ -2,22 +2,32 @@
 """
 Views for handling cart-related API requests.
 """
+from django.db.models import Prefetch
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from product.models import Product
 from .models import Cart, CartItem
 from .serializers import CartSerializer, CartItemSerializer
 
 
+def product_snapshot_prefetch(lookup="product"):
+    # Cart lines render product snapshots: load only each product's primary image.
+    return Prefetch(lookup, queryset=Product.objects.with_primary_image())
+
+
 class CartView(generics.ListAPIView):
     """
-    Get the current authenticated user's cart.
+    Get the current authenticated user's cart, with line totals and subtotal.
+    Loads in a fixed number of queries (page count, cart, items, products)
+    whatever the number of items.
     """
     serializer_class = CartSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        
-        return Cart.objects.filter(user=self.request.user)
+        return Cart.objects.filter(user=self.request.user).order_by("id").prefetch_related(
+            Prefetch("items", queryset=CartItem.objects.order_by("id")), product_snapshot_prefetch("items__product")
+        )
 
 
 class CartItemCreateView(generics.CreateAPIView):
@@ -42,6 +52,7 @@ class CartItemCreateView(generics.CreateAPIView):
             cart_item.quantity += serializer.validated_data['quantity']
             cart_item.save()
 
+        cart_item.product = Product.objects.with_primary_image().get(pk=product.pk)
         serializer.instance = cart_item
 
 
@@ -56,7 +67,13 @@ class CartItemUpdateView(generics.UpdateAPIView):
     lookup_field = "id"
 
     def get_queryset(self):
-        return CartItem.objects.filter(cart__user=self.request.user)
+        return CartItem.objects.filter(cart__user=self.request.user).prefetch_related(product_snapshot_prefetch())
+
+    def perform_update(self, serializer):
+        item = serializer.save()
+        if not hasattr(item.product, "primary_image"):
+            # product_id was changed to a product that was not prefetched
+            item.product = Product.objects.with_primary_image().get(pk=item.product_id)
 
 
 class CartItemDeleteView(generics.DestroyAPIView):
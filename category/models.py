@@ -1,4 +1,5 @@
 from django.db import models
+from media_assets.storage import get_blob_storage
 
 class Category(models.Model):
     """Product categories with hierarchical structure"""
@@ -6,7 +7,9 @@ class Category(models.Model):
     name = models.CharField(max_length=255, unique=True, db_index=True)
     slug = models.SlugField(max_length=255, unique=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
-    image= models.ImageField(upload_to='categories/', null=True, blank=True)
+    image= models.ImageField(upload_to='categories/', storage=get_blob_storage, null=True, blank=True)
+    # Resized WebP/JPEG copies of `image`, maintained by media_assets.
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     
     class Meta:
         verbose_name_plural = "categories"
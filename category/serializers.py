@@ -1,8 +1,11 @@
 from rest_framework import serializers
+from media_assets.serializers import ImageSrcsetField
 from .models import Category
 
 class CategorySerializer(serializers.ModelSerializer):
+    image_srcset = ImageSrcsetField(source='image_derivatives')
+
     class Meta:
         model = Category
-        fields = ['id', 'name', 'slug', 'created_at']
+        fields = ['id', 'name', 'slug', 'created_at', 'image', 'image_srcset']
 
@@ -0,0 +1,13 @@
+"""
+Signal handlers that invalidate cached category responses.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.caching import bump_version
+from .models import Category
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_cache(sender, **kwargs):
+    bump_version("categories")
@@ -1,3 +1,36 @@
+"""
+Tests for the category app.
+These tests ensure the cached category listing is invalidated and revalidated correctly.
+"""
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from category.models import Category
+
+
+class CachedCategoryListTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        Category.objects.create(name="Shirts", slug="shirts")
+
+    def test_cached_until_changed(self):
+        first = self.client.get("/categories/")
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            cached = self.client.get("/categories/")
+        self.assertEqual(cached.data, first.data)
+
+        Category.objects.create(name="Hats", slug="hats")
+        response = self.client.get("/categories/")
+        self.assertEqual(response.data["count"], 2)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get("/categories/")["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get("/categories/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Category.objects.filter(slug="shirts").first().delete()
+        response = self.client.get("/categories/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
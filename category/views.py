@@ -1,10 +1,12 @@
 
 from rest_framework import generics, permissions
+from config.caching import VersionedCacheMixin
 from .models import Category
 from .serializers import CategorySerializer
 
-# List all categories (authenticated users)
-class CategoryListView(generics.ListAPIView):
+# List all categories (public, cached until a category changes)
+class CategoryListView(VersionedCacheMixin, generics.ListAPIView):
+    cache_namespace = "categories"
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
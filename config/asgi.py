@@ -14,3 +14,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# Load the IP blocklist and the typeahead index once per worker so
+# requests never query them.
+from ip_block.blocklist import blocklist  # noqa: E402
+from product.suggest import suggestions  # noqa: E402
+
+blocklist.warm()
+suggestions.warm()
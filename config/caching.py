@@ -0,0 +1,106 @@
+"""
+Versioned read-through caching for public GET endpoints whose data
+changes rarely (categories, brands, sizes, colors).
+
+Each namespace has a version number stored in the cache. Signal handlers
+bump the version when the underlying models change, which both orphans the
+cached responses and changes the ETag sent to clients. Versions are
+timestamps, so a cache flush or restart never reuses an old ETag.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def get_cache():
+    return caches[getattr(settings, "API_CACHE_ALIAS", "default")]
+
+
+def _version_key(namespace):
+    return f"api-version:{namespace}"
+
+
+def get_version(namespace):
+    """
+    Return the current version of a namespace, initialising it if needed.
+    """
+    cache = get_cache()
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        cache.add(_version_key(namespace), time.time_ns(), None)
+        version = cache.get(_version_key(namespace))
+    return version
+
+
+def bump_version(namespace):
+    """
+    Invalidate every cached response of a namespace.
+    """
+    get_cache().set(_version_key(namespace), time.time_ns(), None)
+
+
+def namespace_etag(*namespaces):
+    """
+    Strong ETag built from the current versions of one or more namespaces.
+    """
+    return '"' + "-".join(f"{namespace}.{get_version(namespace)}" for namespace in namespaces) + '"'
+
+
+def make_etag(*parts):
+    """
+    Strong ETag from arbitrary version parts (timestamps, counters, ...).
+    """
+    return '"' + hashlib.sha1(repr(parts).encode()).hexdigest() + '"'
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Attach ETag/Last-Modified headers and require clients to revalidate.
+    `last_modified` is a datetime.
+    """
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def not_modified_response(request, etag, last_modified=None):
+    """
+    Return a 304 (or 412) response if the request's conditional headers
+    match the given validators, otherwise None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class VersionedCacheMixin:
+    """
+    Mixin for generic list views: serves GET responses from the cache, keyed
+    by the namespace version and the full request URL, and answers matching
+    `If-None-Match` requests with 304 before touching the database.
+    """
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        etag = namespace_etag(self.cache_namespace)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        cache = get_cache()
+        key = f"api-response:{self.cache_namespace}:{etag}:{request.build_absolute_uri()}"
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, getattr(settings, "API_CACHE_TIMEOUT", 300))
+
+        return set_validators(Response(data), etag)
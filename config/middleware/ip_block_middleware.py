@@ -1,6 +1,7 @@
 # middleware/ip_block_middleware.py
+from django.conf import settings
 from django.http import JsonResponse
-from ip_block.models import IPBlock
+from ip_block.blocklist import blocklist, parse_ip, to_network
 
 class IPBlockMiddleware:
     def __init__(self, get_response):
@@ -9,17 +10,45 @@ class IPBlockMiddleware:
     def __call__(self, request):
         ip = self.get_client_ip(request)
 
-        # check if IP is blocked
-        if IPBlock.objects.filter(ip_number=ip).exists():
-            return JsonResponse({"detail": "Your IP is blocked."}, status=403)
+        # check if IP is blocked (in-memory lookup, no query per request)
+        if blocklist.is_blocked(ip):
+            return JsonResponse({"detail": "Forbidden: your IP is blocked."}, status=403)
 
         return self.get_response(request)
 
-    def get_client_ip(self, request):
+    @staticmethod
+    def get_client_ip(request):
         """Support proxy setups"""
         x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
         if x_forwarded_for:
-            ip = x_forwarded_for.split(",")[0]
+            ip = x_forwarded_for.split(",")[0].strip()
         else:
             ip = request.META.get("REMOTE_ADDR")
         return ip
+
+    @staticmethod
+    def get_trusted_client_ip(request):
+        """
+        The client IP as recorded by a hop we trust, or None if it cannot be
+        known. Without X-Forwarded-For it is REMOTE_ADDR. Behind proxies
+        listed in TRUSTED_PROXIES it is the right-most forwarded address that
+        is not one of them. X-Forwarded-For sent through any other peer may be
+        forged, so None is returned.
+        """
+        entries = (to_network(*entry.split("/", 1)) for entry in getattr(settings, "TRUSTED_PROXIES", ()))
+        trusted = [network for network in entries if network]
+
+        def is_trusted(ip):
+            address = parse_ip(ip)
+            return address is not None and any(address in network for network in trusted)
+
+        remote = request.META.get("REMOTE_ADDR")
+        forwarded = [hop.strip() for hop in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if hop.strip()]
+        if not forwarded:
+            return remote
+        if not is_trusted(remote):
+            return None
+        for hop in reversed(forwarded):
+            if not is_trusted(hop):
+                return hop if parse_ip(hop) else None
+        return None
@@ -0,0 +1,201 @@
+"""
+Shared pagination classes for the API.
+"""
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class StandardPageNumberPagination(PageNumberPagination):
+    """
+    Default page-number pagination. Send `?count=false` to skip the
+    `COUNT(*)` query; the response then omits `count` and detects the
+    next page by fetching one extra row.
+    """
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    count_query_param = "count"
+
+    def should_count(self, request):
+        return request.query_params.get(self.count_query_param, "").lower() not in ("false", "0")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.with_count = self.should_count(request)
+        if self.with_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        page_number = request.query_params.get(self.page_query_param) or 1
+        try:
+            self.page_number = int(page_number)
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message="Invalid page."))
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if self.with_count:
+            return super().get_paginated_response(data)
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_next_link(self):
+        if self.with_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.with_count:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+
+class UncountedPageNumberPagination(StandardPageNumberPagination):
+    """
+    Page-number pagination that never counts, for results that cannot be
+    counted cheaply (ranked search). Works on any sequence that supports
+    slicing.
+    """
+    page_size = 20
+
+    def should_count(self, request):
+        return False
+
+
+def reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith("-") else f"-{field}" for field in ordering)
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the indexed `created_at` column (newest first),
+    with `id` as a tie-breaker. Pages cost the same no matter how deep.
+
+    DRF's cursor only records the first ordering field and skips rows that
+    tie on it with an OFFSET. Here the cursor records every ordering field
+    (which must end in a unique one such as `id`) and the page query
+    filters on all of them, so ties never shift or repeat rows.
+    """
+    ordering = ("-created_at", "-id")
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+
+        ordering = reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            queryset = self.filter_after(queryset, ordering, current_position)
+
+        # Fetch one extra row to tell whether another page follows.
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+        following_position = (
+            self._get_position_from_instance(results[-1], self.ordering) if has_following_position else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            self.next_position = current_position
+            self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            self.next_position = following_position
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def filter_after(self, queryset, ordering, position):
+        """
+        Rows strictly after `position` in `ordering`:
+        (a > x) OR (a = x AND b > y) OR ... with `<` for descending fields.
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        conditions, equal = [], Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            conditions.append(equal & Q(**{f"{name}__{lookup}": value}))
+            equal &= Q(**{name: value})
+        try:
+            return queryset.filter(reduce(or_, conditions))
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _get_position_from_instance(self, instance, ordering):
+        names = [field.lstrip("-") for field in ordering]
+        if isinstance(instance, dict):
+            values = [instance[name] for name in names]
+        else:
+            values = [getattr(instance, name) for name in names]
+        return json.dumps([str(value) for value in values])
+
+
+class KeysetPagination(CreatedAtCursorPagination):
+    """
+    Cursor pagination for feeds that used to be page-numbered. Clients that
+    still send `?page=` get StandardPageNumberPagination responses over the
+    same ordering, so existing integrations keep working.
+    """
+    page_number_class = StandardPageNumberPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.fallback = None
+        if self.page_number_class.page_query_param in request.query_params:
+            self.fallback = self.page_number_class()
+            queryset = queryset.order_by(*self.get_ordering(request, queryset, view))
+            return self.fallback.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,72 @@
+"""
+In-process data built from the database (the IP blocklist, the suggestion
+index) that is loaded at startup and then refreshed in a background thread
+once it is older than its TTL, so reads never wait for the database.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicReloader:
+    """
+    Subclasses implement `build()`, which reads the database and swaps the
+    new data in, and name the setting holding their TTL in seconds. Reads
+    call `reload_if_stale()`.
+    """
+    ttl_setting = None
+    default_ttl = 60
+    description = "in-process data"
+
+    def __init__(self):
+        self._expires_at = None  # None until the first load
+        self._reloading = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, self.ttl_setting, self.default_ttl)
+
+    def build(self):
+        raise NotImplementedError
+
+    def load(self):
+        """
+        Rebuild from the database now.
+        """
+        self.build()
+        self._expires_at = time.monotonic() + self.ttl
+
+    def warm(self):
+        """
+        Load at startup, tolerating a missing table (e.g. before migrate).
+        """
+        try:
+            self.load()
+        except DatabaseError:
+            logger.warning("Could not load the %s; retrying in the background.", self.description)
+            self._expires_at = 0.0
+
+    def reload_if_stale(self):
+        if self._expires_at is not None and time.monotonic() >= self._expires_at:
+            self._reload_in_background()
+
+    def _reload_in_background(self):
+        if not self._reloading.acquire(blocking=False):
+            return
+        # Push the deadline out first so concurrent requests do not queue reloads.
+        self._expires_at = time.monotonic() + self.ttl
+        threading.Thread(target=self._reload, daemon=True).start()
+
+    def _reload(self):
+        try:
+            self.load()
+        except DatabaseError:
+            logger.exception("Reloading the %s failed.", self.description)
+        finally:
+            connection.close()
+            self._reloading.release()
@@ -66,11 +66,12 @@ INSTALLED_APPS = [
     # "settings",
     "banner",
     "smtp_mail",
+    "media_assets",
 ]
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
-    # "config.middleware.ip_block_middleware.IPBlockMiddleware"
+    "config.middleware.ip_block_middleware.IPBlockMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -140,6 +141,48 @@ DATABASES = {
 
 
 
+# Cache configuration
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (Redis, Memcached) in production so invalidation reaches every worker.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "shundor-default"),
+    }
+}
+
+# Seconds a cached catalog response (categories, brands, sizes, colors) is kept.
+API_CACHE_TIMEOUT = 300
+
+
+# Seconds between background reloads of the in-memory IP blocklist.
+IP_BLOCKLIST_TTL = 60
+
+# Seconds between background rebuilds of the in-memory product suggestion index.
+SUGGEST_INDEX_TTL = 300
+
+
+# Fraud provider checks (see fraud_api.checker): overall deadline and connect
+# timeout in seconds, verdict cache lifetime, and concurrent requests.
+FRAUD_CHECK_TIMEOUT = 2.0
+FRAUD_CHECK_CONNECT_TIMEOUT = 0.5
+FRAUD_CHECK_CACHE_TTL = 3600
+FRAUD_CHECK_MAX_WORKERS = 8
+# Order risk levels by score (0-100); "high" orders are held in pending.
+FRAUD_RISK_THRESHOLDS = {"high": 75, "medium": 40}
+FRAUD_SCORING_LEASE = 300
+
+# Client IPs are added to BlockedIP after this many throttled requests
+# within RATE_LIMIT_BLOCK_WINDOW seconds (None disables it), for
+# RATE_LIMIT_BLOCK_DURATION seconds.
+RATE_LIMIT_BLOCK_AFTER = 100
+RATE_LIMIT_BLOCK_WINDOW = 3600
+RATE_LIMIT_BLOCK_DURATION = 24 * 60 * 60
+# Reverse proxies (addresses or CIDR ranges, comma-separated in the env)
+# whose X-Forwarded-For entries are trusted for automatic IP blocks.
+TRUSTED_PROXIES = [entry.strip() for entry in os.environ.get("TRUSTED_PROXIES", "").split(",") if entry.strip()]
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -195,7 +238,15 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "config.pagination.StandardPageNumberPagination",
+    "DEFAULT_THROTTLE_CLASSES": [
+        "config.throttling.TokenBucketThrottle",
+    ],
+    # Per-view limits, selected with `throttle_scope` ("auth" covers the Djoser/JWT credential endpoints)
+    "DEFAULT_THROTTLE_RATES": {
+        "checkout": "10/min",
+        "auth": "20/min",
+    },
     "PAGE_SIZE": 10,  # Show 10 orders per page
 
     'DEFAULT_PARSER_CLASSES': [
@@ -233,7 +284,14 @@ SIMPLE_JWT = {
 
 
 # Email settings
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# Outgoing mail is queued in smtp_mail.OutboundEmail and delivered by
+# `manage.py send_queued_mail` using the active SMTPMail row; the EMAIL_*
+# server settings below are only used when no SMTPMail row is active.
+EMAIL_BACKEND = "smtp_mail.backends.OutboxEmailBackend"
+OUTBOX_DELIVERY_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BACKOFF = 60  # seconds, doubled after each failed attempt
+OUTBOX_LEASE = 600  # seconds before a claimed-but-unsent email is retried
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -249,6 +307,24 @@ DEFAULT_FROM_EMAIL = "GlobeUp <antoneozaka724@gmail.com>"
 # At the bottom of settings.py
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    # Uploaded images are stored content-addressed under MEDIA_ROOT/blobs/
+    # (see media_assets.storage) so identical uploads share one file.
+    "blobs": {"BACKEND": "media_assets.storage.BlobStorage"},
+}
+# MEDIA_URL is served by media_assets.views.serve_media. Derivatives of blobs
+# are cached for a year; other files (blob originals included, as they are
+# rewritten when stripped) for MEDIA_CACHE_MAX_AGE seconds, then revalidated
+# with ETag/Last-Modified.
+MEDIA_CACHE_MAX_AGE = 3600
+# Internal nginx location aliasing MEDIA_ROOT (e.g. "/protected-media/"); when
+# set, the view answers with X-Accel-Redirect and nginx sends the file.
+MEDIA_ACCEL_REDIRECT = os.environ.get("MEDIA_ACCEL_REDIRECT", "")
+# Seconds before a product image claimed by `process_images` but never
+# finished (a crashed worker) is processed again.
+IMAGE_PROCESSING_LEASE = 600
 
 
 
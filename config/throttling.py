@@ -0,0 +1,138 @@
+"""
+Token-bucket rate limiting for DRF views.
+
+Views opt in with a `throttle_scope`; the Djoser/SimpleJWT credential
+endpoints (token create, sign-up, activation, password reset) use the
+"auth" scope automatically. Limits come from
+REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] (e.g. {"checkout": "10/min"}).
+Buckets live in the Django cache, so no database writes are needed, and
+refill continuously, so a client gets `rate` requests per sliding period
+with short bursts allowed. Anonymous buckets are keyed on the trusted client
+IP (falling back to REMOTE_ADDR), so a forged X-Forwarded-For cannot pick a
+fresh bucket. Each bucket is updated under a short cache lock
+(cache.add), so concurrent requests cannot spend the same token. Throttled
+responses carry `Retry-After`.
+
+Client IPs that keep hitting limits (RATE_LIMIT_BLOCK_AFTER violations
+within RATE_LIMIT_BLOCK_WINDOW seconds) are added to BlockedIP for
+RATE_LIMIT_BLOCK_DURATION seconds. Only addresses seen by a trusted hop
+(see IPBlockMiddleware.get_trusted_client_ip) are blocked, never a
+client-supplied X-Forwarded-For value.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
+
+from config.middleware.ip_block_middleware import IPBlockMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketThrottle(ScopedRateThrottle):
+    cache_format = "throttle_%(scope)s_%(ident)s"
+    # Matched by dotted path: importing the views here would import DRF views
+    # while DRF builds their default throttle classes.
+    auth_views = ("djoser.views.TokenCreateView", "rest_framework_simplejwt.views.TokenObtainPairView")
+    auth_user_view = "djoser.views.UserViewSet"
+    auth_user_actions = ("create", "activation", "resend_activation", "reset_password", "reset_password_confirm")
+    # A bucket lock outlives a crashed request by at most lock_timeout seconds;
+    # a request that cannot get the lock within lock_wait seconds is throttled.
+    lock_timeout = 2
+    lock_wait = 0.5
+
+    def get_scope(self, view):
+        scope = getattr(view, self.scope_attr, None)
+        if scope is None and self.is_auth_view(view):
+            scope = "auth"
+        return scope
+
+    def is_auth_view(self, view):
+        path = f"{type(view).__module__}.{type(view).__qualname__}"
+        if path == self.auth_user_view:
+            return getattr(view, "action", None) in self.auth_user_actions
+        return path in self.auth_views
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(view)
+        rates = api_settings.DEFAULT_THROTTLE_RATES or {}
+        if not self.scope or not rates.get(self.scope):
+            return True
+
+        self.num_requests, self.duration = self.parse_rate(rates[self.scope])
+        self.client_ip = IPBlockMiddleware.get_trusted_client_ip(request) or request.META.get("REMOTE_ADDR")
+        self.key = self.get_cache_key(request, view)
+
+        lock = f"{self.key}_lock"
+        if not self.acquire(lock):
+            self.wait_seconds = 1
+            return False
+        try:
+            now = self.timer()
+            tokens, updated_at = self.cache.get(self.key, (self.num_requests, now))
+            refill_rate = self.num_requests / self.duration
+            tokens = min(self.num_requests, tokens + (now - updated_at) * refill_rate)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            else:
+                self.wait_seconds = (1 - tokens) / refill_rate
+            self.cache.set(self.key, (tokens, now), self.duration)
+        finally:
+            self.cache.delete(lock)
+
+        if not allowed:
+            self.record_violation(IPBlockMiddleware.get_trusted_client_ip(request))
+        return allowed
+
+    def acquire(self, lock):
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(lock, 1, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f"user-{request.user.pk}"
+        else:
+            ident = f"ip-{self.client_ip}"
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def wait(self):
+        return self.wait_seconds
+
+    def record_violation(self, ip):
+        """
+        Count a throttled request against `ip` (the trusted client IP) and
+        block it for RATE_LIMIT_BLOCK_DURATION seconds once it crosses
+        RATE_LIMIT_BLOCK_AFTER.
+        """
+        threshold = getattr(settings, "RATE_LIMIT_BLOCK_AFTER", None)
+        if not threshold or not ip:
+            return
+        key = f"throttle_violations_{ip}"
+        self.cache.add(key, 0, getattr(settings, "RATE_LIMIT_BLOCK_WINDOW", 3600))
+        try:
+            violations = self.cache.incr(key)
+        except ValueError:  # expired between add() and incr()
+            return
+        if violations == threshold:
+            from ip_block.models import BlockedIP
+
+            expires_at = timezone.now() + timedelta(seconds=getattr(settings, "RATE_LIMIT_BLOCK_DURATION", 86400))
+            entry, created = BlockedIP.objects.get_or_create(
+                ip_number=ip, prefix_length=None,
+                defaults={"reason": "Repeated rate limit violations", "expires_at": expires_at},
+            )
+            # Extend an earlier automatic block; never shorten a permanent one.
+            if not created and entry.expires_at is not None and entry.expires_at < expires_at:
+                entry.expires_at = expires_at
+                entry.save(update_fields=["expires_at"])
+            logger.warning("Blocked %s after %s rate limit violations.", ip, violations)
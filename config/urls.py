@@ -1,8 +1,11 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
-from django.conf.urls.static import static
+from django.urls import path, include, re_path
 from django.conf import settings
 
+from media_assets.views import serve_media
+
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -26,5 +29,9 @@ urlpatterns = [
 ]
 
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Media is served by the app in every environment unless MEDIA_URL points
+# at another host (a CDN or a bucket).
+if settings.MEDIA_URL.startswith("/"):
+    urlpatterns += [
+        re_path(rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.*)$", serve_media, name="media"),
+    ]
@@ -6,3 +6,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Load the IP blocklist and the typeahead index once per worker so
+# requests never query them.
+from ip_block.blocklist import blocklist  # noqa: E402
+from product.suggest import suggestions  # noqa: E402
+
+blocklist.warm()
+suggestions.warm()
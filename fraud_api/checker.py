@@ -0,0 +1,147 @@
+"""
+Fraud scoring against the providers configured in FraudAPI.
+
+`check(ip=..., email=..., phone=...)` queries every matching provider
+concurrently over one pooled HTTP session and returns the highest score.
+Verdicts are cached per provider and value for FRAUD_CHECK_CACHE_TTL
+seconds. The whole check is bounded by FRAUD_CHECK_TIMEOUT. Providers that
+are slow or failing are reported with a null score instead of raising, so
+callers fail open.
+
+Provider contract: `GET <api_url>?type=<ip|email|phone>&value=<value>` with
+`Authorization: Bearer <api_key>`, answering JSON with a `score`,
+`fraud_score` or `risk_score` between 0 and the provider's `score_scale`
+(100 by default), normalised to 0-100.
+"""
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from config.caching import get_cache
+from .models import FraudAPI
+
+logger = logging.getLogger(__name__)
+
+CHECK_TYPES = ("ip", "email", "phone")
+SCORE_KEYS = ("score", "fraud_score", "risk_score")
+
+_session = None
+_executor = None
+
+
+def get_session():
+    global _session
+    if _session is None:
+        pool_size = getattr(settings, "FRAUD_CHECK_MAX_WORKERS", 8)
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _session = session
+    return _session
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "FRAUD_CHECK_MAX_WORKERS", 8), thread_name_prefix="fraud-check"
+        )
+    return _executor
+
+
+def parse_score(payload, scale=100.0):
+    """
+    Read the provider's score from `payload` and normalise it from 0-`scale`
+    to 0-100.
+    """
+    for key in SCORE_KEYS:
+        if isinstance(payload, dict) and isinstance(payload.get(key), (int, float)):
+            score = float(payload[key]) * 100 / scale
+            return round(min(max(score, 0.0), 100.0), 2)
+    raise ValueError("Provider response has no numeric score.")
+
+
+def query_provider(provider, check_type, value):
+    timeout = (
+        getattr(settings, "FRAUD_CHECK_CONNECT_TIMEOUT", 0.5),
+        getattr(settings, "FRAUD_CHECK_TIMEOUT", 2.0),
+    )
+    response = get_session().get(
+        provider.api_url,
+        params={"type": check_type, "value": value},
+        headers={"Authorization": f"Bearer {provider.api_key}"},
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    return parse_score(response.json(), provider.score_scale)
+
+
+def cache_key(provider, check_type, value):
+    # Configuration edits bump updated_at, which invalidates cached verdicts.
+    digest = hashlib.sha1(f"{check_type}:{value.strip().lower()}".encode()).hexdigest()
+    return f"fraud-check:{provider.pk}:{provider.updated_at.timestamp()}:{digest}"
+
+
+def check(ip=None, email=None, phone=None, providers=None):
+    """
+    Score the given values with every configured provider. Returns
+    `{"score": <max score or None>, "checks": [...]}`, one entry per
+    provider/value with its score, whether it was cached, and any error.
+    """
+    values = {"ip": ip, "email": email, "phone": phone}
+    if providers is None:
+        providers = FraudAPI.objects.all()
+
+    lookups = []
+    for provider in providers:
+        types = CHECK_TYPES if provider.type == "custom" else (provider.type,)
+        for check_type in types:
+            if values.get(check_type):
+                lookups.append((provider, check_type, str(values[check_type])))
+    if not lookups:
+        return {"score": None, "checks": []}
+
+    cache = get_cache()
+    ttl = getattr(settings, "FRAUD_CHECK_CACHE_TTL", 3600)
+    keys = [cache_key(*lookup) for lookup in lookups]
+    cached = cache.get_many(keys)
+
+    def fetch(lookup, key):
+        score = query_provider(*lookup)
+        cache.set(key, score, ttl)
+        return score
+
+    futures = {
+        index: get_executor().submit(fetch, lookup, key)
+        for index, (lookup, key) in enumerate(zip(lookups, keys))
+        if key not in cached
+    }
+    if futures:
+        # One deadline for the whole fan-out; stragglers keep running in the
+        # pool and still fill the cache for the next check.
+        wait(futures.values(), timeout=getattr(settings, "FRAUD_CHECK_TIMEOUT", 2.0))
+
+    checks = []
+    for index, ((provider, check_type, value), key) in enumerate(zip(lookups, keys)):
+        entry = {"provider": provider.pk, "type": check_type, "score": None, "cached": key in cached, "error": None}
+        if entry["cached"]:
+            entry["score"] = cached[key]
+        else:
+            future = futures[index]
+            if not future.done():
+                entry["error"] = "timeout"
+            elif future.exception() is not None:
+                entry["error"] = str(future.exception()) or type(future.exception()).__name__
+            else:
+                entry["score"] = future.result()
+        if entry["error"]:
+            logger.warning("Fraud check %s via provider %s failed: %s", check_type, provider.pk, entry["error"])
+        checks.append(entry)
+
+    scores = [entry["score"] for entry in checks if entry["score"] is not None]
+    return {"score": max(scores) if scores else None, "checks": checks}
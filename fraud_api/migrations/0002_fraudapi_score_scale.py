@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:28
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fraud_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fraudapi',
+            name='score_scale',
+            field=models.FloatField(default=100, help_text='Highest score the provider returns, e.g. 1 for 0-1 fractions; scores are normalised to 0-100.', validators=[django.core.validators.MinValueValidator(0.01)]),
+        ),
+    ]
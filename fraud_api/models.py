@@ -1,5 +1,6 @@
 
 # Create your models here.
+from django.core.validators import MinValueValidator
 from django.db import models
 
 
@@ -18,6 +19,10 @@ class FraudAPI(models.Model):
     type = models.CharField(max_length=20, choices=API_TYPE_CHOICES)
     api_url = models.URLField()
     api_key = models.CharField(max_length=255)
+    score_scale = models.FloatField(
+        default=100, validators=[MinValueValidator(0.01)],
+        help_text="Highest score the provider returns, e.g. 1 for 0-1 fractions; scores are normalised to 0-100.",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
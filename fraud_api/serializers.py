@@ -5,5 +5,16 @@ from .models import FraudAPI
 class FraudAPISerializer(serializers.ModelSerializer):
     class Meta:
         model = FraudAPI
-        fields = ["id", "type", "api_url", "api_key", "created_at", "updated_at"]
+        fields = ["id", "type", "api_url", "api_key", "score_scale", "created_at", "updated_at"]
         read_only_fields = ["id", "created_at", "updated_at"]  # IDs and timestamps are read-only
+
+
+class FraudCheckSerializer(serializers.Serializer):
+    ip = serializers.IPAddressField(required=False)
+    email = serializers.EmailField(required=False)
+    phone = serializers.CharField(required=False, max_length=30)
+
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError("Provide at least one of ip, email or phone.")
+        return attrs
@@ -1,3 +1,133 @@
+"""
+Tests for the fraud_api app.
+These tests run the fraud checker against a local stub provider server.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
-# Tests for the FraudAPI app.
-# Add test cases here to ensure fraud API logic works as expected.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from fraud_api import checker
+from fraud_api.models import FraudAPI
+from user.models import User
+
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    """
+    /score/<n>  -> {"score": n}
+    /together   -> waits until the server's barrier is full (the requests
+                   arrived concurrently), then {"score": 10}; HTTP 500 if not
+    /hang       -> waits until the server's release event is set, then {"score": 10}
+    /error      -> HTTP 500
+    """
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.hits.append((url.path, parse_qs(url.query), self.headers.get("Authorization")))
+        kind, _, arg = url.path.strip("/").partition("/")
+        if kind == "together":
+            try:
+                self.server.barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                kind = "error"
+        if kind == "error":
+            self.send_response(500)
+            self.end_headers()
+            return
+        if kind == "hang":
+            self.server.release.wait(timeout=10)
+        body = json.dumps({"score": float(arg) if kind == "score" else 10}).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):  # the checker gave up on a slow response
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(FRAUD_CHECK_TIMEOUT=0.5)
+class FraudCheckerTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubProviderHandler)
+        cls.server.daemon_threads = True
+        cls.server.hits = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.server.hits.clear()
+        self.server.barrier = threading.Barrier(2)
+        self.server.release = threading.Event()
+        # Let hanging handlers finish once the test is done with them.
+        self.addCleanup(self.server.release.set)
+
+    def provider(self, type, path, **kwargs):
+        return FraudAPI.objects.create(type=type, api_url=f"{self.base_url}{path}", api_key="secret", **kwargs)
+
+    @override_settings(FRAUD_CHECK_TIMEOUT=10)
+    def test_providers_are_queried_concurrently_and_cached(self):
+        # Each /together request only succeeds if the other one is in flight too.
+        self.provider("ip", "/together")
+        self.provider("email", "/score/80")
+        self.provider("phone", "/together")
+
+        verdict = checker.check(ip="203.0.113.5", email="a@example.com", phone="+8801712345678")
+        self.assertEqual([entry["error"] for entry in verdict["checks"]], [None, None, None])
+        self.assertEqual(verdict["score"], 80.0)
+        self.assertEqual(len(self.server.hits), 3)
+        self.assertIn(("/score/80", {"type": ["email"], "value": ["a@example.com"]}, "Bearer secret"), self.server.hits)
+
+        verdict = checker.check(ip="203.0.113.5", email="a@example.com", phone="+8801712345678")
+        self.assertTrue(all(entry["cached"] for entry in verdict["checks"]))
+        self.assertEqual(len(self.server.hits), 3)
+
+    def test_slow_and_failing_providers_fail_open(self):
+        self.provider("ip", "/hang")
+        self.provider("ip", "/error")
+        self.provider("ip", "/score/0.25", score_scale=1)
+
+        verdict = checker.check(ip="203.0.113.5")
+        self.assertEqual(verdict["score"], 25.0)
+        slow, failing, ok = verdict["checks"]
+        # Either the overall deadline or the read timeout may fire first.
+        self.assertIsNone(slow["score"])
+        self.assertRegex(slow["error"], "timeout|timed out")
+        self.assertIn("500", failing["error"])
+        self.assertIsNone(ok["error"])
+
+    def test_scores_are_normalised_by_provider_scale(self):
+        self.provider("ip", "/score/1")
+        self.provider("email", "/score/0.5", score_scale=1)
+        self.provider("phone", "/score/600", score_scale=1000)
+        verdict = checker.check(ip="203.0.113.5", email="a@example.com", phone="+8801712345678")
+        # A genuine 1/100 stays low risk instead of being read as a fraction.
+        self.assertEqual([entry["score"] for entry in verdict["checks"]], [1.0, 50.0, 60.0])
+
+    def test_admin_check_endpoint(self):
+        self.provider("custom", "/score/40")
+        client = APIClient()
+        self.assertEqual(client.post("/fraud-apis/check/", {"ip": "203.0.113.5"}).status_code, 401)
+
+        client.force_authenticate(User.objects.create_superuser(phone_number="+8801812345678", password="pass"))
+        self.assertEqual(client.post("/fraud-apis/check/", {}).status_code, 400)
+        response = client.post("/fraud-apis/check/", {"ip": "203.0.113.5", "email": "a@example.com"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["score"], 40.0)
+        self.assertEqual(len(response.data["checks"]), 2)
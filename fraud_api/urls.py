@@ -1,10 +1,11 @@
 
 # API endpoints for fraud APIs
 from django.urls import path
-from .views import FraudAPIListCreateView, FraudAPIDetailView
+from .views import FraudAPIListCreateView, FraudAPIDetailView, FraudCheckView
 
 urlpatterns = [
 	path('fraud-apis/', FraudAPIListCreateView.as_view(), name='fraudapi-list-create'),
+	path('fraud-apis/check/', FraudCheckView.as_view(), name='fraudapi-check'),
 	path('fraud-apis/<int:pk>/', FraudAPIDetailView.as_view(), name='fraudapi-detail'),
 ]
 
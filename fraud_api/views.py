@@ -8,8 +8,9 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.shortcuts import get_object_or_404
+from . import checker
 from .models import FraudAPI
-from .serializers import FraudAPISerializer
+from .serializers import FraudAPISerializer, FraudCheckSerializer
 
 
 class IsAdminUser(permissions.BasePermission):
@@ -82,3 +83,18 @@ class FraudAPIDetailView(APIView):
         fraud_api = self.get_object(pk)
         fraud_api.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class FraudCheckView(APIView):
+    """
+    Score an IP, email and/or phone number with every configured provider.
+    Only accessible by admin users.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        """Run the providers concurrently and return the combined verdict."""
+        serializer = FraudCheckSerializer(data=request.data)
+        if serializer.is_valid():
+            return Response(checker.check(**serializer.validated_data))
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -4,7 +4,7 @@ from .models import BlockedIP
 
 @admin.register(BlockedIP)
 class BlockedIPAdmin(admin.ModelAdmin):
-	list_display = ("ip_number", "created_at", "reason")
+	list_display = ("ip_number", "prefix_length", "created_at", "expires_at", "reason")
 	search_fields = ("ip_number", "reason")
 
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class IpBlockConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ip_block'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,145 @@
+"""
+In-process cache of blocked IP addresses and CIDR ranges used by
+IPBlockMiddleware.
+
+Blocked networks are kept in a PrefixMatcher, so the per-request check makes
+no queries. The blocklist is:
+
+- loaded when the WSGI/ASGI application starts (see config/wsgi.py),
+- patched in place when BlockedIP rows are saved or deleted in this
+  process (see ip_block.signals),
+- reloaded in a background thread every IP_BLOCKLIST_TTL seconds (see
+  config.reloading) to pick up changes made by other workers and drop
+  expired blocks.
+"""
+import ipaddress
+from collections import Counter
+
+from django.db.models import Q
+from django.utils import timezone
+
+from config.reloading import PeriodicReloader
+
+
+def parse_ip(value):
+    """
+    Return an ipaddress address for `value` (IPv4-mapped IPv6 addresses are
+    unwrapped to IPv4), or None if invalid.
+    """
+    try:
+        address = ipaddress.ip_address(str(value).strip())
+    except ValueError:
+        return None
+    if address.version == 6 and address.ipv4_mapped:
+        return address.ipv4_mapped
+    return address
+
+
+def to_network(ip, prefix_length=None):
+    """
+    Build the network blocked by an (ip, prefix_length) pair, or None if invalid.
+    """
+    address = parse_ip(ip)
+    if address is None:
+        return None
+    prefix = address.max_prefixlen if prefix_length is None else prefix_length
+    try:
+        return ipaddress.ip_network(f"{address}/{prefix}", strict=False)
+    except ValueError:
+        return None
+
+
+class PrefixMatcher:
+    """
+    Prefix tree flattened into one hash table per prefix length: each level
+    maps the leading `prefixlen` bits of a blocked network to a reference
+    count. A lookup masks the address once per populated level, so it costs
+    at most 32 (IPv4) or 128 (IPv6) set lookups whatever the number of
+    ranges, and is usually a handful. Inserts and removals are O(1).
+    """
+
+    def __init__(self, networks=()):
+        self._tables = {4: {}, 6: {}}
+        self._levels = {4: (), 6: ()}
+        for network in networks:
+            self.add(network)
+
+    def __len__(self):
+        return sum(sum(table.values()) for tables in self._tables.values() for table in tables.values())
+
+    def add(self, network):
+        tables = self._tables[network.version]
+        table = tables.get(network.prefixlen)
+        if table is None:
+            table = tables[network.prefixlen] = Counter()
+            self._rebuild_levels(network.version)
+        table[self._key(network)] += 1
+
+    def discard(self, network):
+        tables = self._tables[network.version]
+        table = tables.get(network.prefixlen)
+        key = self._key(network)
+        if not table or key not in table:
+            return
+        table[key] -= 1
+        if table[key] <= 0:
+            del table[key]
+        if not table:
+            del tables[network.prefixlen]
+            self._rebuild_levels(network.version)
+
+    def __contains__(self, address):
+        value = int(address)
+        for shift, table in self._levels[address.version]:
+            if value >> shift in table:
+                return True
+        return False
+
+    @staticmethod
+    def _key(network):
+        return int(network.network_address) >> (network.max_prefixlen - network.prefixlen)
+
+    def _rebuild_levels(self, version):
+        # Lookups iterate an immutable snapshot, so writers never disturb readers.
+        bits = 32 if version == 4 else 128
+        self._levels[version] = tuple(
+            (bits - prefixlen, table) for prefixlen, table in sorted(self._tables[version].items())
+        )
+
+
+class IPBlocklist(PeriodicReloader):
+    ttl_setting = "IP_BLOCKLIST_TTL"
+    default_ttl = 60
+    description = "IP blocklist"
+
+    def __init__(self):
+        super().__init__()
+        self._matcher = PrefixMatcher()
+
+    def build(self):
+        """
+        Reload every active blocked address and range from the database.
+        """
+        from .models import BlockedIP
+
+        active = BlockedIP.objects.filter(Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now()))
+        rows = active.values_list("ip_number", "prefix_length").iterator(chunk_size=10000)
+        self._matcher = PrefixMatcher(filter(None, (to_network(ip, prefix) for ip, prefix in rows)))
+
+    def add(self, ip, prefix_length=None):
+        network = to_network(ip, prefix_length)
+        if network:
+            self._matcher.add(network)
+
+    def discard(self, ip, prefix_length=None):
+        network = to_network(ip, prefix_length)
+        if network:
+            self._matcher.discard(network)
+
+    def is_blocked(self, ip):
+        self.reload_if_stale()
+        address = parse_ip(ip) if ip else None
+        return address is not None and address in self._matcher
+
+
+blocklist = IPBlocklist()
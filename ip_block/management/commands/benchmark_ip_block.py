@@ -0,0 +1,42 @@
+"""
+Measure the overhead of IPBlockMiddleware by comparing requests per second
+through a trivial view with the middleware on and off.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from config.middleware.ip_block_middleware import IPBlockMiddleware
+from ip_block.blocklist import blocklist
+
+
+class Command(BaseCommand):
+    help = "Benchmark requests/sec with IPBlockMiddleware enabled and disabled."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100000, help="Requests per run.")
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+        factory = RequestFactory()
+        requests = [
+            factory.get("/", REMOTE_ADDR=f"10.{i % 256}.{(i // 256) % 256}.{i % 200}") for i in range(1000)
+        ]
+
+        def view(request):
+            return HttpResponse("OK")
+
+        blocklist.load()
+        runs = {"off": view, "on": IPBlockMiddleware(view)}
+        results = {}
+        for name, handler in runs.items():
+            start = time.perf_counter()
+            for i in range(total):
+                handler(requests[i % len(requests)])
+            results[name] = total / (time.perf_counter() - start)
+            self.stdout.write(f"middleware {name:>3}: {results[name]:,.0f} req/s")
+
+        overhead = (1 / results["on"] - 1 / results["off"]) * 1e6
+        self.stdout.write(self.style.SUCCESS(f"Overhead per request: {overhead:.2f} µs"))
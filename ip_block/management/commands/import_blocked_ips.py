@@ -0,0 +1,60 @@
+"""
+Bulk-import blocked IP addresses and CIDR ranges from a text file.
+
+The file holds one address or range per line (e.g. `203.0.113.7`,
+`198.51.100.0/24`, `2001:db8::/32`); blank lines and `#` comments are
+ignored. Entries that are already blocked are skipped.
+"""
+import ipaddress
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ip_block.models import BlockedIP
+
+
+class Command(BaseCommand):
+    help = "Import blocked IP addresses and CIDR ranges from a file, one per line."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import ('-' for stdin).")
+        parser.add_argument("--reason", default="Imported blocklist", help="Reason stored on new entries.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        reason = options["reason"][:50]
+        existing = set(BlockedIP.objects.values_list("ip_number", "prefix_length"))
+
+        new_entries, invalid = [], 0
+        for line in self.read_lines(options["path"]):
+            value = line.split("#", 1)[0].strip()
+            if not value:
+                continue
+            try:
+                network = ipaddress.ip_network(value, strict=False)
+            except ValueError:
+                invalid += 1
+                continue
+            host = network.prefixlen == network.max_prefixlen
+            entry = (network.network_address.compressed, None if host else network.prefixlen)
+            if entry in existing:
+                continue
+            existing.add(entry)
+            new_entries.append(BlockedIP(ip_number=entry[0], prefix_length=entry[1], reason=reason))
+
+        # bulk_create skips signals; running workers pick the rows up on their next reload.
+        BlockedIP.objects.bulk_create(new_entries, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {len(new_entries)} entr{'y' if len(new_entries) == 1 else 'ies'}, "
+            f"skipped {invalid} invalid line(s)."
+        ))
+
+    def read_lines(self, path):
+        if path == "-":
+            yield from sys.stdin
+            return
+        try:
+            with open(path, encoding="utf-8") as handle:
+                yield from handle
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ip_block', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blockedip',
+            name='prefix_length',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Leave empty to block a single address, e.g. 24 for a /24 range.', null=True),
+        ),
+    ]
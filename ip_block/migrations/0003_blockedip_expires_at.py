@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ip_block', '0002_blockedip_prefix_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blockedip',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -1,20 +1,48 @@
+import ipaddress
 
+from django.core.exceptions import ValidationError
 from django.db import models
 
 
 class BlockedIP(models.Model):
     """
     Model for storing blocked IP addresses and the reason for blocking.
+    Set `prefix_length` to block a whole CIDR range starting at `ip_number`.
     """
     id = models.AutoField(primary_key=True)
     ip_number = models.GenericIPAddressField()
+    prefix_length = models.PositiveSmallIntegerField(
+        blank=True, null=True, help_text="Leave empty to block a single address, e.g. 24 for a /24 range."
+    )
     reason = models.CharField(max_length=50, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Automatic blocks lift at this time; leave empty for a permanent block.
+    expires_at = models.DateTimeField(blank=True, null=True, db_index=True)
 
-    def __str__(self):
+    @property
+    def network(self):
         """
-        Returns a string representation of the blocked IP and reason.
+        The blocked range as an ipaddress network (a single host when no prefix is set).
         """
-        return f"{self.ip_number} - {self.reason[:50]}"
+        address = ipaddress.ip_address(self.ip_number)
+        prefix = address.max_prefixlen if self.prefix_length is None else self.prefix_length
+        return ipaddress.ip_network(f"{address}/{prefix}", strict=False)
 
+    def clean(self):
+        """
+        Validate the prefix and store the range's network address.
+        """
+        if not self.ip_number:
+            return
+        try:
+            network = self.network
+        except ValueError as e:
+            raise ValidationError({"prefix_length": str(e)})
+        self.ip_number = str(network.network_address)
 
+    def __str__(self):
+        """
+        Returns a string representation of the blocked IP and reason.
+        """
+        target = self.ip_number if self.prefix_length is None else f"{self.ip_number}/{self.prefix_length}"
+        return f"{target} - {(self.reason or '')[:50]}"
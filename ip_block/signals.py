@@ -0,0 +1,32 @@
+"""
+Signal handlers that keep the in-process IP blocklist in sync.
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .blocklist import blocklist
+from .models import BlockedIP
+
+
+def _entry(instance):
+    values = instance.__dict__
+    return values.get("ip_number"), values.get("prefix_length")
+
+
+@receiver(post_init, sender=BlockedIP)
+def remember_blocked_entry(sender, instance, **kwargs):
+    instance._loaded_entry = _entry(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=BlockedIP)
+def add_blocked_entry(sender, instance, **kwargs):
+    # The matcher reference-counts entries, so duplicates are handled.
+    if instance._loaded_entry:
+        blocklist.discard(*instance._loaded_entry)
+    blocklist.add(*_entry(instance))
+    instance._loaded_entry = _entry(instance)
+
+
+@receiver(post_delete, sender=BlockedIP)
+def remove_blocked_entry(sender, instance, **kwargs):
+    blocklist.discard(*(instance._loaded_entry or _entry(instance)))
@@ -2,10 +2,16 @@
 Tests for the IPBlock app.
 These tests ensure the IP blocking middleware and model work as expected.
 """
+import ipaddress
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase, RequestFactory
 from django.http import HttpResponse
 from config.middleware.ip_block_middleware import IPBlockMiddleware
-from ip_block.models import IPBlock
+from ip_block.blocklist import PrefixMatcher, blocklist
+from ip_block.models import BlockedIP
 
 class IPBlockMiddlewareTest(TestCase):
     def setUp(self):
@@ -13,7 +19,11 @@ class IPBlockMiddlewareTest(TestCase):
         self.middleware = IPBlockMiddleware(get_response=lambda r: HttpResponse("OK"))
 
         # Block a test IP
-        IPBlock.objects.create(ip_number="127.0.0.1", reason="Test Block")
+        self.blocked = BlockedIP.objects.create(ip_number="127.0.0.1", reason="Test Block")
+
+    def tearDown(self):
+        # The blocklist is process-wide and does not see the test rollback.
+        blocklist.discard("127.0.0.1")
 
     def test_blocked_ip(self):
         request = self.factory.get("/", REMOTE_ADDR="127.0.0.1")
@@ -26,3 +36,68 @@ class IPBlockMiddlewareTest(TestCase):
         response = self.middleware(request)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.content.decode(), "OK")
+
+    def test_check_makes_no_queries(self):
+        request = self.factory.get("/", HTTP_X_FORWARDED_FOR="127.0.0.1, 10.0.0.1")
+        with self.assertNumQueries(0):
+            response = self.middleware(request)
+        self.assertEqual(response.status_code, 403)
+
+    def test_unblocking_takes_effect_immediately(self):
+        self.blocked.delete()
+        request = self.factory.get("/", REMOTE_ADDR="127.0.0.1")
+        self.assertEqual(self.middleware(request).status_code, 200)
+
+
+class PrefixMatcherTest(TestCase):
+    def test_matches_ranges_of_both_families(self):
+        matcher = PrefixMatcher(map(ipaddress.ip_network, ["10.0.0.0/8", "192.168.1.0/24", "2001:db8::/32"]))
+        self.assertIn(ipaddress.ip_address("10.20.30.40"), matcher)
+        self.assertIn(ipaddress.ip_address("192.168.1.255"), matcher)
+        self.assertNotIn(ipaddress.ip_address("192.168.2.1"), matcher)
+        self.assertIn(ipaddress.ip_address("2001:db8:1::5"), matcher)
+        self.assertNotIn(ipaddress.ip_address("2001:db9::1"), matcher)
+
+    def test_reference_counted_removal(self):
+        network = ipaddress.ip_network("198.51.100.0/24")
+        matcher = PrefixMatcher([network, network])
+        matcher.discard(network)
+        self.assertIn(ipaddress.ip_address("198.51.100.7"), matcher)
+        matcher.discard(network)
+        self.assertNotIn(ipaddress.ip_address("198.51.100.7"), matcher)
+
+
+class BlockedRangeTest(TestCase):
+    def setUp(self):
+        self.middleware = IPBlockMiddleware(get_response=lambda r: HttpResponse("OK"))
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        for entry in BlockedIP.objects.all():
+            entry.delete()
+
+    def status_for(self, ip):
+        return self.middleware(self.factory.get("/", REMOTE_ADDR=ip)).status_code
+
+    def test_cidr_entry_blocks_whole_range(self):
+        BlockedIP.objects.create(ip_number="203.0.113.0", prefix_length=24)
+        self.assertEqual(self.status_for("203.0.113.99"), 403)
+        self.assertEqual(self.status_for("::ffff:203.0.113.99"), 403)
+        self.assertEqual(self.status_for("203.0.114.1"), 200)
+
+    def test_clean_normalizes_network_address(self):
+        entry = BlockedIP(ip_number="203.0.113.77", prefix_length=24)
+        entry.clean()
+        self.assertEqual(entry.ip_number, "203.0.113.0")
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt") as handle:
+            handle.write("# blocklist\n198.51.100.0/24\n2001:db8::/32 # provider\n192.0.2.5\nnot-an-ip\n198.51.100.0/24\n")
+            handle.flush()
+            out = StringIO()
+            call_command("import_blocked_ips", handle.name, stdout=out)
+        self.assertIn("Imported 3 entries, skipped 1 invalid", out.getvalue())
+        self.assertEqual(
+            set(BlockedIP.objects.values_list("ip_number", "prefix_length")),
+            {("198.51.100.0", 24), ("2001:db8::", 32), ("192.0.2.5", None)},
+        )
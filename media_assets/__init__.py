@@ -0,0 +1 @@
+# Init file for the media_assets app.
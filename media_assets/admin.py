@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import Blob
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+	list_display = ("name", "size", "ref_count", "created_at")
+	search_fields = ("name",)
+	readonly_fields = ("name", "size", "ref_count", "derivatives", "created_at")
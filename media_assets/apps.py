@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class MediaAssetsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'media_assets'
+
+    def ready(self):
+        from . import signals  # noqa: F401
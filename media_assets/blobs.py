@@ -0,0 +1,109 @@
+"""
+Reference counting for content-addressed uploads.
+
+Every image field in BLOB_FIELDS holds a reference to its Blob. A blob's
+file and derivatives are deleted when its last reference is released.
+Files stored before content addressing (outside `blobs/`) are not counted.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+
+from .derivatives import delete_derivatives
+from .models import Blob
+from .storage import get_blob_storage, is_blob
+
+
+# Uploaded file fields stored in BlobStorage, keyed by model label.
+BLOB_FIELDS = {
+    "product.ProductImage": ("image",),
+    "banner.Banner": ("image",),
+    "category.Category": ("image",),
+    "brand.Brand": ("brand_img",),
+    "site_setting.SiteSetting": ("white_logo", "dark_logo", "favicon"),
+}
+
+
+def acquire(names):
+    """
+    Add one reference to each blob in `names` (repeats count).
+    """
+    counts = Counter(name for name in names if is_blob(name))
+    if not counts:
+        return
+    storage = get_blob_storage()
+    with transaction.atomic():
+        existing = set(Blob.objects.filter(name__in=counts).values_list("name", flat=True))
+        Blob.objects.bulk_create(
+            [Blob(name=name, size=storage.size(name)) for name in counts.keys() - existing],
+            ignore_conflicts=True,
+        )
+        for name, count in counts.items():
+            Blob.objects.filter(name=name).update(ref_count=F("ref_count") + count)
+
+
+def release(names):
+    """
+    Drop one reference to each blob in `names`; blobs left unreferenced are
+    deleted together with their derivatives once the transaction commits.
+    """
+    counts = Counter(name for name in names if is_blob(name))
+    if not counts:
+        return
+    with transaction.atomic():
+        blobs = list(Blob.objects.select_for_update().filter(name__in=counts))
+        unreferenced = []
+        for blob in blobs:
+            blob.ref_count = max(blob.ref_count - counts[blob.name], 0)
+            if not blob.ref_count:
+                unreferenced.append(blob)
+        Blob.objects.bulk_update(blobs, ["ref_count"])
+        Blob.objects.filter(pk__in=[blob.pk for blob in unreferenced]).delete()
+        transaction.on_commit(lambda: delete_blob_files(unreferenced))
+
+
+def delete_blob_files(blobs):
+    storage = get_blob_storage()
+    for blob in blobs:
+        if not Blob.objects.filter(name=blob.name).exists():  # not uploaded again meanwhile
+            storage.delete(blob.name)
+            delete_derivatives(blob.derivatives, shared=True)
+
+
+def shared_derivatives(names):
+    """
+    Derivatives already rendered for the blobs in `names`, by name. Blobs
+    whose metadata has not been stripped yet are left out, so a duplicate
+    upload is never marked processed without being stripped.
+    """
+    blob_names = [name for name in names if is_blob(name)]
+    if not blob_names:
+        return {}
+    blobs = Blob.objects.filter(name__in=blob_names, stripped=True).exclude(derivatives={})
+    return dict(blobs.values_list("name", "derivatives"))
+
+
+def store_derivatives(name, derivatives):
+    """
+    Record the derivatives rendered for blob `name` once its metadata has
+    been stripped (and its size, which the stripping changes).
+    """
+    if is_blob(name):
+        Blob.objects.filter(name=name).update(
+            derivatives=derivatives, stripped=True, size=get_blob_storage().size(name),
+        )
+
+
+def count_references():
+    """
+    Count the references to every blob by scanning BLOB_FIELDS.
+    """
+    from django.apps import apps
+
+    counts = Counter()
+    for label, fields in BLOB_FIELDS.items():
+        model = apps.get_model(label)
+        for field in fields:
+            counts.update(name for name in model.objects.values_list(field, flat=True) if is_blob(name))
+    return counts
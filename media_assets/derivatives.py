@@ -0,0 +1,165 @@
+"""
+Responsive image derivatives.
+
+Every uploaded catalog image (see IMAGE_FIELDS) is resized into a fixed set
+of sizes, each stored as WebP and JPEG next to the original under
+`derivatives/`. The result is recorded on the row as
+
+    {"thumbnail": {"width": 160, "height": 120, "webp": name, "jpeg": name}, ...}
+
+in its `image_derivatives` field, so serializers can build `srcset` URLs
+without touching storage. Originals are read from BlobStorage; derivatives
+of a blob are shared by every row referencing it (see media_assets.blobs).
+"""
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import ExifTags, Image, ImageOps
+
+from .storage import BLOB_ROOT, get_blob_storage
+
+
+# Image fields that get derivatives, keyed by model label.
+IMAGE_FIELDS = {
+    "product.ProductImage": "image",
+    "banner.Banner": "image",
+    "category.Category": "image",
+    "brand.Brand": "brand_img",
+}
+
+# Longest edge of each derivative in pixels, smallest first. Originals are never upscaled.
+SIZES = {
+    "thumbnail": 160,
+    "card": 480,
+    "detail": 1200,
+}
+
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+DERIVATIVE_ROOT = "derivatives"
+
+
+def derivative_name(name, size, extension):
+    """
+    Storage name of one derivative of the original `name`.
+    """
+    root, _ = posixpath.splitext(name)
+    return f"{DERIVATIVE_ROOT}/{root}-{size}.{extension}"
+
+
+def has_alpha(image):
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def flatten(image, background=(255, 255, 255)):
+    """
+    Composite an RGBA image onto a solid background, for formats without alpha.
+    """
+    flat = Image.new("RGB", image.size, background)
+    flat.paste(image, mask=image.getchannel("A"))
+    return flat
+
+
+def open_original(name, storage=None):
+    """
+    Decode the original, already rotated per its EXIF orientation and
+    converted to RGB (or RGBA when it has transparency).
+    """
+    storage = storage or get_blob_storage()
+    with storage.open(name, "rb") as original:
+        image = Image.open(original)
+        # Let JPEGs decode straight at a reduced scale when the original is
+        # far larger than the biggest derivative.
+        largest = max(SIZES.values())
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        return image.convert("RGBA" if has_alpha(image) else "RGB")
+
+
+def strip_metadata(name, storage=None):
+    """
+    Rewrite the original `name` in place without its EXIF (camera, GPS) and
+    XMP metadata, baking the EXIF orientation into the pixels. JPEGs that
+    need no rotation keep their quantization tables, so they are not
+    degraded further. Returns False if there was nothing to strip.
+    """
+    storage = storage or get_blob_storage()
+    with storage.open(name, "rb") as original:
+        image = Image.open(original)
+        file_format = image.format
+        if file_format not in ("JPEG", "PNG", "WEBP") or getattr(image, "is_animated", False):
+            return False
+        exif = image.getexif()
+        if not exif and "xmp" not in image.info and "XML:com.adobe.xmp" not in image.info:
+            return False
+        # save() only writes the metadata it is given; keep the colour profile.
+        options = {"icc_profile": image.info.get("icc_profile")}
+        if file_format == "JPEG" and exif.get(ExifTags.Base.Orientation, 1) == 1:
+            options["quality"] = "keep"
+        else:
+            image = ImageOps.exif_transpose(image)
+            if file_format != "PNG":
+                options["quality"] = 92
+        buffer = io.BytesIO()
+        image.save(buffer, file_format, **options)
+
+    storage.replace(name, ContentFile(buffer.getvalue()))
+    return True
+
+
+def encode(image, extension):
+    file_format, options = FORMATS[extension]
+    if image.mode == "RGBA" and file_format == "JPEG":
+        image = flatten(image)
+    buffer = io.BytesIO()
+    image.save(buffer, file_format, **options)
+    return buffer.getvalue()
+
+
+def generate_derivatives(name, storage=None):
+    """
+    Render and store every size and format of the original `name`,
+    replacing earlier renders, and return the `image_derivatives` mapping.
+    Raises OSError (including FileNotFoundError) if the original cannot be read.
+    """
+    storage = storage or default_storage
+    image = open_original(name)
+    derivatives = {}
+    # Largest first: each size is resized from the previous one, which is
+    # much cheaper than resizing the original again.
+    for size, edge in sorted(SIZES.items(), key=lambda item: item[1], reverse=True):
+        if image.width > edge or image.height > edge:
+            image = image.copy()
+            image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        entry = {"width": image.width, "height": image.height}
+        for extension in FORMATS:
+            target = derivative_name(name, size, extension)
+            if storage.exists(target):
+                storage.delete(target)
+            entry[extension] = storage.save(target, ContentFile(encode(image, extension)))
+        derivatives[size] = entry
+    return {size: derivatives[size] for size in SIZES}
+
+
+def delete_derivatives(derivatives, keep=None, storage=None, shared=False):
+    """
+    Delete the stored files of an `image_derivatives` mapping, except those
+    also referenced by `keep`. Derivatives of blobs are shared and are only
+    deleted along with their blob (`shared=True`).
+    """
+    storage = storage or default_storage
+    kept = {
+        entry.get(extension) for entry in (keep or {}).values() for extension in FORMATS
+    }
+    for entry in (derivatives or {}).values():
+        for extension in FORMATS:
+            name = entry.get(extension)
+            if not name or name in kept:
+                continue
+            if shared or not name.startswith(f"{DERIVATIVE_ROOT}/{BLOB_ROOT}/"):
+                storage.delete(name)
@@ -0,0 +1,103 @@
+"""
+Report how much disk space content-addressed storage saves.
+
+Deduplicated uploads are counted once on disk but once per reference
+logically; the difference (plus the derivatives that did not have to be
+rendered again) is the space reclaimed.
+"""
+import posixpath
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from media_assets.blobs import count_references, delete_blob_files
+from media_assets.derivatives import FORMATS
+from media_assets.models import Blob
+from media_assets.storage import BLOB_ROOT, get_blob_storage
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def walk(storage, path):
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield posixpath.join(path, name)
+    for directory in directories:
+        yield from walk(storage, posixpath.join(path, directory))
+
+
+class Command(BaseCommand):
+    help = "Show disk space reclaimed by deduplicated uploads; optionally repair reference counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recount", action="store_true",
+            help="Recount references from the image fields and delete blobs that are no longer referenced.",
+        )
+        parser.add_argument(
+            "--delete-orphans", action="store_true",
+            help="Delete files under blobs/ that have no Blob row (left by failed uploads).",
+        )
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            self.recount()
+
+        totals = Blob.objects.aggregate(
+            blobs=Count("id"), references=Sum("ref_count"), stored=Sum("size"), logical=Sum(F("size") * F("ref_count")),
+        )
+        stored, logical = totals["stored"] or 0, totals["logical"] or 0
+        derivatives_saved = 0
+        for blob in Blob.objects.filter(ref_count__gt=1).exclude(derivatives={}).iterator():
+            for entry in blob.derivatives.values():
+                for extension in FORMATS:
+                    if default_storage.exists(entry[extension]):
+                        derivatives_saved += default_storage.size(entry[extension]) * (blob.ref_count - 1)
+
+        self.stdout.write(f"Blobs:              {totals['blobs'] or 0:,}")
+        self.stdout.write(f"References:         {totals['references'] or 0:,}")
+        self.stdout.write(f"Stored originals:   {format_bytes(stored)}")
+        self.stdout.write(f"Without dedupe:     {format_bytes(logical)}")
+        self.stdout.write(f"Derivatives shared: {format_bytes(derivatives_saved)}")
+        self.stdout.write(self.style.SUCCESS(f"Reclaimed:          {format_bytes(logical - stored + derivatives_saved)}"))
+        self.report_orphans(options["delete_orphans"])
+
+    def recount(self):
+        counts = count_references()
+        with transaction.atomic():
+            blobs = list(Blob.objects.select_for_update())
+            drifted = [blob for blob in blobs if blob.ref_count != counts.get(blob.name, 0)]
+            for blob in drifted:
+                blob.ref_count = counts.get(blob.name, 0)
+            Blob.objects.bulk_update(drifted, ["ref_count"])
+            unreferenced = [blob for blob in blobs if not blob.ref_count]
+            Blob.objects.filter(pk__in=[blob.pk for blob in unreferenced]).delete()
+            transaction.on_commit(lambda: delete_blob_files(unreferenced))
+        self.stdout.write(f"Fixed {len(drifted)} reference counts, deleted {len(unreferenced)} unreferenced blobs.")
+
+    def report_orphans(self, delete):
+        storage = get_blob_storage()
+        if not storage.exists(BLOB_ROOT):
+            return
+        known = set(Blob.objects.values_list("name", flat=True))
+        # Recent files may belong to an upload whose row is not saved yet.
+        cutoff = timezone.now() - timedelta(hours=1)
+        orphans = [
+            name for name in walk(storage, BLOB_ROOT)
+            if name not in known and storage.get_modified_time(name) < cutoff
+        ]
+        size = sum(storage.size(name) for name in orphans)
+        self.stdout.write(f"Orphaned files:     {len(orphans):,} ({format_bytes(size)})")
+        if delete:
+            for name in orphans:
+                storage.delete(name)
+            self.stdout.write(self.style.SUCCESS(f"Deleted {len(orphans):,} orphaned files."))
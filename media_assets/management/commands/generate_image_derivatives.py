@@ -0,0 +1,76 @@
+"""
+Backfill image derivatives for existing media.
+
+Images are decoded and resized in a process pool (one worker per core by
+default); the database is only read and written from this process. Each
+blob is stripped of its metadata and rendered once, and its derivatives are
+shared by its duplicates.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from media_assets.blobs import shared_derivatives, store_derivatives
+from media_assets.derivatives import IMAGE_FIELDS, delete_derivatives
+from media_assets.processing import process_original
+
+
+class Command(BaseCommand):
+    help = "Generate missing thumbnail/card/detail derivatives for uploaded images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--force", action="store_true", help="Regenerate images that already have derivatives.")
+        parser.add_argument("--model", choices=sorted(IMAGE_FIELDS), action="append", help="Only these models.")
+
+    def handle(self, *args, **options):
+        with ProcessPoolExecutor(max_workers=options["workers"], initializer=django.setup) as pool:
+            for label in options["model"] or IMAGE_FIELDS:
+                generated, failed = self.backfill(pool, label, options["batch_size"], options["force"])
+                self.stdout.write(f"{label}: {generated} generated, {failed} failed.")
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def backfill(self, pool, label, batch_size, force):
+        model = apps.get_model(label)
+        field = IMAGE_FIELDS[label]
+        queryset = model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+        if not force:
+            queryset = queryset.filter(image_derivatives={})
+        if label == "product.ProductImage":
+            # Queued uploads belong to the `process_images` worker.
+            queryset = queryset.exclude(processing_status__in=("pending", "processing"))
+
+        generated = failed = 0
+        last_pk = 0
+        while True:
+            # Keyset batches, so rows updated along the way are not skipped or revisited.
+            rows = list(queryset.filter(pk__gt=last_pk).order_by("pk").only("pk", field, "image_derivatives")[:batch_size])
+            if not rows:
+                return generated, failed
+            last_pk = rows[-1].pk
+            names = [getattr(row, field).name for row in rows]
+            results = {}
+            if not force:
+                results = {name: (derivatives, None) for name, derivatives in shared_derivatives(names).items()}
+            pending = sorted(set(names) - results.keys())
+            for name, (derivatives, error) in zip(pending, pool.map(process_original, pending)):
+                results[name] = (derivatives, error)
+                if not error:
+                    store_derivatives(name, derivatives)
+
+            updated = []
+            for row, name in zip(rows, names):
+                derivatives, error = results[name]
+                if error:
+                    failed += 1
+                    self.stderr.write(f"{label} {row.pk} ({name}): {error}")
+                    continue
+                delete_derivatives(row.image_derivatives, keep=derivatives)
+                row.image_derivatives = derivatives
+                updated.append(row)
+            model.objects.bulk_update(updated, ["image_derivatives"])
+            generated += len(updated)
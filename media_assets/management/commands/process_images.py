@@ -0,0 +1,37 @@
+"""
+Process uploaded product images queued by create_product_with_images and
+the image endpoints.
+
+Run it from cron (`process_images`) or as a long-lived worker
+(`process_images --loop`).
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from media_assets.processing import process_batch
+
+
+class Command(BaseCommand):
+    help = "Strip metadata from and render derivatives for pending product images on a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new uploads.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when nothing is queued.")
+
+    def handle(self, *args, **options):
+        total = 0
+        with ProcessPoolExecutor(max_workers=options["workers"], initializer=django.setup) as pool:
+            while True:
+                processed = process_batch(pool, options["batch_size"])
+                total += processed
+                if processed < options["batch_size"]:
+                    if not options["loop"]:
+                        break
+                    time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} images."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_assets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blob',
+            name='stripped',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class Blob(models.Model):
+    """
+    One content-addressed upload (see media_assets.storage), shared by every
+    image field that references it. Maintained by media_assets.signals.
+    """
+    name = models.CharField(max_length=100, unique=True)  # blobs/ab/cd/<sha256>.<ext>
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    # Camera/GPS metadata removed from the file (derivatives.strip_metadata);
+    # only then are its derivatives reused by new references.
+    stripped = models.BooleanField(default=False)
+    # Resized copies, rendered once per blob and copied to each referencing row.
+    derivatives = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
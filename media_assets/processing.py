@@ -0,0 +1,84 @@
+"""
+Off-request processing of uploaded product images.
+
+Uploads only persist the original; new ProductImage rows start as
+`processing_status="pending"`, which is the queue. The `process_images`
+worker claims batches from it and, on a bounded process pool, strips the
+original's metadata and renders its derivatives. Blobs that were already
+processed (duplicate uploads) are not rendered again. Results are written
+back per image, only if the image was not replaced in the meantime.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from product.models import Product, ProductImage
+from .blobs import shared_derivatives, store_derivatives
+from .derivatives import delete_derivatives, generate_derivatives, strip_metadata
+
+
+def claim_batch(batch_size):
+    """
+    Mark up to `batch_size` pending images as processing and return them.
+    Images stuck in "processing" longer than IMAGE_PROCESSING_LEASE seconds
+    (a crashed worker) are claimed again.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, "IMAGE_PROCESSING_LEASE", 600))
+    with transaction.atomic():
+        queued = ProductImage.objects.filter(processing_status="pending") | ProductImage.objects.filter(
+            processing_status="processing", processing_updated_at__lt=stale
+        )
+        ids = list(queued.select_for_update(skip_locked=True).order_by("id").values_list("id", flat=True)[:batch_size])
+        ProductImage.objects.filter(id__in=ids).update(processing_status="processing", processing_updated_at=now)
+    return list(ProductImage.objects.filter(id__in=ids).order_by("id"))
+
+
+def process_original(name):
+    """
+    Pool task: returns (derivatives, error) for one uploaded original.
+    """
+    try:
+        strip_metadata(name)
+        return generate_derivatives(name), None
+    except (OSError, Image.DecompressionBombError) as exc:  # includes missing and unreadable files
+        return None, f"{type(exc).__name__}: {exc}"
+
+
+def process_batch(pool, batch_size=20):
+    """
+    Process one batch of queued images on `pool` (an Executor). Returns the
+    number of images claimed.
+    """
+    images = claim_batch(batch_size)
+    if not images:
+        return 0
+
+    names = [image.image.name for image in images]
+    # Render each distinct blob once; duplicates of processed uploads are reused.
+    results = {name: (derivatives, None) for name, derivatives in shared_derivatives(names).items()}
+    pending = sorted(set(names) - results.keys())
+    for name, (derivatives, error) in zip(pending, pool.map(process_original, pending)):
+        results[name] = (derivatives, error)
+        if not error:
+            store_derivatives(name, derivatives)
+
+    touched = set()
+    for image, name in zip(images, names):
+        derivatives, error = results[name]
+        values = {"processing_updated_at": timezone.now()}
+        if error:
+            values.update(processing_status="failed", processing_error=error)
+        else:
+            values.update(processing_status="ready", processing_error="", image_derivatives=derivatives)
+        # A replaced image has been queued again; its result would be stale.
+        if ProductImage.objects.filter(pk=image.pk, image=name, processing_status="processing").update(**values):
+            touched.add(image.product_id)
+            if not error:
+                delete_derivatives(image.image_derivatives, keep=derivatives)
+    # Product.updated_at doubles as the version used for ETag/Last-Modified.
+    Product.objects.filter(pk__in=touched).update(updated_at=timezone.now())
+    return len(images)
@@ -0,0 +1,47 @@
+"""
+Serializer fields exposing image derivatives to API clients.
+"""
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from .derivatives import FORMATS
+
+
+class ImageSrcsetField(serializers.ReadOnlyField):
+    """
+    Represents an `image_derivatives` mapping as ready-to-use `srcset`
+    strings per format, plus the URL and dimensions of every size:
+
+        {"webp": "<url> 160w, <url> 480w, ...", "jpeg": "...",
+         "sizes": {"thumbnail": {"width": 160, "height": 120, "webp": "<url>", "jpeg": "<url>"}, ...}}
+
+    `None` until the derivatives have been generated.
+    """
+
+    def to_representation(self, derivatives):
+        if not derivatives:
+            return None
+        request = self.context.get("request")
+
+        def url(name):
+            url = default_storage.url(name)
+            return request.build_absolute_uri(url) if request else url
+
+        sizes = {
+            size: {
+                "width": entry["width"],
+                "height": entry["height"],
+                **{extension: url(entry[extension]) for extension in FORMATS},
+            }
+            for size, entry in derivatives.items()
+        }
+        representation = {}
+        for extension in FORMATS:
+            # Small originals are not upscaled, so several sizes can share a
+            # width; srcset candidates must have distinct descriptors.
+            candidates = {}
+            for entry in sizes.values():
+                candidates.setdefault(entry["width"], entry[extension])
+            representation[extension] = ", ".join(f"{url} {width}w" for width, url in candidates.items())
+        representation["sizes"] = sizes
+        return representation
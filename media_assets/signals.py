@@ -0,0 +1,148 @@
+"""
+Signal handlers that count blob references and keep image derivatives in
+sync with uploads.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from PIL import Image
+
+from banner.models import Banner
+from brand.models import Brand
+from category.models import Category
+from config.caching import bump_version
+from product.models import ProductImage
+from site_setting.models import SiteSetting
+from .blobs import BLOB_FIELDS, acquire, release, shared_derivatives, store_derivatives
+from .derivatives import IMAGE_FIELDS, delete_derivatives, generate_derivatives, strip_metadata
+
+
+logger = logging.getLogger(__name__)
+
+# Cached API namespaces (see config.caching) that render image_derivatives.
+CACHE_NAMESPACES = {
+    "category.Category": "categories",
+    "brand.Brand": "brands",
+}
+
+
+def file_name(instance, field):
+    # Read __dict__ so deferred fields are not fetched.
+    value = instance.__dict__.get(field)
+    return getattr(value, "name", value) or ""
+
+
+def image_name(instance):
+    return file_name(instance, IMAGE_FIELDS[instance._meta.label])
+
+
+def blob_names(instance):
+    return [file_name(instance, field) for field in BLOB_FIELDS[instance._meta.label]]
+
+
+# Blob references are connected first, so a blob exists before its
+# derivatives are stored on it.
+
+@receiver(post_init, sender=ProductImage)
+@receiver(post_init, sender=Banner)
+@receiver(post_init, sender=Category)
+@receiver(post_init, sender=Brand)
+@receiver(post_init, sender=SiteSetting)
+def remember_blob_names(sender, instance, **kwargs):
+    instance._blob_names = blob_names(instance)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_save, sender=Banner)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=SiteSetting)
+def update_blob_references(sender, instance, **kwargs):
+    names = blob_names(instance)
+    changed = [(old, new) for old, new in zip(instance._blob_names, names) if old != new]
+    instance._blob_names = names
+    if changed:
+        acquire(new for _, new in changed)
+        release(old for old, _ in changed)
+
+
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_delete, sender=Banner)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Brand)
+@receiver(post_delete, sender=SiteSetting)
+def release_blob_references(sender, instance, **kwargs):
+    release(blob_names(instance))
+
+
+@receiver(post_init, sender=ProductImage)
+@receiver(post_init, sender=Banner)
+@receiver(post_init, sender=Category)
+@receiver(post_init, sender=Brand)
+def remember_image_name(sender, instance, **kwargs):
+    instance._derived_image = image_name(instance)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_save, sender=Banner)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Brand)
+def update_image_derivatives(sender, instance, raw=False, **kwargs):
+    name = image_name(instance)
+    if raw or name == instance._derived_image:
+        return
+    instance._derived_image = name
+    if sender is ProductImage:
+        queue_product_image(instance)
+        return
+
+    derivatives = shared_derivatives([name]).get(name, {})
+    if name and not derivatives:
+        try:
+            strip_metadata(name)
+            derivatives = generate_derivatives(name)
+            store_derivatives(name, derivatives)
+        except FileNotFoundError:
+            pass
+        except (OSError, Image.DecompressionBombError):  # includes unreadable images
+            logger.warning("Could not generate derivatives for %s.", name, exc_info=True)
+    if not (derivatives or instance.image_derivatives):
+        return
+    delete_derivatives(instance.image_derivatives, keep=derivatives)
+    instance.image_derivatives = derivatives
+    # update() so the save signals do not fire again.
+    sender.objects.filter(pk=instance.pk).update(image_derivatives=derivatives)
+    namespace = CACHE_NAMESPACES.get(sender._meta.label)
+    if namespace:
+        # The model's own handler bumped the version before rendering started;
+        # responses cached meanwhile have no srcset.
+        transaction.on_commit(lambda: bump_version(namespace))
+
+
+def queue_product_image(image):
+    # Product images are processed off-request by the `process_images` worker
+    # (see media_assets.processing); new rows are already pending. A
+    # duplicate of an already processed (stripped) upload is ready straight away.
+    derivatives = shared_derivatives([image_name(image)])
+    if derivatives:
+        values = {"processing_status": "ready", "image_derivatives": next(iter(derivatives.values()))}
+    elif image.processing_status != "pending":
+        values = {"processing_status": "pending"}
+    else:
+        return
+    values["processing_error"] = ""
+    if "image_derivatives" in values:
+        delete_derivatives(image.image_derivatives, keep=values["image_derivatives"])
+    for field, value in values.items():
+        setattr(image, field, value)
+    ProductImage.objects.filter(pk=image.pk).update(**values)
+
+
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_delete, sender=Banner)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Brand)
+def remove_image_derivatives(sender, instance, **kwargs):
+    delete_derivatives(instance.image_derivatives)
@@ -0,0 +1,67 @@
+"""
+Content-addressed storage for uploaded images.
+
+Files are stored as `blobs/ab/cd/<sha256><ext>`, named after the SHA-256 of
+the uploaded bytes, so identical uploads share one file (and one set of
+derivatives). The name passed to save() (from the field's upload_to) is
+only used for its extension. References are counted in Blob rows by
+media_assets.signals.
+"""
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+
+
+BLOB_ROOT = "blobs"
+
+
+def get_blob_storage():
+    return storages["blobs"]
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(f"{BLOB_ROOT}/")
+
+
+def content_digest(content):
+    """
+    SHA-256 hex digest of a file, read in chunks so it is never fully in memory.
+    """
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStorage(FileSystemStorage):
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        digest = content_digest(content)
+        extension = posixpath.splitext(name)[1].lower()
+        blob = f"{BLOB_ROOT}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+        if not self.exists(blob):
+            saved = self._save(blob, content)
+            if saved != blob:
+                # Stored concurrently by another upload of the same bytes.
+                self.delete(saved)
+        return blob
+
+    def replace(self, name, content):
+        """
+        Atomically overwrite the file `name` in place (used to strip metadata
+        from an original; the name keeps identifying the uploaded content).
+        """
+        path = self.path(name)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as destination:
+            for chunk in content.chunks():
+                destination.write(chunk)
+        if self.file_permissions_mode is not None:
+            os.chmod(temporary, self.file_permissions_mode)
+        os.replace(temporary, path)
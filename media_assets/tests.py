@@ -0,0 +1,330 @@
+"""
+Tests for the image derivative pipeline.
+"""
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import ExifTags, Image
+from rest_framework.test import APIClient
+
+from banner.models import Banner
+from brand.models import Brand
+from category.models import Category
+from media_assets.derivatives import generate_derivatives
+from media_assets.models import Blob
+from media_assets.storage import get_blob_storage
+from product.models import Product, ProductImage
+from site_setting.models import SiteSetting
+from user.models import User
+
+
+def image_upload(name, size=(2400, 1600), mode="RGB", file_format="JPEG", color=(255, 0, 0, 128), exif=None):
+    buffer = io.BytesIO()
+    options = {"exif": exif.tobytes()} if exif else {}
+    Image.new(mode, size, color[:len(mode)]).save(buffer, file_format, **options)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f"image/{file_format.lower()}")
+
+
+def process_images():
+    call_command("process_images", "--workers", "1", stdout=io.StringIO())
+
+
+class MediaTestMixin:
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.category = Category.objects.create(name="Shirts", slug="shirts")
+        self.brand = Brand.objects.create(name="Acme", slug="acme")
+        self.product = Product.objects.create(
+            name="Shirt", slug="shirt", category=self.category, brand=self.brand,
+            description="Cotton", sku="SKU1", price="10.00",
+        )
+
+
+class ImageDerivativeTest(MediaTestMixin, TestCase):
+    def test_upload_generates_sizes_and_formats(self):
+        image = ProductImage.objects.create(product=self.product, image=image_upload("shirt.jpg"), is_primary=True)
+        process_images()
+        image.refresh_from_db()
+        derivatives = image.image_derivatives
+        self.assertEqual(list(derivatives), ["thumbnail", "card", "detail"])
+        self.assertEqual((derivatives["detail"]["width"], derivatives["detail"]["height"]), (1200, 800))
+        self.assertEqual(derivatives["thumbnail"]["width"], 160)
+        with default_storage.open(derivatives["card"]["webp"]) as webp:
+            self.assertEqual(Image.open(webp).format, "WEBP")
+        with default_storage.open(derivatives["card"]["jpeg"]) as jpeg:
+            self.assertEqual(Image.open(jpeg).size, (480, 320))
+
+    def test_transparent_logo_is_flattened_for_jpeg_only(self):
+        brand = Brand.objects.create(
+            name="Logo", slug="logo", brand_img=image_upload("logo.png", (300, 100), "RGBA", "PNG"),
+        )
+        card = brand.image_derivatives["card"]
+        self.assertEqual(card["width"], 300)  # never upscaled
+        with default_storage.open(card["webp"]) as webp:
+            self.assertEqual(Image.open(webp).mode, "RGBA")
+        with default_storage.open(card["jpeg"]) as jpeg:
+            self.assertEqual(Image.open(jpeg).mode, "RGB")
+
+    def test_responses_cached_while_rendering_are_invalidated(self):
+        client = APIClient()
+
+        def render_during_request(name):
+            client.get("/categories/")  # cached under the version bumped on save
+            return generate_derivatives(name)
+
+        with mock.patch("media_assets.signals.generate_derivatives", side_effect=render_during_request):
+            with self.captureOnCommitCallbacks(execute=True):
+                Category.objects.create(name="Hats", slug="hats", image=image_upload("hats.jpg"))
+        hats = next(row for row in client.get("/categories/").data["results"] if row["slug"] == "hats")
+        self.assertIsNotNone(hats["image_srcset"])
+
+    def test_replacing_or_deleting_image_removes_old_derivatives(self):
+        banner = Banner.objects.create(image=image_upload("a.jpg"), url="/", label="Sale")
+        old = banner.image_derivatives["detail"]["webp"]
+        with self.captureOnCommitCallbacks(execute=True):
+            banner.image = image_upload("b.jpg", color=(0, 0, 255))
+            banner.save()
+        self.assertFalse(default_storage.exists(old))
+        new = banner.image_derivatives["detail"]["webp"]
+        self.assertTrue(default_storage.exists(new))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            banner.delete()
+        self.assertFalse(default_storage.exists(new))
+
+    def test_card_and_detail_expose_srcset(self):
+        ProductImage.objects.create(product=self.product, image=image_upload("shirt.jpg"), is_primary=True)
+        process_images()
+        client = APIClient()
+
+        card = client.get("/products/", {"view": "card"}).data["results"][0]
+        srcset = card["primary_image_srcset"]
+        self.assertRegex(srcset["webp"], r"^http://testserver/media/derivatives/blobs/\S+-thumbnail\.webp 160w, ")
+        self.assertTrue(srcset["jpeg"].endswith(" 1200w"))
+        self.assertEqual(srcset["sizes"]["card"]["width"], 480)
+
+        detail = client.get(f"/products/{self.product.pk}/").data
+        self.assertEqual(detail["images"][0]["image_srcset"], srcset)
+
+    def test_backfill_command(self):
+        image = ProductImage.objects.create(product=self.product, image=image_upload("shirt.jpg"))
+        missing = ProductImage.objects.create(product=self.product, image="products/missing.jpg")
+        ProductImage.objects.update(processing_status="ready")
+
+        call_command("generate_image_derivatives", "--workers", "2", stdout=io.StringIO(), stderr=io.StringIO())
+        image.refresh_from_db()
+        missing.refresh_from_db()
+        self.assertEqual(image.image_derivatives["card"]["width"], 480)
+        self.assertEqual(missing.image_derivatives, {})
+
+
+class ProductImageProcessingTest(MediaTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        admin = User.objects.create_user(phone_number="+8801712345678", password="pass")
+        admin.is_staff = True
+        admin.save()
+        self.client.force_authenticate(admin)
+
+    def test_upload_returns_before_processing_and_status_can_be_polled(self):
+        exif = Image.Exif()
+        exif[ExifTags.Base.Make] = "Camera"
+        exif[ExifTags.Base.Orientation] = 6  # rotated 90 degrees
+        response = self.client.post("/products/create/", {
+            "name": "Jacket", "slug": "jacket", "category": self.category.pk, "brand": self.brand.pk,
+            "description": "Warm", "sku": "SKU2", "price": "50.00",
+            "images": '[{"alt_text": "Front"}, {"alt_text": "Back"}]',
+            "image_0": image_upload("front.jpg", exif=exif),
+            "image_1": image_upload("back.png", file_format="PNG"),
+        }, format="multipart")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([image["processing_status"] for image in response.data["images"]], ["pending", "pending"])
+        self.assertIsNone(response.data["images"][0]["image_srcset"])
+
+        status_url = f"/products/{response.data['id']}/images/status/"
+        self.assertEqual(self.client.get(status_url).data["status"], "processing")
+        process_images()
+        status = self.client.get(status_url).data
+        self.assertEqual(status["status"], "ready")
+        front = status["images"][0]
+        self.assertEqual(front["image_srcset"]["sizes"]["detail"]["height"], 1200)
+
+        with default_storage.open(ProductImage.objects.get(pk=front["id"]).image.name) as original:
+            original = Image.open(original)
+            self.assertEqual(original.size, (1600, 2400))
+            self.assertFalse(original.getexif())
+
+    def test_unreadable_upload_fails(self):
+        image = ProductImage.objects.create(product=self.product, image="products/missing.jpg")
+        process_images()
+        image.refresh_from_db()
+        self.assertEqual(image.processing_status, "failed")
+        self.assertIn("FileNotFoundError", image.processing_error)
+        response = self.client.get(f"/products/{self.product.pk}/images/status/")
+        self.assertEqual(response.data["status"], "failed")
+
+        # Uploading a new file queues the image again.
+        image.image = image_upload("fixed.jpg")
+        image.save()
+        process_images()
+        image.refresh_from_db()
+        self.assertEqual((image.processing_status, image.processing_error), ("ready", ""))
+
+
+class BlobStorageTest(MediaTestMixin, TestCase):
+    def test_duplicate_uploads_share_one_file_and_derivatives(self):
+        first = ProductImage.objects.create(product=self.product, image=image_upload("front.jpg"))
+        banner = Banner.objects.create(image=image_upload("banner.JPG"), url="/", label="Sale")
+        self.assertEqual(first.image.name, banner.image.name)
+        self.assertRegex(first.image.name, r"^blobs/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$")
+        self.assertEqual(Blob.objects.get().ref_count, 2)
+
+        process_images()
+        first.refresh_from_db()
+        # The banner's derivatives were rendered on upload and are reused.
+        self.assertEqual(first.image_derivatives, banner.image_derivatives)
+
+        # A duplicate of a processed upload is ready without rendering.
+        second = ProductImage.objects.create(product=self.product, image=image_upload("copy.jpg"))
+        self.assertEqual(second.processing_status, "ready")
+        self.assertEqual(second.image_derivatives, banner.image_derivatives)
+        self.assertEqual(Blob.objects.get().ref_count, 3)
+
+        derivative = banner.image_derivatives["card"]["webp"]
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+            banner.delete()
+        self.assertTrue(default_storage.exists(second.image.name))
+        self.assertTrue(default_storage.exists(derivative))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.delete()
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(default_storage.exists(second.image.name))
+        self.assertFalse(default_storage.exists(derivative))
+
+    def test_reused_derivatives_never_skip_stripping(self):
+        exif = Image.Exif()
+        exif[ExifTags.Base.Model] = "Cam"
+        banner = Banner.objects.create(image=image_upload("a.jpg", exif=exif), url="/", label="Sale")
+        with default_storage.open(banner.image.name) as original:
+            self.assertFalse(Image.open(original).getexif())
+
+        image = ProductImage.objects.create(product=self.product, image=image_upload("b.jpg", exif=exif))
+        self.assertEqual(image.image.name, banner.image.name)
+        self.assertEqual(image.processing_status, "ready")
+
+        # A blob rendered before it was stripped is processed again, not reused.
+        get_blob_storage().replace(banner.image.name, image_upload("c.jpg", exif=exif))
+        Blob.objects.update(stripped=False)
+        image = ProductImage.objects.create(product=self.product, image=image_upload("d.jpg", exif=exif))
+        self.assertEqual(image.processing_status, "pending")
+        process_images()
+        image.refresh_from_db()
+        self.assertEqual(image.processing_status, "ready")
+        with default_storage.open(image.image.name) as original:
+            self.assertFalse(Image.open(original).getexif())
+        self.assertTrue(Blob.objects.get().stripped)
+
+    def test_replaced_logo_releases_old_blob(self):
+        setting = SiteSetting.objects.create(
+            site_name="Shop", white_logo=image_upload("w.png", (64, 64), file_format="PNG"),
+            dark_logo=image_upload("d.png", (64, 64), file_format="PNG"),
+            favicon=image_upload("f.png", (64, 64), file_format="PNG", color=(0, 0, 0)),
+        )
+        self.assertEqual(setting.white_logo.name, setting.dark_logo.name)
+        self.assertEqual(sorted(Blob.objects.values_list("ref_count", flat=True)), [1, 2])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            setting.favicon = image_upload("f2.png", (32, 32), file_format="PNG")
+            setting.save()
+        self.assertEqual(Blob.objects.count(), 2)
+
+    def test_report_and_recount(self):
+        for idx in range(3):
+            ProductImage.objects.create(product=self.product, image=image_upload(f"{idx}.jpg"))
+        Blob.objects.update(ref_count=7)
+
+        out = io.StringIO()
+        call_command("blob_report", "--recount", stdout=out)
+        self.assertIn("Fixed 1 reference counts", out.getvalue())
+        self.assertEqual(Blob.objects.get().ref_count, 3)
+        size = Blob.objects.get().size
+        self.assertIn(f"Without dedupe:     {size * 3 / 1024:,.1f} KB", out.getvalue())
+        self.assertIn("Reclaimed:", out.getvalue())
+
+
+class MediaServingTest(MediaTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        banner = Banner.objects.create(image=image_upload("front.jpg"), url="/", label="Sale")
+        self.blob = banner.image.name
+        self.derivative = banner.image_derivatives["card"]["webp"]
+        with open(f"{self.media_root}/notes.txt", "w") as file:
+            file.write("0123456789")
+
+    def test_blob_derivatives_are_immutable(self):
+        response = self.client.get(f"/media/{self.derivative}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        with default_storage.open(self.derivative) as derivative:
+            self.assertEqual(b"".join(response.streaming_content), derivative.read())
+
+        not_modified = self.client.get(f"/media/{self.derivative}", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["Cache-Control"], "public, max-age=31536000, immutable")
+
+    def test_blob_originals_are_revalidated(self):
+        # Rewritten in place when their metadata is stripped.
+        response = self.client.get(f"/media/{self.blob}")
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+
+    def test_other_files_are_revalidated(self):
+        response = self.client.get("/media/notes.txt")
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+        since = self.client.get("/media/notes.txt", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(since.status_code, 304)
+        self.assertEqual(self.client.get("/media/../manage.py").status_code, 404)
+        self.assertEqual(self.client.get("/media/blobs/").status_code, 404)
+
+    def test_range_requests(self):
+        response = self.client.get("/media/notes.txt", HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+        self.assertEqual(response["Content-Length"], "4")
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+
+        suffix = self.client.get("/media/notes.txt", HTTP_RANGE="bytes=-3")
+        self.assertEqual(b"".join(suffix.streaming_content), b"789")
+        self.assertEqual(self.client.get("/media/notes.txt", HTTP_RANGE="bytes=8-").get("Content-Range"), "bytes 8-9/10")
+
+        unsatisfiable = self.client.get("/media/notes.txt", HTTP_RANGE="bytes=10-")
+        self.assertEqual(unsatisfiable.status_code, 416)
+        self.assertEqual(unsatisfiable["Content-Range"], "bytes */10")
+        # Several ranges, or an If-Range for an older version: the whole file.
+        self.assertEqual(self.client.get("/media/notes.txt", HTTP_RANGE="bytes=0-1,4-5").status_code, 200)
+        stale = self.client.get("/media/notes.txt", HTTP_RANGE="bytes=2-5", HTTP_IF_RANGE='"0-a"')
+        self.assertEqual(stale.status_code, 200)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT="/protected-media/")
+    def test_accel_redirect(self):
+        response = self.client.get(f"/media/{self.derivative}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.derivative}")
+        self.assertEqual(response.content, b"")
+        self.assertIn("immutable", response["Cache-Control"])
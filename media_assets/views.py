@@ -0,0 +1,159 @@
+"""
+Media file serving.
+
+Files are streamed from MEDIA_ROOT with FileResponse (which the WSGI server
+can hand to sendfile), with single byte-range requests, ETag/Last-Modified
+validators and long-lived caching for content-derived names. When
+MEDIA_ACCEL_REDIRECT is set, nginx sends the file instead: the view only
+checks the path and sets the headers.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .derivatives import DERIVATIVE_ROOT
+from .storage import BLOB_ROOT
+
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def is_immutable(path):
+    """
+    Derivatives of blobs are named after the uploaded bytes and carry no
+    metadata, so a name always serves the same image. Blob originals are
+    rewritten in place when their metadata is stripped, so they are
+    revalidated like any other file.
+    """
+    return path.startswith(f"{DERIVATIVE_ROOT}/{BLOB_ROOT}/")
+
+
+def file_etag(stats):
+    return f'"{int(stats.st_mtime):x}-{stats.st_size:x}"'
+
+
+def parse_range(header, size):
+    """
+    Return the inclusive (start, end) of a single `bytes=` range, or None to
+    send the whole file (no range, a malformed one or several ranges, which
+    RFC 9110 lets a server ignore). Raise RangeNotSatisfiable if the range
+    lies past the end of the file.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last `last` bytes.
+        length = int(last)
+        if not length or not size:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, min(end, size - 1)
+
+
+def range_applies(request, etag, last_modified):
+    """
+    Honour Range only if If-Range (when sent) still matches the file.
+    """
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def read_range(path, start, length):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def set_media_headers(response, path, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    if is_immutable(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=getattr(settings, "MEDIA_CACHE_MAX_AGE", 3600))
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve `path` from MEDIA_ROOT.
+    """
+    path = posixpath.normpath(path).lstrip("/")
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stats = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404("Media file not found.")
+    if not stat.S_ISREG(stats.st_mode):
+        raise Http404("Media file not found.")
+
+    etag = file_etag(stats)
+    last_modified = int(stats.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return set_media_headers(response, path, etag, last_modified)
+
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    accel_prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT", "")
+    if accel_prefix:
+        # nginx handles Range itself for internal redirects.
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = quote(f"{accel_prefix.rstrip('/')}/{path}")
+        return set_media_headers(response, path, etag, last_modified)
+
+    size = stats.st_size
+    byte_range = None
+    if "Range" in request.headers and range_applies(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers["Range"], size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return set_media_headers(response, path, etag, last_modified)
+
+    if byte_range is None:
+        response = FileResponse(open(full_path, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(full_path, start, end - start + 1), status=206, content_type=content_type,
+        )
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return set_media_headers(response, path, etag, last_modified)
@@ -4,7 +4,8 @@ from .models import Order, OrderItem
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-	list_display = ("id", "user", "status", "created_at", "updated_at")
+	list_display = ("id", "user", "status", "risk_level", "risk_score", "created_at", "updated_at")
+	list_filter = ("status", "risk_level")
 	search_fields = ("user__email", "status")
 
 @admin.register(OrderItem)
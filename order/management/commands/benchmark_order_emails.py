@@ -0,0 +1,53 @@
+"""
+Measure order notification email throughput: how fast status-change emails
+are queued, and how many the outbox worker delivers per minute to a local
+SMTP sink. Everything runs in a transaction that is rolled back, so the
+outbox is left untouched; use a development database.
+"""
+import time
+from decimal import Decimal
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from order.models import Order
+from order.notifications import build_status_email
+from smtp_mail.models import SMTPMail
+from smtp_mail.outbox import deliver_batch
+from smtp_mail.testing import LocalSMTPServer
+
+
+class Command(BaseCommand):
+    help = "Benchmark queueing and delivering order status emails against a local SMTP sink."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--emails", type=int, default=2000)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = options["emails"]
+        with LocalSMTPServer() as server, transaction.atomic():
+            order = Order(pk=1, status="shipped", total_amount=Decimal("99.00"), shipping_address="Dhaka")
+            start = time.perf_counter()
+            messages = [build_status_email(order, "processing", [f"customer{i}@example.com"]) for i in range(total)]
+            get_connection("smtp_mail.backends.OutboxEmailBackend").send_messages(messages)
+            queued = time.perf_counter() - start
+            self.stdout.write(f"Queued {total} emails in {queued:.2f}s ({total / queued:,.0f}/s)")
+
+            config = SMTPMail(
+                mailer="smtp", host=server.host, port=server.port, username="", password="",
+                encryption="none", from_address="shop@example.com", from_name="GlobeUp",
+            )
+            start = time.perf_counter()
+            sent = failed = 0
+            while True:
+                batch_sent, batch_failed = deliver_batch(options["batch_size"], config=config)
+                if not (batch_sent or batch_failed):
+                    break
+                sent, failed = sent + batch_sent, failed + batch_failed
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"Delivered {len(server.messages)} emails ({sent} sent, {failed} failed) in {elapsed:.2f}s")
+        self.stdout.write(self.style.SUCCESS(f"Throughput: {sent / elapsed * 60:,.0f} emails/minute"))
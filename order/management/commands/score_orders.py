@@ -0,0 +1,34 @@
+"""
+Score new orders for fraud risk in the background.
+
+Run it from cron (`score_orders`) or as a long-lived worker
+(`score_orders --loop`).
+"""
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from order.risk import score_batch
+
+
+class Command(BaseCommand):
+    help = "Score queued orders with the configured fraud providers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--workers", type=int, default=4, help="Orders scored concurrently.")
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new orders.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        levels = Counter()
+        while True:
+            orders = score_batch(options["batch_size"], options["workers"])
+            levels.update(order.risk_level for order in orders)
+            if len(orders) < options["batch_size"]:
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        summary = ", ".join(f"{count} {level}" for level, count in sorted(levels.items())) or "nothing to score"
+        self.stdout.write(self.style.SUCCESS(f"Scored orders: {summary}."))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='customer_ip',
+            field=models.GenericIPAddressField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='risk_level',
+            field=models.CharField(choices=[('unscored', 'Unscored'), ('scoring', 'Scoring'), ('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('unknown', 'Unknown')], default='unscored', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='risk_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='risk_scored_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['risk_level', 'created_at'], name='order_order_risk_le_4a7966_idx'),
+        ),
+    ]
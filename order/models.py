@@ -37,6 +37,27 @@ class Order(models.Model):
         max_length=20, blank=True, null=True
     )
 
+    # Fraud risk, filled in after checkout by the `score_orders` worker.
+    RISK_LEVEL_CHOICES = [
+        ("unscored", "Unscored"),
+        ("scoring", "Scoring"),
+        ("low", "Low"),
+        ("medium", "Medium"),
+        ("high", "High"),
+        ("unknown", "Unknown"),  # every provider failed; the order is not held
+    ]
+
+    customer_ip = models.GenericIPAddressField(blank=True, null=True)
+    risk_level = models.CharField(max_length=10, choices=RISK_LEVEL_CHOICES, default="unscored")
+    risk_score = models.FloatField(blank=True, null=True)
+    risk_scored_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # Serves both the scoring queue and the admin `?risk=` listing.
+            models.Index(fields=["risk_level", "created_at"]),
+        ]
+
 
 
 class OrderItem(models.Model):
@@ -0,0 +1,76 @@
+"""
+Customer email notifications for orders.
+
+Emails are built after the surrounding transaction commits
+(`transaction.on_commit`) and handed to the outbox email backend, so a
+request only pays for one extra INSERT; `send_queued_mail` delivers them.
+Orders without a customer email (guest checkout) are skipped. The hooks are
+robust: the order is already committed, so a failure to render or queue the
+email is logged instead of failing the request (which clients would retry,
+placing the order twice).
+"""
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from user.models import User
+
+
+def get_customer_email(order):
+    if not order.user_id:
+        return None
+    if "user" in order._state.fields_cache:
+        return order.user.email if order.user else None
+    return User.objects.filter(pk=order.user_id).values_list("email", flat=True).first()
+
+
+def build_email(template_name, subject, context, to):
+    html_body = render_to_string(template_name, context)
+    message = EmailMultiAlternatives(subject=subject, body=strip_tags(html_body), to=to)
+    message.attach_alternative(html_body, "text/html")
+    return message
+
+
+def build_confirmation_email(order, items, to):
+    """
+    `items` are (product, quantity, unit_price) tuples already in memory.
+    """
+    context = {
+        "order": order,
+        "items": [
+            {"name": product.name, "quantity": quantity, "price": price, "line_total": price * quantity}
+            for product, quantity, price in items
+        ],
+    }
+    return build_email("email/order_confirmation.html", f"Order #{order.pk} confirmed", context, to)
+
+
+def build_status_email(order, old_status, to):
+    context = {
+        "order": order,
+        "old_status": dict(order.STATUS_CHOICES).get(old_status, old_status),
+        "status": order.get_status_display(),
+    }
+    return build_email("email/order_status.html", f"Order #{order.pk} is {context['status'].lower()}", context, to)
+
+
+def queue_order_confirmation(order, items):
+    def send():
+        email = get_customer_email(order)
+        if email:
+            build_confirmation_email(order, items, [email]).send()
+
+    transaction.on_commit(send, robust=True)
+
+
+def queue_status_change(order, old_status):
+    if old_status == order.status:
+        return
+
+    def send():
+        email = get_customer_email(order)
+        if email:
+            build_status_email(order, old_status, [email]).send()
+
+    transaction.on_commit(send, robust=True)
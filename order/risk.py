@@ -0,0 +1,107 @@
+"""
+Post-checkout fraud scoring.
+
+Checkout only stores the customer's IP; new orders start as
+`risk_level="unscored"`, which is the scoring queue. The `score_orders`
+worker claims batches from it and scores each order with the FraudAPI
+providers (see fraud_api.checker) on a thread pool. It then stores the
+score and level in one bulk UPDATE. High-risk orders are held in `pending`
+until an admin overrides the hold.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from fraud_api import checker
+from fraud_api.models import FraudAPI
+from .models import Order
+
+HELD_STATUSES = ("processing", "shipped", "delivered")
+# Written by the scoring worker only; status updates must never save them.
+RISK_FIELDS = ("risk_level", "risk_score", "risk_scored_at")
+
+
+def risk_level_for(score):
+    if score is None:
+        return "unknown"
+    thresholds = getattr(settings, "FRAUD_RISK_THRESHOLDS", {"high": 75, "medium": 40})
+    if score >= thresholds["high"]:
+        return "high"
+    if score >= thresholds["medium"]:
+        return "medium"
+    return "low"
+
+
+def is_held(order, new_status):
+    """
+    High-risk orders may not leave `pending` (except to be cancelled).
+    """
+    return order.risk_level == "high" and new_status in HELD_STATUSES
+
+
+def lock_order(order):
+    """
+    Lock `order`'s row (inside a transaction) and refresh its risk fields
+    from it, so the hold check sees the worker's latest score. Returns the
+    locked row's status.
+    """
+    locked = Order.objects.select_for_update().only("status", *RISK_FIELDS).get(pk=order.pk)
+    for field in RISK_FIELDS:
+        setattr(order, field, getattr(locked, field))
+    return locked.status
+
+
+def claim_batch(batch_size):
+    """
+    Mark up to `batch_size` queued orders as being scored and return them.
+    Orders stuck in "scoring" longer than FRAUD_SCORING_LEASE seconds (a
+    crashed worker) are claimed again.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, "FRAUD_SCORING_LEASE", 300))
+    with transaction.atomic():
+        queued = Order.objects.filter(risk_level="unscored") | Order.objects.filter(
+            risk_level="scoring", risk_scored_at__lt=stale
+        )
+        ids = list(
+            queued.select_for_update(skip_locked=True).order_by("created_at").values_list("id", flat=True)[:batch_size]
+        )
+        Order.objects.filter(id__in=ids).update(risk_level="scoring", risk_scored_at=now)
+    return list(Order.objects.filter(id__in=ids).select_related("user").order_by("created_at"))
+
+
+def order_check_values(order):
+    user = order.user
+    return {
+        "ip": order.customer_ip,
+        "email": user.email if user else None,
+        "phone": order.customer_phone or order.customer_phone_orderedby_admin or (str(user.phone_number) if user else None),
+    }
+
+
+def score_batch(batch_size=100, workers=4):
+    """
+    Score one batch of queued orders. Returns the scored orders.
+    """
+    orders = claim_batch(batch_size)
+    if not orders:
+        return []
+
+    providers = list(FraudAPI.objects.all())
+
+    def score(order):
+        return checker.check(providers=providers, **order_check_values(order))["score"]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="order-scoring") as pool:
+        scores = list(pool.map(score, orders))
+
+    now = timezone.now()
+    for order, value in zip(orders, scores):
+        order.risk_score = value
+        order.risk_level = risk_level_for(value)
+        order.risk_scored_at = now
+    Order.objects.bulk_update(orders, ["risk_score", "risk_level", "risk_scored_at"])
+    return orders
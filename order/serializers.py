@@ -1,11 +1,16 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import Order, OrderItem
+from .notifications import queue_order_confirmation, queue_status_change
+from .risk import is_held, lock_order
+from .stock import InsufficientStock, apply_status_change, find_shortages, reserve_stock
 from product.models import Product
 
 
-# Orders can have multiple items, each with its own details
+# Orders can have multiple items, each with its own details.
+# Products are resolved for all items at once in OrderSerializer.validate_items.
 class OrderItemCreateSerializer(serializers.Serializer):
-    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
+    product = serializers.IntegerField(min_value=1)
     quantity = serializers.IntegerField(min_value=1)
 
 
@@ -15,7 +20,21 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = "__all__"
-        read_only_fields = ("id", "total_amount")
+        read_only_fields = ("id", "total_amount", "customer_ip", "risk_level", "risk_score", "risk_scored_at")
+
+    def validate_items(self, items):
+        """
+        Resolve every item's product id with a single `in_bulk` query.
+        """
+        products = Product.objects.in_bulk({item["product"] for item in items})
+        missing = sorted({item["product"] for item in items} - products.keys())
+        if missing:
+            raise serializers.ValidationError(
+                [f'Invalid pk "{pk}" - object does not exist.' for pk in missing]
+            )
+        for item in items:
+            item["product"] = products[item["product"]]
+        return items
 
     def create(self, validated_data):
         """
@@ -24,7 +43,9 @@ class OrderSerializer(serializers.ModelSerializer):
         so we pop `user` out if present to avoid passing it twice to
         `Order.objects.create()`.
 
-        Supports guest orders when `user` is None.
+        Supports guest orders when `user` is None. Stock is reserved and
+        the order and all of its items are inserted in one transaction;
+        the confirmation email is queued once it commits.
         """
         items_data = validated_data.pop("items", [])
 
@@ -33,25 +54,69 @@ class OrderSerializer(serializers.ModelSerializer):
         user = validated_data.pop("user", None)
 
         # Calculate total_amount
-        total = 0
+        total = sum(item["product"].price * item["quantity"] for item in items_data)
+
+        quantities = {}
         for item_data in items_data:
-            product = item_data["product"]
-            quantity = item_data["quantity"]
-            total += product.price * quantity
+            product_id = item_data["product"].pk
+            quantities[product_id] = quantities.get(product_id, 0) + item_data["quantity"]
 
-        order = Order.objects.create(user=user, total_amount=total, **validated_data)
+        try:
+            with transaction.atomic():
+                reserve_stock(quantities)
+                order = Order.objects.create(user=user, total_amount=total, **validated_data)
 
-        # Create order items
-        for item_data in items_data:
-            OrderItem.objects.create(
-                order=order,
-                product=item_data["product"],
-                quantity=item_data["quantity"],
-                price=item_data["product"].price,
-            )
+                # Create order items
+                OrderItem.objects.bulk_create([
+                    OrderItem(
+                        order=order,
+                        product=item_data["product"],
+                        quantity=item_data["quantity"],
+                        price=item_data["product"].price,
+                    )
+                    for item_data in items_data
+                ])
+                queue_order_confirmation(order, [
+                    (item_data["product"], item_data["quantity"], item_data["product"].price)
+                    for item_data in items_data
+                ])
+        except InsufficientStock:
+            raise self.out_of_stock_error(quantities)
+
+        return order
 
+    def update(self, instance, validated_data):
+        """
+        Update an order, releasing or re-reserving stock when the status
+        moves into or out of `cancelled`.
+        """
+        try:
+            with transaction.atomic():
+                # Lock the row so concurrent cancellations release stock only
+                # once, and check the hold against the current risk score.
+                old_status = lock_order(instance)
+                new_status = validated_data.get("status", old_status)
+                if new_status != old_status and is_held(instance, new_status) and not self.context.get("override_risk"):
+                    raise serializers.ValidationError({"status": ["This order is held for fraud review."]})
+                serializers.raise_errors_on_nested_writes("update", self, validated_data)
+                for attr, value in validated_data.items():
+                    setattr(instance, attr, value)
+                # Save only the submitted fields, never the worker's risk fields.
+                instance.save(update_fields=[*validated_data, "updated_at"])
+                order = instance
+                apply_status_change(order, old_status, order.status)
+                queue_status_change(order, old_status)
+        except InsufficientStock:
+            instance.refresh_from_db(fields=["status"])
+            raise serializers.ValidationError({"status": ["Not enough stock to reopen this order."]})
         return order
 
+    def out_of_stock_error(self, quantities):
+        names = [product.name for product in find_shortages(quantities)]
+        return serializers.ValidationError(
+            {"items": [f'Not enough stock for "{name}".' for name in names] or ["Not enough stock."]}
+        )
+
 
 class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,90 @@
+"""
+Stock reservation for orders.
+
+Stock is reserved with one conditional UPDATE
+(`stock = stock - n WHERE stock >= n`) covering every product of an order,
+so concurrent checkouts only take row locks and can never oversell. Both
+UPDATEs bump `updated_at`, so cached product responses revalidate.
+Callers must run these helpers inside `transaction.atomic()`.
+"""
+import operator
+from functools import reduce
+
+from django.db.models import Case, F, PositiveIntegerField, Q, Sum, When
+from django.db.models.functions import Now
+
+from product.models import Product
+
+
+class InsufficientStock(Exception):
+    """
+    Raised when at least one product of a reservation is out of stock.
+    The surrounding transaction must be rolled back.
+    """
+
+
+def reserve_stock(quantities):
+    """
+    Decrement stock for `{product_id: quantity}` all-or-nothing.
+    """
+    quantities = {pk: qty for pk, qty in quantities.items() if qty}
+    if not quantities:
+        return
+    in_stock = reduce(operator.or_, (Q(pk=pk, stock__gte=qty) for pk, qty in quantities.items()))
+    updated = Product.objects.filter(in_stock).update(
+        stock=Case(
+            *(When(pk=pk, then=F("stock") - qty) for pk, qty in quantities.items()),
+            default=F("stock"),
+            output_field=PositiveIntegerField(),
+        ),
+        # update() skips auto_now; product ETags depend on updated_at.
+        updated_at=Now(),
+    )
+    if updated != len(quantities):
+        raise InsufficientStock()
+
+
+def release_stock(quantities):
+    """
+    Give `{product_id: quantity}` back to stock in a single UPDATE.
+    """
+    quantities = {pk: qty for pk, qty in quantities.items() if qty}
+    if not quantities:
+        return
+    Product.objects.filter(pk__in=quantities).update(
+        stock=Case(
+            *(When(pk=pk, then=F("stock") + qty) for pk, qty in quantities.items()),
+            default=F("stock"),
+            output_field=PositiveIntegerField(),
+        ),
+        # update() skips auto_now; product ETags depend on updated_at.
+        updated_at=Now(),
+    )
+
+
+def find_shortages(quantities):
+    """
+    Return the products that cannot currently cover `{product_id: quantity}`.
+    Only used to build error messages after a failed reservation.
+    """
+    products = Product.objects.filter(pk__in=quantities).only("id", "name", "stock")
+    return [product for product in products if product.stock < quantities[product.pk]]
+
+
+def order_quantities(order):
+    """
+    Total quantity per product for an order's items.
+    """
+    rows = order.items.values("product").annotate(quantity=Sum("quantity"))
+    return {row["product"]: row["quantity"] for row in rows}
+
+
+def apply_status_change(order, old_status, new_status):
+    """
+    Release stock when an order is cancelled and reserve it again if a
+    cancelled order is reopened. Raises InsufficientStock in the latter case.
+    """
+    if old_status != "cancelled" and new_status == "cancelled":
+        release_stock(order_quantities(order))
+    elif old_status == "cancelled" and new_status != "cancelled":
+        reserve_stock(order_quantities(order))
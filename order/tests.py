@@ -1,3 +1,444 @@
+"""
+Tests for the order app.
+These tests ensure order listing and checkout behave and stay cheap to query.
+"""
+import json
+import threading
+import time
+from io import StringIO
+from unittest import mock
 
-# Tests for the order app.
-# Add test cases here to ensure order logic works as expected.
+from django.db import OperationalError, connection, transaction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from brand.models import Brand
+from config.throttling import TokenBucketThrottle
+from category.models import Category
+from ip_block.blocklist import blocklist
+from ip_block.models import BlockedIP
+from order.models import Order
+from order.serializers import OrderSerializer
+from order.stock import InsufficientStock, reserve_stock
+from product.models import Product
+from smtp_mail.models import OutboundEmail
+from user.models import User
+
+
+class OrderTestMixin:
+    def setUp(self):
+        cache.clear()  # rate limit buckets
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Shirts", slug="shirts")
+        self.brand = Brand.objects.create(name="Acme", slug="acme")
+        self.admin = User.objects.create_superuser(phone_number="+8801812345678", password="pass")
+
+    def create_product(self, idx, price="10.00", stock=100):
+        return Product.objects.create(
+            name=f"Shirt {idx}", slug=f"shirt-{idx}", category=self.category, brand=self.brand,
+            description="Cotton", sku=f"SKU{idx}", price=price, stock=stock,
+        )
+
+
+class AdminOrderListTest(OrderTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for idx in range(25):
+            Order.objects.create(total_amount=idx, shipping_address=f"Street {idx}")
+        self.client.force_authenticate(self.admin)
+
+    def test_listing_is_paginated(self):
+        response = self.client.get("/orders/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(response.data["results"][0]["shipping_address"], "Street 24")
+        self.assertIsNotNone(response.data["next"])
+
+    def test_streaming_returns_every_order(self):
+        response = self.client.get("/orders/", {"stream": "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        orders = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(orders), 25)
+        self.assertEqual(orders[-1]["shipping_address"], "Street 0")
+
+    def test_listing_requires_staff(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get("/orders/", {"stream": "1"}).status_code, 403)
+
+
+class CheckoutTest(OrderTestMixin, TestCase):
+    def checkout(self, lines):
+        payload = {
+            "shipping_address": "123 Main St",
+            "items": [{"product": product.pk, "quantity": quantity} for product, quantity in lines],
+        }
+        return self.client.post("/orders/", payload, format="json")
+
+    def test_checkout_creates_order_and_items(self):
+        shirt = self.create_product(1, price="10.00")
+        hat = self.create_product(2, price="2.50")
+        response = self.checkout([(shirt, 2), (hat, 4)])
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get(pk=response.data["id"])
+        self.assertEqual(order.total_amount, 30)
+        self.assertEqual(sorted(order.items.values_list("quantity", flat=True)), [2, 4])
+
+    def test_unknown_product_is_rejected(self):
+        response = self.client.post(
+            "/orders/", {"shipping_address": "x", "items": [{"product": 999, "quantity": 1}]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("items", response.data)
+        self.assertFalse(Order.objects.exists())
+
+    def test_query_count_is_constant_in_number_of_lines(self):
+        products = [self.create_product(idx) for idx in range(30)]
+
+        with self.assertNumQueries(6) as single:
+            self.checkout([(products[0], 1)])
+        with self.assertNumQueries(len(single.captured_queries)):
+            response = self.checkout([(product, 1) for product in products])
+        self.assertEqual(response.status_code, 201)
+
+
+class StockReservationTest(OrderTestMixin, TestCase):
+    def checkout(self, product, quantity):
+        return self.client.post(
+            "/orders/",
+            {"shipping_address": "x", "items": [{"product": product.pk, "quantity": quantity}]},
+            format="json",
+        )
+
+    def test_checkout_decrements_stock(self):
+        product = self.create_product(1, stock=5)
+        self.assertEqual(self.checkout(product, 3).status_code, 201)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 2)
+
+    def test_checkout_invalidates_product_etags(self):
+        product = self.create_product(1, stock=5)
+        urls = [f"/products/{product.pk}/", "/products/"]
+        etags = [self.client.get(url)["ETag"] for url in urls]
+        self.assertEqual(self.checkout(product, 2).status_code, 201)
+        for url, etag in zip(urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(urls[0]).data["stock"], 3)
+
+    def test_oversell_is_rejected_and_nothing_is_written(self):
+        product = self.create_product(1, stock=2)
+        other = self.create_product(2, stock=10)
+        response = self.client.post(
+            "/orders/",
+            {"shipping_address": "x", "items": [
+                {"product": other.pk, "quantity": 1}, {"product": product.pk, "quantity": 3},
+            ]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Shirt 1", str(response.data["items"]))
+        self.assertFalse(Order.objects.exists())
+        other.refresh_from_db()
+        self.assertEqual(other.stock, 10)
+
+    def test_cancel_releases_and_reopen_reserves_stock(self):
+        product = self.create_product(1, stock=5)
+        order_id = self.checkout(product, 5).data["id"]
+        self.client.force_authenticate(self.admin)
+
+        self.client.post(f"/orders/{order_id}/update-status/", {"status": "cancelled"}, format="json")
+        self.client.post(f"/orders/{order_id}/update-status/", {"status": "cancelled"}, format="json")
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 5)
+
+        self.checkout(product, 4)
+        response = self.client.post(f"/orders/{order_id}/update-status/", {"status": "pending"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Order.objects.get(pk=order_id).status, "cancelled")
+
+
+@override_settings(EMAIL_BACKEND="smtp_mail.backends.OutboxEmailBackend")
+class OrderNotificationTest(OrderTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.customer = User.objects.create_user(
+            phone_number="+8801712345678", email="customer@example.com", password="pass"
+        )
+        self.product = self.create_product(1, price="10.00")
+
+    def checkout(self):
+        return self.client.post(
+            "/orders/", {"shipping_address": "123 Main St", "items": [{"product": self.product.pk, "quantity": 2}]},
+            format="json",
+        )
+
+    def test_confirmation_is_queued_after_commit_with_one_insert(self):
+        self.client.force_authenticate(self.customer)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.checkout()
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(OutboundEmail.objects.exists())
+
+        with self.assertNumQueries(1):
+            for callback in callbacks:
+                callback()
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.to, ["customer@example.com"])
+        self.assertIn(f"Order #{response.data['id']}", email.subject)
+        self.assertIn("Shirt 1", email.html_body)
+
+    def test_email_failure_does_not_fail_the_committed_checkout(self):
+        self.client.force_authenticate(self.customer)
+        failing = mock.patch("order.notifications.build_confirmation_email", side_effect=RuntimeError("template"))
+        with failing, self.assertLogs(level="ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.checkout()
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Order.objects.filter(pk=response.data["id"]).exists())
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_guest_checkout_sends_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.checkout()
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_status_change_is_queued(self):
+        order = Order.objects.create(user=self.customer, total_amount="10.00", shipping_address="x")
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/orders/{order.pk}/update-status/", {"status": "shipped"}, format="json")
+            self.client.post(f"/orders/{order.pk}/update-status/", {"status": "shipped"}, format="json")
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.subject, f"Order #{order.pk} is shipped")
+        self.assertIn("Pending", email.body)
+
+
+class RiskScoringTest(OrderTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = self.create_product(1)
+
+    def checkout(self, ip):
+        return self.client.post(
+            "/orders/", {"shipping_address": "x", "items": [{"product": self.product.pk, "quantity": 1}]},
+            format="json", REMOTE_ADDR=ip,
+        )
+
+    def fake_check(self, ip=None, **kwargs):
+        return {"score": {"203.0.113.1": 90.0, "203.0.113.2": 10.0}.get(ip), "checks": []}
+
+    def score_orders(self):
+        with mock.patch("order.risk.checker.check", side_effect=self.fake_check):
+            call_command("score_orders", stdout=StringIO())
+
+    def test_orders_are_scored_in_the_background(self):
+        risky = self.checkout("203.0.113.1").data["id"]
+        safe = self.checkout("203.0.113.2").data["id"]
+        unknown = self.checkout("203.0.113.3").data["id"]
+        self.assertEqual(Order.objects.get(pk=risky).customer_ip, "203.0.113.1")
+        self.assertEqual(set(Order.objects.values_list("risk_level", flat=True)), {"unscored"})
+
+        self.score_orders()
+        levels = dict(Order.objects.values_list("id", "risk_level"))
+        self.assertEqual((levels[risky], levels[safe], levels[unknown]), ("high", "low", "unknown"))
+        self.assertEqual(Order.objects.get(pk=risky).risk_score, 90.0)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get("/orders/", {"risk": "high"})
+        self.assertEqual([order["id"] for order in response.data["results"]], [risky])
+        self.assertEqual(self.client.get("/orders/", {"risk": "bogus"}).status_code, 400)
+
+    def test_forged_forwarded_for_is_not_scored(self):
+        response = self.client.post(
+            "/orders/", {"shipping_address": "x", "items": [{"product": self.product.pk, "quantity": 1}]},
+            format="json", REMOTE_ADDR="203.0.113.1", HTTP_X_FORWARDED_FOR="203.0.113.2",
+        )
+        self.assertIsNone(Order.objects.get(pk=response.data["id"]).customer_ip)
+
+        with override_settings(TRUSTED_PROXIES=["10.0.0.0/8"]):
+            response = self.client.post(
+                "/orders/", {"shipping_address": "x", "items": [{"product": self.product.pk, "quantity": 1}]},
+                format="json", REMOTE_ADDR="10.0.0.2", HTTP_X_FORWARDED_FOR="203.0.113.2, 203.0.113.1",
+            )
+        self.assertEqual(Order.objects.get(pk=response.data["id"]).customer_ip, "203.0.113.1")
+
+    def test_high_risk_orders_are_held_in_pending(self):
+        order_id = self.checkout("203.0.113.1").data["id"]
+        self.score_orders()
+        self.client.force_authenticate(self.admin)
+        url = f"/orders/{order_id}/update-status/"
+
+        self.assertEqual(self.client.post(url, {"status": "shipped"}, format="json").status_code, 409)
+        self.assertEqual(self.client.put(f"/orders/{order_id}/", {"status": "shipped"}, format="json").status_code, 400)
+        self.assertEqual(self.client.post(url, {"status": "cancelled"}, format="json").status_code, 200)
+        response = self.client.post(url, {"status": "shipped", "override_risk": True}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Order.objects.get(pk=order_id).status, "shipped")
+
+    def test_hold_uses_the_latest_score(self):
+        order = Order.objects.get(pk=self.checkout("203.0.113.1").data["id"])  # loaded before scoring
+        self.score_orders()
+        serializer = OrderSerializer(order, data={"status": "shipped"}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        with self.assertRaises(ValidationError):
+            serializer.save()
+
+        serializer = OrderSerializer(order, data={"shipping_address": "y"}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        order.refresh_from_db()
+        self.assertEqual((order.risk_level, order.risk_score, order.shipping_address), ("high", 90.0, "y"))
+
+
+class ConcurrentReservationTest(OrderTestMixin, TransactionTestCase):
+    def test_no_oversell_under_concurrency(self):
+        product = self.create_product(1, stock=20)
+        outcomes = []
+
+        def buy():
+            try:
+                # SQLite serializes writers: retry lock errors instead of
+                # counting them, so every buyer gets a real answer.
+                for attempt in range(100):
+                    try:
+                        with transaction.atomic():
+                            reserve_stock({product.pk: 1})
+                    except OperationalError:
+                        time.sleep(0.005 * (attempt + 1))
+                        continue
+                    except InsufficientStock:
+                        outcomes.append("rejected")
+                    else:
+                        outcomes.append("sold")
+                    return
+                outcomes.append("locked")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy) for _ in range(60)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        product.refresh_from_db()
+        self.assertEqual(outcomes.count("locked"), 0)
+        self.assertEqual(outcomes.count("sold"), 20)
+        self.assertEqual(outcomes.count("rejected"), 40)
+        self.assertEqual(product.stock, 0)
+
+
+@override_settings(
+    REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {"checkout": "3/min", "auth": "2/min"}},
+    RATE_LIMIT_BLOCK_AFTER=2,
+)
+class RateLimitTest(OrderTestMixin, TestCase):
+    def tearDown(self):
+        for entry in BlockedIP.objects.all():
+            entry.delete()
+
+    def checkout(self, ip="198.51.100.10"):
+        return self.client.post("/orders/", {"shipping_address": "x", "items": []}, format="json", REMOTE_ADDR=ip)
+
+    def test_checkout_is_limited_per_ip_with_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.checkout().status_code, 201)
+        response = self.checkout()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+        self.assertEqual(self.checkout(ip="198.51.100.11").status_code, 201)
+
+    def test_forged_forwarded_for_does_not_reset_the_bucket(self):
+        statuses = [
+            self.client.post(
+                "/orders/", {"shipping_address": "x", "items": []}, format="json",
+                REMOTE_ADDR="198.51.100.10", HTTP_X_FORWARDED_FOR=f"203.0.113.{idx}",
+            ).status_code
+            for idx in range(4)
+        ]
+        self.assertEqual(statuses, [201, 201, 201, 429])
+
+    def test_admin_listing_is_not_limited(self):
+        self.client.force_authenticate(self.admin)
+        for _ in range(5):
+            self.assertEqual(self.client.get("/orders/").status_code, 200)
+
+    def test_repeat_offender_is_blocked_until_expiry(self):
+        for _ in range(5):
+            self.checkout()
+        entry = BlockedIP.objects.get(ip_number="198.51.100.10")
+        self.assertIsNotNone(entry.expires_at)
+        self.assertTrue(blocklist.is_blocked("198.51.100.10"))
+        self.assertEqual(self.checkout().status_code, 403)
+
+        BlockedIP.objects.filter(pk=entry.pk).update(expires_at=timezone.now())
+        blocklist.load()
+        self.assertFalse(blocklist.is_blocked("198.51.100.10"))
+
+    def test_forwarded_ip_is_only_blocked_behind_trusted_proxy(self):
+        for _ in range(5):
+            self.client.post(
+                "/orders/", {"shipping_address": "x", "items": []}, format="json",
+                REMOTE_ADDR="198.51.100.10", HTTP_X_FORWARDED_FOR="203.0.113.9",
+            )
+        self.assertFalse(BlockedIP.objects.exists())
+
+        with override_settings(TRUSTED_PROXIES=["10.0.0.0/8"]):
+            for _ in range(5):
+                self.client.post(
+                    "/orders/", {"shipping_address": "x", "items": []}, format="json",
+                    REMOTE_ADDR="10.0.0.2", HTTP_X_FORWARDED_FOR="192.0.2.1, 203.0.113.7",
+                )
+        # The right-most address added by the trusted proxy, not the spoofable first one.
+        self.assertEqual(list(BlockedIP.objects.values_list("ip_number", flat=True)), ["203.0.113.7"])
+
+    @override_settings(RATE_LIMIT_BLOCK_AFTER=None)
+    def test_concurrent_requests_cannot_share_a_token(self):
+        class SlowCache:
+            # Widens the window between reading and writing a bucket.
+            def __init__(self, cache):
+                self.cache = cache
+
+            def get(self, *args, **kwargs):
+                value = self.cache.get(*args, **kwargs)
+                time.sleep(0.01)
+                return value
+
+            def __getattr__(self, name):
+                return getattr(self.cache, name)
+
+        view = mock.Mock(throttle_scope="checkout")
+        request = RequestFactory().post("/orders/", REMOTE_ADDR="198.51.100.20")
+        request.user = AnonymousUser()
+        barrier = threading.Barrier(10)
+        allowed = []
+
+        def attempt():
+            barrier.wait()
+            allowed.append(TokenBucketThrottle().allow_request(request, view))
+
+        with mock.patch.object(TokenBucketThrottle, "cache", SlowCache(cache)):
+            threads = [threading.Thread(target=attempt) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(allowed.count(True), 3)
+
+    def test_auth_endpoints_are_limited(self):
+        payload = {"phone_number": "+8801812345678", "password": "wrong"}
+        statuses = [self.client.post("/auth/jwt/create/", payload, format="json").status_code for _ in range(3)]
+        self.assertEqual(statuses[-1], 429)
+
+    def test_session_endpoints_are_not_limited(self):
+        user = User.objects.create_user(phone_number="+8801912345678", password="pass")
+        self.client.force_authenticate(user)
+        for _ in range(5):
+            self.assertEqual(self.client.get("/auth/users/me/").status_code, 200)
@@ -1,19 +1,41 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions, generics
+from rest_framework.utils.encoders import JSONEncoder
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+import json
 
+from config.middleware.ip_block_middleware import IPBlockMiddleware
+from config.pagination import KeysetPagination
+from ip_block.blocklist import parse_ip
 from .models import Order, OrderItem
 from .serializers import OrderSerializer, OrderItemSerializer
+from .notifications import queue_status_change
+from .risk import is_held
+from .stock import InsufficientStock, apply_status_change
 
 
 
 class OrderListCreateAPIView(APIView):
     """
     List all orders (admin only) or create a new order (anyone).
+    The listing is cursor-paginated; pass `?stream=1` to stream every
+    order as one JSON array with flat memory use instead, and
+    `?risk=<level>` to only list orders with that fraud risk level.
     """
 
     permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    stream_chunk_size = 500
+    throttle_scope = "checkout"
+
+    def get_throttles(self):
+        # Only guest/customer checkout is rate limited, not the admin listing.
+        if self.request.method == "POST":
+            return super().get_throttles()
+        return []
 
     def get(self, request):
         if not request.user.is_staff:  # or request.user.is_superuser
@@ -21,9 +43,34 @@ class OrderListCreateAPIView(APIView):
                 {"detail": "Only admins can view all orders."},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        orders = Order.objects.all().order_by("-created_at")
-        serializer = OrderSerializer(orders, many=True)
-        return Response(serializer.data)
+        orders = Order.objects.all().order_by("-created_at", "-id")
+        risk = request.query_params.get("risk")
+        if risk:
+            if risk not in dict(Order.RISK_LEVEL_CHOICES):
+                return Response({"error": "Invalid risk level"}, status=status.HTTP_400_BAD_REQUEST)
+            orders = orders.filter(risk_level=risk)
+        if request.query_params.get("stream") in ("1", "true"):
+            return self.stream_orders(orders)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(orders, request, view=self)
+        serializer = OrderSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def stream_orders(self, orders):
+        """
+        Stream orders as a JSON array, fetching rows in chunks from a server-side cursor.
+        """
+        serializer = OrderSerializer()
+
+        def rows():
+            yield "["
+            for index, order in enumerate(orders.iterator(chunk_size=self.stream_chunk_size)):
+                data = json.dumps(serializer.to_representation(order), cls=JSONEncoder)
+                yield f",{data}" if index else data
+            yield "]"
+
+        return StreamingHttpResponse(rows(), content_type="application/json")
 
     def post(self, request):
         data = request.data.copy()
@@ -45,6 +92,10 @@ class OrderListCreateAPIView(APIView):
 
             # Only pass a User instance if the request is authenticated
             save_kwargs["user"] = request.user if request.user.is_authenticated else None
+            # Used by the background fraud scoring (order.risk); never a
+            # client-supplied X-Forwarded-For value.
+            client_ip = parse_ip(IPBlockMiddleware.get_trusted_client_ip(request))
+            save_kwargs["customer_ip"] = client_ip.compressed if client_ip else None
 
             order = serializer.save(**save_kwargs)
             return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
@@ -88,7 +139,10 @@ class OrderDetailAPIView(APIView):
             )
 
         order = self.get_object(pk, request.user)
-        serializer = OrderSerializer(order, data=request.data, partial=True)
+        serializer = OrderSerializer(
+            order, data=request.data, partial=True,
+            context={"override_risk": str(request.data.get("override_risk")).lower() in ("1", "true")},
+        )
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
@@ -111,21 +165,40 @@ class OrderDetailAPIView(APIView):
 class OrderStatusUpdateAPIView(APIView):
     """
     Update only the status of an order (admins only).
+    High-risk orders stay pending unless `override_risk` is true.
     """
 
     permission_classes = [permissions.IsAdminUser]
 
     def post(self, request, pk):
-        order = get_object_or_404(Order, pk=pk)
         status_value = request.data.get("status")
 
         if status_value not in dict(Order.STATUS_CHOICES):
+            get_object_or_404(Order, pk=pk)
             return Response(
                 {"error": "Invalid status"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        order.status = status_value
-        order.save()
+        try:
+            with transaction.atomic():
+                # Lock the order so stock is released or re-reserved only once.
+                order = get_object_or_404(Order.objects.select_for_update(), pk=pk)
+                old_status = order.status
+                override = str(request.data.get("override_risk")).lower() in ("1", "true")
+                if status_value != old_status and is_held(order, status_value) and not override:
+                    return Response(
+                        {"error": "This order is held for fraud review."},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                order.status = status_value
+                order.save(update_fields=["status", "updated_at"])
+                apply_status_change(order, old_status, status_value)
+                queue_status_change(order, old_status)
+        except InsufficientStock:
+            return Response(
+                {"error": "Not enough stock to reopen this order."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         return Response({"status": order.status})
 
 
@@ -195,6 +268,7 @@ class OrderHistoryView(generics.ListAPIView):
     """
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return Order.objects.filter(user=self.request.user).order_by("-created_at")
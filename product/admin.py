@@ -1,6 +1,8 @@
 
 from django.contrib import admin
+from django.db.models import Q
 from .models import Product, ProductImage, Size, Color
+from .search import matching_ids_subquery, supports_full_text
 
 class ProductImageInline(admin.TabularInline):
 	model = ProductImage
@@ -23,16 +25,30 @@ class ColorAdmin(admin.ModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-	list_display = ("name", "brand", "category", "price", "stock", "is_active")
+	list_display = ("name", "brand", "category", "price", "stock", "rating_average", "is_active")
 	search_fields = ("name", "brand__name", "category__name", "sku")
 	list_filter = ("is_active", "brand", "category", "sizes", "colors")
 	filter_horizontal = ("sizes", "colors")
+	readonly_fields = (
+		"rating_count", "rating_sum", "rating_average",
+		"rating_1", "rating_2", "rating_3", "rating_4", "rating_5",
+	)
 	inlines = [ProductImageInline]
 
+	def get_search_results(self, request, queryset, search_term):
+		# Use the full-text index (as a subquery) instead of icontains scans over
+		# joined tables; SKU fragments still match by substring. Inactive
+		# products are included.
+		matches = matching_ids_subquery(search_term) if supports_full_text() else None
+		if matches is None:
+			return super().get_search_results(request, queryset, search_term)
+		return queryset.filter(Q(pk__in=matches) | Q(sku__icontains=search_term.strip())), False
+
 @admin.register(ProductImage)
 class ProductImageAdmin(admin.ModelAdmin):
-	list_display = ("product", "is_primary", "order", "created_at")
+	list_display = ("product", "is_primary", "order", "processing_status", "created_at")
 	search_fields = ("product__name",)
-	list_filter = ("is_primary",)
+	list_filter = ("is_primary", "processing_status")
+	readonly_fields = ("processing_status", "processing_error", "processing_updated_at")
 
 
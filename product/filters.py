@@ -0,0 +1,143 @@
+"""
+Query-parameter filtering and faceting for the product listing.
+
+    ?category=shirts,pants  ?brand=acme     category/brand slugs
+    ?min_price=10&max_price=50              price range
+    ?sizes=1,2  ?colors=3                   size/color ids (any of)
+    ?in_stock=true  ?active=true            stock > 0 / is_active
+    ?ordering=price|-price|-created_at|-rating_average
+
+Every filter is a plain WHERE on an indexed column (or an EXISTS on the
+size/color join tables), so the page query stays index-backed.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Exists, OuterRef
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from .models import Product
+
+TRUE_VALUES = ("1", "true", "yes")
+FALSE_VALUES = ("0", "false", "no")
+
+
+def split_param(request, name):
+    value = request.query_params.get(name, "")
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def parse_ids(request, name):
+    try:
+        return [int(part) for part in split_param(request, name)]
+    except ValueError:
+        raise ValidationError({name: ["Expected a comma-separated list of ids."]})
+
+
+def parse_decimal(request, name):
+    value = request.query_params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValidationError({name: ["Expected a number."]})
+
+
+def parse_bool(request, name):
+    value = request.query_params.get(name, "").lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return None
+
+
+class ProductFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        if categories := split_param(request, "category"):
+            queryset = queryset.filter(category__slug__in=categories)
+        if brands := split_param(request, "brand"):
+            queryset = queryset.filter(brand__slug__in=brands)
+
+        min_price = parse_decimal(request, "min_price")
+        if min_price is not None:
+            queryset = queryset.filter(price__gte=min_price)
+        max_price = parse_decimal(request, "max_price")
+        if max_price is not None:
+            queryset = queryset.filter(price__lte=max_price)
+
+        # EXISTS rather than a join, so products matching several ids are
+        # not duplicated and no DISTINCT is needed.
+        if sizes := parse_ids(request, "sizes"):
+            through = Product.sizes.through
+            queryset = queryset.filter(Exists(through.objects.filter(product_id=OuterRef("pk"), size_id__in=sizes)))
+        if colors := parse_ids(request, "colors"):
+            through = Product.colors.through
+            queryset = queryset.filter(Exists(through.objects.filter(product_id=OuterRef("pk"), color_id__in=colors)))
+
+        in_stock = parse_bool(request, "in_stock")
+        if in_stock is not None:
+            queryset = queryset.filter(stock__gt=0) if in_stock else queryset.filter(stock=0)
+        active = parse_bool(request, "active")
+        if active is not None:
+            queryset = queryset.filter(is_active=active)
+        return queryset
+
+
+class ProductOrderingFilter(OrderingFilter):
+    """
+    Sorting by price, newest, or rating. `id` is always appended as a
+    tie-breaker so cursor pages are stable.
+    """
+    ordering_fields = ["price", "created_at", "rating_average"]
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view))
+        if not any(field.lstrip("-") == "id" for field in ordering):
+            ordering.append("-id" if ordering and ordering[0].startswith("-") else "id")
+        return ordering
+
+
+def product_facets(queryset):
+    """
+    Product counts per category, brand, size and color for `queryset`,
+    with one GROUP BY query per facet.
+    """
+    products = queryset.order_by().values("pk")
+    categories = (
+        queryset.order_by().values("category_id", "category__slug", "category__name")
+        .annotate(count=Count("id")).order_by("category__name")
+    )
+    brands = (
+        queryset.order_by().values("brand_id", "brand__slug", "brand__name")
+        .annotate(count=Count("id")).order_by("brand__name")
+    )
+    sizes = (
+        Product.sizes.through.objects.filter(product_id__in=products)
+        .values("size_id", "size__code", "size__name")
+        .annotate(count=Count("product_id")).order_by("size__order", "size__name")
+    )
+    colors = (
+        Product.colors.through.objects.filter(product_id__in=products)
+        .values("color_id", "color__name", "color__hex_code")
+        .annotate(count=Count("product_id")).order_by("color__name")
+    )
+    return {
+        "categories": [
+            {"id": row["category_id"], "slug": row["category__slug"], "name": row["category__name"], "count": row["count"]}
+            for row in categories
+        ],
+        "brands": [
+            {"id": row["brand_id"], "slug": row["brand__slug"], "name": row["brand__name"], "count": row["count"]}
+            for row in brands
+        ],
+        "sizes": [
+            {"id": row["size_id"], "code": row["size__code"], "name": row["size__name"], "count": row["count"]}
+            for row in sizes
+        ],
+        "colors": [
+            {"id": row["color_id"], "name": row["color__name"], "hex_code": row["color__hex_code"], "count": row["count"]}
+            for row in colors
+        ],
+    }
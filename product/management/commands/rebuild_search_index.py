@@ -0,0 +1,20 @@
+"""
+Rebuild the product full-text search index from scratch.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from product.models import Product
+from product.search import index_products, supports_full_text
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product_search full-text index."
+
+    def handle(self, *args, **options):
+        if not supports_full_text():
+            self.stdout.write("This database has no full-text index; search uses icontains filters.")
+            return
+        with transaction.atomic():
+            index_products()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {Product.objects.count()} products."))
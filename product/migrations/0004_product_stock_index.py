@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:29
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0003_product_rating_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='stock',
+            field=models.PositiveIntegerField(db_index=True, default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+    ]
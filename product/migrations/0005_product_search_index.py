@@ -0,0 +1,60 @@
+from django.db import migrations
+
+
+SOURCE_SQL = """
+    SELECT p.id, p.name, p.description, p.sku, b.name, c.name
+    FROM product_product p
+    JOIN brand_brand b ON b.id = p.brand_id
+    JOIN category_category c ON c.id = p.category_id
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE product_search USING fts5("
+            "name, description, sku, brand, category, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO product_search (rowid, name, description, sku, brand, category) {SOURCE_SQL}"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE product_search ("
+            # No foreign key: flush truncates product_product without CASCADE.
+            "product_id bigint PRIMARY KEY, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute("CREATE INDEX product_search_document_idx ON product_search USING GIN (document)")
+        schema_editor.execute(
+            f"""
+            INSERT INTO product_search (product_id, document)
+            SELECT id,
+                setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(sku, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(brand, '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(category, '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+            FROM ({SOURCE_SQL}) AS source (id, name, description, sku, brand, category)
+            """
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute("DROP TABLE IF EXISTS product_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0004_product_stock_index'),
+        ('brand', '0001_initial'),
+        ('category', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
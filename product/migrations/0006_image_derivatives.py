@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0005_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0006_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='processing_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        # Existing images are served as they are (run generate_image_derivatives
+        # to backfill them); only new uploads start out pending.
+        migrations.AddField(
+            model_name='productimage',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='ready', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='productimage',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='pending', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='processing_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
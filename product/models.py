@@ -2,6 +2,7 @@ from django.db import models
 from category.models import Category
 from brand.models import Brand
 from django.core.validators import MinValueValidator
+from media_assets.storage import get_blob_storage
 
 
 class Size(models.Model):
@@ -37,6 +38,53 @@ class Color(models.Model):
         return self.name
 
 
+# Order in which a product's images are considered for its primary image.
+PRIMARY_IMAGE_ORDER = ("-is_primary", "order", "created_at")
+
+
+class ProductQuerySet(models.QuerySet):
+    """
+    Querysets shaped for each context that returns products, so that every
+    endpoint loads only the related rows (and images) it renders.
+    """
+
+    def with_primary_image(self):
+        """
+        Annotate `primary_image` with the path of the product's primary image,
+        picked in SQL by is_primary, then order, and `primary_image_derivatives`
+        with its resized copies.
+        """
+        primary_image = ProductImage.objects.filter(product=models.OuterRef("pk")).order_by(*PRIMARY_IMAGE_ORDER)
+        return self.annotate(
+            primary_image=models.Subquery(primary_image.values("image")[:1]),
+            primary_image_derivatives=models.Subquery(primary_image.values("image_derivatives")[:1]),
+        )
+
+    def for_card(self):
+        """
+        Compact products for list contexts (cards, search): category and
+        brand are joined and only the primary image is loaded, in one query.
+        """
+        return self.select_related("category", "brand").with_primary_image()
+
+    def for_detail(self, review_limit=None):
+        """
+        Full products with every image, sizes, colors and published reviews.
+        With `review_limit`, only the latest reviews are loaded (sliced in SQL)
+        into `latest_reviews` instead of all of them into `reviews`.
+        """
+        from review.models import Review
+
+        reviews = Review.objects.filter(status="published").select_related("user__profile")
+        if review_limit is None:
+            review_prefetch = models.Prefetch("reviews", queryset=reviews)
+        else:
+            review_prefetch = models.Prefetch(
+                "reviews", queryset=reviews.order_by("-created_at", "-id")[:review_limit], to_attr="latest_reviews"
+            )
+        return self.select_related("category", "brand").prefetch_related("images", "sizes", "colors", review_prefetch)
+
+
 class Product(models.Model):
     """
     Main product model representing a sellable item.
@@ -49,23 +97,59 @@ class Product(models.Model):
     sku = models.CharField(max_length=100, unique=True, db_index=True)
     old_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, db_index=True)
-    stock = models.PositiveIntegerField(validators=[MinValueValidator(0)], default=0)
+    stock = models.PositiveIntegerField(validators=[MinValueValidator(0)], default=0, db_index=True)
     sizes = models.ManyToManyField(Size, blank=True, related_name='products')
     colors = models.ManyToManyField(Color, blank=True, related_name='products')
     is_active = models.BooleanField(default=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Denormalized summary of published reviews, maintained by review.signals.
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_average = models.FloatField(default=0, db_index=True)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    objects = ProductQuerySet.as_manager()
     
     def __str__(self):
         return self.name
 
+    @property
+    def rating_histogram(self):
+        """
+        Number of published reviews per star, keyed 1-5.
+        """
+        return {star: getattr(self, f"rating_{star}") for star in range(1, 6)}
+
 
 class ProductImage(models.Model):
     """
     Model to store multiple images for a product.
     """
     product = models.ForeignKey(Product, on_delete=models.CASCADE, db_index=True, related_name='images')
-    image = models.ImageField(upload_to='products/')
+    image = models.ImageField(upload_to='products/', storage=get_blob_storage)
+    # Resized WebP/JPEG copies of `image`, maintained by media_assets.
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)
+
+    # New uploads are queued as "pending" for the `process_images` worker
+    # (see media_assets.processing), which renders the derivatives off-request.
+    PROCESSING_STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processing", "Processing"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+
+    processing_status = models.CharField(
+        max_length=10, choices=PROCESSING_STATUS_CHOICES, default="pending", db_index=True
+    )
+    processing_error = models.TextField(blank=True, default="")
+    processing_updated_at = models.DateTimeField(blank=True, null=True)
     alt_text = models.CharField(max_length=255, blank=True, null=True)
     is_primary = models.BooleanField(default=False, db_index=True)
     order = models.PositiveIntegerField(default=0, db_index=True)
@@ -0,0 +1,201 @@
+"""
+Full-text product search.
+
+Products are indexed in a `product_search` table created by migration
+0005: an FTS5 virtual table on SQLite (rowid = product id) or a table
+with a weighted `tsvector` column and a GIN index on PostgreSQL. It covers
+name, SKU, brand, category and description. There is no foreign key to
+product_product: product.signals keeps it in sync (deletes included) and
+`manage.py rebuild_search_index` rebuilds it. Other databases fall back to
+`icontains` filters.
+
+Query terms of two or more characters are matched as prefixes, so
+"cott shi" finds "Cotton Shirt" while the user is still typing. Every match
+is ranked; the ranked query carries the page's LIMIT, so the database keeps
+only a page-sized top-N while it scores matches from the index.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Product
+
+SEARCH_TABLE = "product_search"
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+MAX_TERMS = 8
+MIN_PREFIX_LENGTH = 2
+
+# Indexed text for a set of products, as one set-based SELECT.
+SOURCE_SQL = """
+    SELECT p.id, p.name, p.description, p.sku, b.name, c.name
+    FROM product_product p
+    JOIN brand_brand b ON b.id = p.brand_id
+    JOIN category_category c ON c.id = p.category_id
+"""
+
+
+def supports_full_text():
+    return connection.vendor in ("sqlite", "postgresql")
+
+
+def search_terms(query):
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def _is_prefix(term):
+    return len(term) >= MIN_PREFIX_LENGTH
+
+
+def _fts_match(terms):
+    return " ".join(f'"{term}"*' if _is_prefix(term) else f'"{term}"' for term in terms)
+
+
+def _tsquery(terms):
+    return " & ".join(f"{term}:*" if _is_prefix(term) else term for term in terms)
+
+
+def _source_filter(product_ids, brand_id, category_id):
+    if product_ids is not None:
+        return f"p.id IN ({', '.join(['%s'] * len(product_ids))})", list(product_ids)
+    if brand_id is not None:
+        return "p.brand_id = %s", [brand_id]
+    if category_id is not None:
+        return "p.category_id = %s", [category_id]
+    return "", []
+
+
+def index_products(product_ids=None, brand_id=None, category_id=None):
+    """
+    (Re)index the given products, the products of a brand or category, or
+    every product when no argument is given.
+    """
+    if not supports_full_text() or product_ids == []:
+        return
+    condition, params = _source_filter(product_ids, brand_id, category_id)
+    where = f" WHERE {condition}" if condition else ""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            if condition:
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT p.id FROM product_product p{where})", params)
+            else:
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, name, description, sku, brand, category) {SOURCE_SQL}{where}",
+                params,
+            )
+        else:
+            cursor.execute(
+                f"""
+                INSERT INTO {SEARCH_TABLE} (product_id, document)
+                SELECT id,
+                    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+                    setweight(to_tsvector('simple', coalesce(sku, '')), 'A') ||
+                    setweight(to_tsvector('simple', coalesce(brand, '')), 'B') ||
+                    setweight(to_tsvector('simple', coalesce(category, '')), 'B') ||
+                    setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+                FROM ({SOURCE_SQL}{where}) AS source (id, name, description, sku, brand, category)
+                ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document
+                """,
+                params,
+            )
+
+
+def unindex_products(product_ids):
+    if not supports_full_text() or not product_ids:
+        return
+    column = "rowid" if connection.vendor == "sqlite" else "product_id"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE {column} IN ({', '.join(['%s'] * len(product_ids))})",
+            list(product_ids),
+        )
+
+
+def search_product_ids(query, limit=20, offset=0, active_only=True):
+    """
+    Ids of products matching every term of `query`, best match first.
+    Inactive products are left out (before paging) unless `active_only` is
+    False. With `limit=None`, every match is returned.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    if not supports_full_text():
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(name__icontains=term) | Q(sku__icontains=term)
+                | Q(brand__name__icontains=term) | Q(category__name__icontains=term)
+            )
+        if active_only:
+            condition &= Q(is_active=True)
+        ids = Product.objects.filter(condition).order_by("-rating_average", "-id").values_list("id", flat=True)
+        return list(ids[offset:] if limit is None else ids[offset:offset + limit])
+
+    active = " AND p.is_active" if active_only else ""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            match = _fts_match(terms)
+            # Column weights for bm25(): name, description, sku, brand, category.
+            cursor.execute(
+                f"""
+                SELECT {SEARCH_TABLE}.rowid FROM {SEARCH_TABLE} JOIN product_product p ON p.id = {SEARCH_TABLE}.rowid
+                WHERE {SEARCH_TABLE} MATCH %s{active}
+                ORDER BY bm25({SEARCH_TABLE}, 10.0, 1.0, 8.0, 4.0, 4.0), {SEARCH_TABLE}.rowid DESC
+                LIMIT %s OFFSET %s
+                """,
+                [match, -1 if limit is None else limit, offset],
+            )
+        else:
+            tsquery = _tsquery(terms)
+            # The GIN index finds the matches; LIMIT NULL is no limit.
+            cursor.execute(
+                f"""
+                SELECT s.product_id FROM {SEARCH_TABLE} s
+                JOIN product_product p ON p.id = s.product_id
+                WHERE s.document @@ to_tsquery('simple', %s){active}
+                ORDER BY ts_rank(s.document, to_tsquery('simple', %s)) DESC, s.product_id DESC
+                LIMIT %s OFFSET %s
+                """,
+                [tsquery, tsquery, limit, offset],
+            )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def matching_ids_subquery(query):
+    """
+    An unranked subquery selecting the ids of products matching every term
+    of `query`, for `pk__in=` filters (the database joins it instead of an
+    IN list of ids). None if `query` has no terms. Full-text databases only.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+    if connection.vendor == "sqlite":
+        return RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [_fts_match(terms)])
+    return RawSQL(
+        f"SELECT product_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('simple', %s)", [_tsquery(terms)]
+    )
+
+
+class SearchResults:
+    """
+    Ranked matches for `query` as a sliceable sequence of products from
+    `queryset`, so the shared paginators can page them: each slice costs
+    one ranked-id query and one product query.
+    """
+
+    def __init__(self, query, queryset):
+        self.query = query
+        self.queryset = queryset
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step:
+            raise TypeError("SearchResults only supports slicing.")
+        start = index.start or 0
+        limit = None if index.stop is None else max(index.stop - start, 0)
+        ids = search_product_ids(self.query, limit=limit, offset=start)
+        products = self.queryset.in_bulk(ids)
+        return [products[pk] for pk in ids if pk in products]
@@ -3,7 +3,9 @@ Serializers for the Product and ProductImage models, including nested and relate
 """
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from .models import Product, ProductImage, Category, Brand, Size, Color
+from media_assets.serializers import ImageSrcsetField
 from review.models import Review
 
 
@@ -69,10 +71,15 @@ class ColorSerializer(serializers.ModelSerializer):
 
 class ProductImageSerializer(serializers.ModelSerializer):
     """Serializer for product images."""
+    image_srcset = ImageSrcsetField(source='image_derivatives')
+
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'alt_text', 'is_primary', 'order']
-        read_only_fields = ['id']
+        fields = [
+            'id', 'image', 'image_srcset', 'alt_text', 'is_primary', 'order',
+            'processing_status', 'processing_error',
+        ]
+        read_only_fields = ['id', 'processing_status', 'processing_error']
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -99,6 +106,7 @@ class ProductSerializer(serializers.ModelSerializer):
     reviews = ReviewTobeIncludedInProductSerializer(many=True, read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
     brand_name = serializers.CharField(source='brand.name', read_only=True)
+    rating_histogram = serializers.ReadOnlyField()
 
     class Meta:
         model = Product
@@ -106,7 +114,45 @@ class ProductSerializer(serializers.ModelSerializer):
             'id', 'name', 'slug', 'category', 'category_name', 'brand', 'brand_name', 
             'description', 'sku', 'old_price', 'price', 'stock', 'is_active', 
             'created_at', 'updated_at', 'images', 'sizes', 'colors', 
-            'size_ids', 'color_ids', 'reviews'
+            'size_ids', 'color_ids', 'reviews',
+            'rating_average', 'rating_count', 'rating_histogram'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'rating_average', 'rating_count']
+
 
+class ProductDetailSerializer(ProductSerializer):
+    """
+    Product detail representation. Embeds only the latest published reviews
+    (prefetched into `latest_reviews`); the full feed lives at /products/<id>/reviews/.
+    """
+    reviews = ReviewTobeIncludedInProductSerializer(source='latest_reviews', many=True, read_only=True)
+
+
+class ProductCardSerializer(serializers.ModelSerializer):
+    """
+    Compact, read-only serializer for product cards in list views.
+    Expects products from `Product.objects.for_card()`, annotated with `primary_image`
+    and `primary_image_derivatives`.
+    """
+    primary_image = serializers.SerializerMethodField()
+    primary_image_srcset = ImageSrcsetField(source='primary_image_derivatives')
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    brand_name = serializers.CharField(source='brand.name', read_only=True)
+
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'name', 'slug', 'price', 'old_price', 'primary_image', 'primary_image_srcset',
+            'category_name', 'brand_name', 'rating_average', 'rating_count'
+        ]
+        read_only_fields = fields
+
+    def get_primary_image(self, obj):
+        """
+        Build the URL of the annotated primary image path, absolute when a request is available.
+        """
+        if not obj.primary_image:
+            return None
+        url = default_storage.url(obj.primary_image)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
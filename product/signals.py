@@ -0,0 +1,82 @@
+"""
+Signal handlers for the product app.
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from brand.models import Brand
+from category.models import Category
+from config.caching import bump_version
+from .models import Color, Product, ProductImage, Size
+from .search import index_products, unindex_products
+from .suggest import suggestions
+
+
+@receiver([post_save, post_delete], sender=Size)
+def invalidate_size_cache(sender, **kwargs):
+    bump_version("sizes")
+
+
+@receiver([post_save, post_delete], sender=Color)
+def invalidate_color_cache(sender, **kwargs):
+    bump_version("colors")
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+def touch_product_on_image_change(sender, instance, **kwargs):
+    # Product.updated_at doubles as the version used for ETag/Last-Modified.
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    unindex_products([instance.pk])
+
+
+@receiver(post_init, sender=Brand)
+@receiver(post_init, sender=Category)
+def remember_indexed_name(sender, instance, **kwargs):
+    # Read __dict__ so deferred fields are not fetched.
+    instance._indexed_name = instance.__dict__.get("name")
+
+
+@receiver(post_save, sender=Brand)
+def reindex_brand_products(sender, instance, created, raw=False, **kwargs):
+    if not (created or raw) and instance.name != instance._indexed_name:
+        index_products(brand_id=instance.pk)
+    instance._indexed_name = instance.name
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_products(sender, instance, created, raw=False, **kwargs):
+    if not (created or raw) and instance.name != instance._indexed_name:
+        index_products(category_id=instance.pk)
+    instance._indexed_name = instance.name
+
+
+@receiver(post_save, sender=Product)
+def update_product_suggestion(sender, instance, **kwargs):
+    if instance.is_active:
+        suggestions.add("product", instance.pk, instance.name, instance.slug)
+    else:
+        suggestions.discard("product", instance.pk)
+
+
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=Category)
+def update_catalog_suggestion(sender, instance, **kwargs):
+    suggestions.add(sender._meta.model_name, instance.pk, instance.name, instance.slug)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Brand)
+@receiver(post_delete, sender=Category)
+def remove_suggestion(sender, instance, **kwargs):
+    suggestions.discard(sender._meta.model_name, instance.pk)
@@ -0,0 +1,229 @@
+"""
+In-process typeahead index for `/products/suggest/`.
+
+Every active product, brand and category is indexed in a character trie
+under each word-suffix of its name ("Cotton Oxford Shirt" is found by
+"cot", "oxford sh" and "shi"). Every trie node caches the `TOP_K` most
+popular entries below it, so a lookup walks len(query) nodes and reads a
+cached tuple. The database is never queried on the request path.
+
+Popularity is units sold plus review count for products, and the summed
+product popularity for brands and categories. product.signals applies
+name and visibility changes immediately. Popularity is refreshed by a
+full background reload every SUGGEST_INDEX_TTL seconds once the index has
+been loaded (see config.reloading).
+"""
+import heapq
+import re
+import threading
+
+from django.db.models import Sum
+
+from config.reloading import PeriodicReloader
+
+TOP_K = 10
+TRIE_DEPTH = 10
+MAX_KEY_LENGTH = 64
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(text):
+    return " ".join(WORD_RE.findall(str(text).lower()))
+
+
+def index_keys(label):
+    words = normalize(label).split()
+    return {" ".join(words[start:])[:MAX_KEY_LENGTH] for start in range(len(words))}
+
+
+class _Node:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children = {}
+        # entry key -> index keys ending here (or, at TRIE_DEPTH, continuing below)
+        self.entries = {}
+        self.top = ()  # best TOP_K entry keys in this subtree
+
+
+class SuggestionTrie:
+    """
+    A character trie TRIE_DEPTH levels deep. Keys longer than that are kept
+    whole on the deepest node, so longer queries filter that (small) set.
+
+    Writers must be serialized by the caller; readers need no locking
+    because every node's `top` is replaced, never mutated.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.entries = {}  # (kind, id) -> (kind, id, label, slug, popularity)
+
+    def _rank(self, key):
+        entry = self.entries[key]
+        return (-entry[4], entry[2].lower(), key)
+
+    def _path(self, index_key, create=False):
+        path = [self.root]
+        for char in index_key[:TRIE_DEPTH]:
+            node = path[-1].children.get(char)
+            if node is None:
+                if not create:
+                    return None
+                node = path[-1].children[char] = _Node()
+            path.append(node)
+        return path
+
+    def _insert(self, key, label):
+        paths = []
+        for index_key in index_keys(label):
+            path = self._path(index_key, create=True)
+            path[-1].entries.setdefault(key, set()).add(index_key)
+            paths.append(path)
+        return paths
+
+    def build(self, rows):
+        """
+        Bulk-load (kind, id, label, slug, popularity) rows into an empty
+        trie, computing every node's cache once at the end.
+        """
+        for row in rows:
+            key = (row[0], row[1])
+            self.entries[key] = tuple(row)
+            self._insert(key, row[2])
+        stack = [(self.root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if children_done:
+                node.top = self._best(node)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+
+    def add(self, kind, pk, label, slug, popularity=0):
+        key = (kind, pk)
+        if key in self.entries:
+            self.discard(kind, pk)
+        self.entries[key] = (kind, pk, label, slug, popularity)
+        rank = self._rank(key)
+        for path in self._insert(key, label):
+            for node in path:
+                if key in node.top:
+                    continue
+                if len(node.top) < TOP_K or rank < self._rank(node.top[-1]):
+                    node.top = tuple(sorted(node.top + (key,), key=self._rank))[:TOP_K]
+
+    def discard(self, kind, pk):
+        key = (kind, pk)
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+        for index_key in index_keys(entry[2]):
+            path = self._path(index_key)
+            if path is None:
+                continue
+            path[-1].entries.pop(key, None)
+            # Rebuild affected caches bottom-up from the children's caches.
+            for depth in range(len(path) - 1, -1, -1):
+                node = path[depth]
+                if key in node.top:
+                    node.top = self._best(node, exclude=key)
+                if depth and not node.children and not node.entries:
+                    del path[depth - 1].children[index_key[depth - 1]]
+        del self.entries[key]
+
+    def _best(self, node, exclude=None):
+        candidates = set(node.entries)
+        for child in node.children.values():
+            candidates.update(child.top)
+        candidates.discard(exclude)
+        return tuple(heapq.nsmallest(TOP_K, candidates, key=self._rank))
+
+    def suggest(self, query, limit=TOP_K):
+        query = normalize(query)[:MAX_KEY_LENGTH]
+        path = self._path(query)
+        if path is None:
+            return []
+        node = path[-1]
+        if len(query) <= TRIE_DEPTH:
+            keys = node.top[:limit]
+        else:
+            # If enough of the node's cached best entries match, they are
+            # the best matches; only otherwise scan the node's entries.
+            keys = [key for key in node.top if self._matches(node, key, query)][:limit]
+            if len(keys) < limit:
+                keys = heapq.nsmallest(limit, self._scan(node, query), key=self._rank)
+        entries = self.entries
+        results = []
+        for key in keys:
+            entry = entries.get(key)
+            if entry is not None:
+                results.append({"type": entry[0], "id": entry[1], "name": entry[2], "slug": entry[3]})
+        return results
+
+    @staticmethod
+    def _matches(node, key, query):
+        return any(index_key.startswith(query) for index_key in node.entries.get(key, ()))
+
+    @staticmethod
+    def _scan(node, query):
+        return [
+            key for key, index_keys_here in list(node.entries.items())
+            if any(index_key.startswith(query) for index_key in index_keys_here)
+        ]
+
+
+class SuggestionIndex(PeriodicReloader):
+    ttl_setting = "SUGGEST_INDEX_TTL"
+    default_ttl = 300
+    description = "suggestion index"
+
+    def __init__(self):
+        super().__init__()
+        self._trie = SuggestionTrie()
+        self._lock = threading.Lock()
+
+    def build(self):
+        """
+        Rebuild the whole index from the database and swap it in.
+        """
+        from brand.models import Brand
+        from category.models import Category
+        from .models import Product
+
+        products = (
+            Product.objects.filter(is_active=True)
+            .annotate(sold=Sum("orderitem__quantity"))
+            .values_list("id", "name", "slug", "rating_count", "sold", "brand_id", "category_id")
+        )
+        rows, brand_popularity, category_popularity = [], {}, {}
+        for pk, name, slug, rating_count, sold, brand_id, category_id in products.iterator(chunk_size=5000):
+            popularity = (sold or 0) + rating_count
+            rows.append(("product", pk, name, slug, popularity))
+            brand_popularity[brand_id] = brand_popularity.get(brand_id, 0) + popularity
+            category_popularity[category_id] = category_popularity.get(category_id, 0) + popularity
+        for model, kind, popularity in ((Brand, "brand", brand_popularity), (Category, "category", category_popularity)):
+            for pk, name, slug in model.objects.values_list("id", "name", "slug").iterator():
+                rows.append((kind, pk, name, slug, popularity.get(pk, 0)))
+
+        trie = SuggestionTrie()
+        trie.build(rows)
+        with self._lock:
+            self._trie = trie
+
+    def add(self, kind, pk, label, slug):
+        with self._lock:
+            # Keep the popularity we already know; reloads refresh it.
+            current = self._trie.entries.get((kind, pk))
+            self._trie.add(kind, pk, label, slug, current[4] if current else 0)
+
+    def discard(self, kind, pk):
+        with self._lock:
+            self._trie.discard(kind, pk)
+
+    def suggest(self, query, limit=TOP_K):
+        self.reload_if_stale()
+        return self._trie.suggest(query, limit)
+
+
+suggestions = SuggestionIndex()
@@ -1,3 +1,406 @@
+"""
+Tests for the product app.
+These tests ensure the product list endpoints stay cheap to query.
+"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Tests for the product app.
-# Add test cases here to ensure product logic works as expected.
+from brand.models import Brand
+from category.models import Category
+from product.models import Color, Product, ProductImage, Size
+from product.search import search_product_ids
+from product.suggest import suggestions
+from review.models import Review
+from user.models import User
+
+
+class ProductTestMixin:
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Shirts", slug="shirts")
+        self.brand = Brand.objects.create(name="Acme", slug="acme")
+        self.user = User.objects.create_user(phone_number="+8801712345678", password="pass")
+
+    def create_products(self, count, start=0):
+        for idx in range(start, start + count):
+            product = Product.objects.create(
+                name=f"Shirt {idx}", slug=f"shirt-{idx}", category=self.category, brand=self.brand,
+                description="Cotton", sku=f"SKU{idx}", price="10.00",
+            )
+            ProductImage.objects.create(product=product, image=f"products/{idx}-back.jpg", order=1)
+            ProductImage.objects.create(product=product, image=f"products/{idx}-front.jpg", is_primary=True)
+            Review.objects.create(product=product, user=self.user, rating=4, comment="Good", status="published")
+            Review.objects.create(product=product, user=self.user, rating=1, comment="Bad", status="pending")
+
+
+class ProductCardListTest(ProductTestMixin, TestCase):
+    def test_card_view_fields(self):
+        self.create_products(1)
+        response = self.client.get("/products/", {"view": "card"})
+        self.assertEqual(response.status_code, 200)
+        card = response.data["results"][0]
+        self.assertEqual(card["name"], "Shirt 0")
+        self.assertEqual(card["category_name"], "Shirts")
+        self.assertEqual(card["brand_name"], "Acme")
+        self.assertTrue(card["primary_image"].endswith("/media/products/0-front.jpg"))
+        self.assertEqual(card["rating_count"], 1)
+        self.assertEqual(card["rating_average"], 4.0)
+        self.assertNotIn("reviews", card)
+
+    def test_card_view_query_count_is_constant(self):
+        self.create_products(2)
+        with self.assertNumQueries(2):  # ETag aggregate + page; keyset pagination needs no COUNT
+            self.client.get("/products/", {"view": "card"})
+
+        self.create_products(8, start=2)
+        with self.assertNumQueries(2):
+            response = self.client.get("/products/", {"view": "card"})
+        self.assertEqual(len(response.data["results"]), 10)
+
+
+class ProductQuerySetTest(ProductTestMixin, TestCase):
+    def test_for_card_resolves_primary_image_in_sql(self):
+        self.create_products(1)
+        with self.assertNumQueries(1):
+            product = Product.objects.for_card().get()
+            self.assertEqual(product.primary_image, "products/0-front.jpg")
+            self.assertEqual(product.brand.name, "Acme")
+
+    def test_for_detail_limits_reviews(self):
+        self.create_products(1)
+        Review.objects.create(product=Product.objects.get(), user=self.user, rating=5, comment="New", status="published")
+        product = Product.objects.for_detail(review_limit=1).get()
+        with self.assertNumQueries(0):
+            self.assertEqual(len(product.images.all()), 2)
+            self.assertEqual([review.comment for review in product.latest_reviews], ["New"])
+
+    def test_full_list_embeds_latest_published_reviews(self):
+        self.create_products(2)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get("/products/")
+        product = Product.objects.first()
+        for idx in range(8):
+            Review.objects.create(product=product, user=self.user, rating=5, comment=f"More {idx}", status="published")
+        self.create_products(8, start=2)
+
+        with self.assertNumQueries(len(few)):
+            response = self.client.get("/products/")
+        reviews = {item["id"]: item["reviews"] for item in response.data["results"]}
+        self.assertEqual(len(reviews[product.pk]), 5)
+        self.assertTrue(all(len(embedded) <= 5 for embedded in reviews.values()))
+        self.assertNotIn("Bad", [review["comment"] for embedded in reviews.values() for review in embedded])
+
+    def test_update_response_is_loaded_for_detail(self):
+        self.create_products(1)
+        product = Product.objects.get()
+        self.client.force_authenticate(self.user)
+        url = f"/products/{product.pk}/update/"
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.patch(url, {"stock": 3}, format="json")
+        self.assertEqual(response.data["stock"], 3)
+        self.assertEqual([review["comment"] for review in response.data["reviews"]], ["Good"])
+
+        for idx in range(5):
+            ProductImage.objects.create(product=product, image=f"products/extra-{idx}.jpg")
+            Review.objects.create(product=product, user=self.user, rating=5, comment="More", status="published")
+        with self.assertNumQueries(len(few)):
+            response = self.client.patch(url, {"stock": 4}, format="json")
+        self.assertEqual(len(response.data["images"]), 7)
+
+    def test_cart_renders_cards_in_constant_queries(self):
+        self.create_products(3)
+        self.client.force_authenticate(self.user)
+        for product in Product.objects.all():
+            self.client.post("/items/", {"product_id": product.pk, "quantity": 1})
+
+        # Page count + cart + items + product cards, whatever the cart size.
+        with self.assertNumQueries(4):
+            response = self.client.get("/cart/")
+        items = response.data["results"][0]["items"]
+        self.assertEqual(len(items), 3)
+        self.assertTrue(all(item["product"]["primary_image"].endswith("-front.jpg") for item in items))
+        self.assertNotIn("images", items[0]["product"])
+
+
+class ProductListPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        category = Category.objects.create(name="Shirts", slug="shirts")
+        brand = Brand.objects.create(name="Acme", slug="acme")
+        for idx in range(15):
+            Product.objects.create(
+                name=f"Shirt {idx}", slug=f"shirt-{idx}", category=category, brand=brand,
+                description="Cotton", sku=f"SKU{idx}", price="10.00",
+            )
+
+    def test_cursor_pagination_newest_first(self):
+        response = self.client.get("/products/", {"view": "card"})
+        self.assertNotIn("count", response.data)
+        self.assertEqual(response.data["results"][0]["name"], "Shirt 14")
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertIsNone(response.data["next"])
+
+    def test_cursor_breaks_price_ties_by_id(self):
+        # Every product costs the same, so only the id orders them.
+        ids = list(Product.objects.order_by("id").values_list("id", flat=True))
+        seen, pages = [], []
+        response = self.client.get("/products/", {"view": "card", "ordering": "price", "page_size": 4})
+        while True:
+            pages.append(response)
+            seen += [card["id"] for card in response.data["results"]]
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(seen, ids)
+
+        response = self.client.get(pages[2].data["previous"])
+        self.assertEqual([card["id"] for card in response.data["results"]], ids[4:8])
+        response = self.client.get("/products/", {"ordering": "price", "cursor": "cD1bIjEwLjAwIl0="})
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_fallback_with_and_without_count(self):
+        response = self.client.get("/products/", {"view": "card", "page": 2})
+        self.assertEqual(response.data["count"], 15)
+        self.assertEqual(response.data["results"][0]["name"], "Shirt 4")
+
+        with self.assertNumQueries(2):
+            response = self.client.get("/products/", {"view": "card", "page": 1, "count": "false"})
+        self.assertNotIn("count", response.data)
+        self.assertIn("page=2", response.data["next"])
+
+
+class ProductConditionalGetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        category = Category.objects.create(name="Shirts", slug="shirts")
+        brand = Brand.objects.create(name="Acme", slug="acme")
+        self.product = Product.objects.create(
+            name="Shirt", slug="shirt", category=category, brand=brand,
+            description="Cotton", sku="SKU1", price="10.00",
+        )
+        self.user = User.objects.create_user(phone_number="+8801712345678", password="pass")
+
+    def test_detail_304_until_product_or_reviews_change(self):
+        url = f"/products/{self.product.pk}/"
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Review.objects.create(product=self.product, user=self.user, rating=5, comment="a", status="published")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_304_until_image_added(self):
+        response = self.client.get("/products/", {"view": "card"})
+        etag = response["ETag"]
+        self.assertNotIn("Last-Modified", response)
+        response = self.client.get("/products/", {"view": "card"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        ProductImage.objects.create(product=self.product, image="products/new.jpg")
+        response = self.client.get("/products/", {"view": "card"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class ProductFilterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        shirts = Category.objects.create(name="Shirts", slug="shirts")
+        pants = Category.objects.create(name="Pants", slug="pants")
+        acme = Brand.objects.create(name="Acme", slug="acme")
+        zeta = Brand.objects.create(name="Zeta", slug="zeta")
+        self.small = Size.objects.create(name="Small", code="S")
+        self.large = Size.objects.create(name="Large", code="L")
+        self.red = Color.objects.create(name="Red")
+        rows = [
+            # name, category, brand, price, stock, sizes, colors, rating
+            ("Tee", shirts, acme, "10.00", 5, [self.small, self.large], [self.red], 4.5),
+            ("Polo", shirts, zeta, "25.00", 0, [self.large], [], 3.0),
+            ("Jeans", pants, acme, "40.00", 2, [self.small], [self.red], 5.0),
+            ("Chinos", pants, zeta, "55.00", 1, [], [], 0),
+        ]
+        for idx, (name, category, brand, price, stock, sizes, colors, rating) in enumerate(rows):
+            product = Product.objects.create(
+                name=name, slug=name.lower(), category=category, brand=brand, description="x",
+                sku=f"SKU{idx}", price=price, stock=stock, rating_average=rating,
+            )
+            product.sizes.set(sizes)
+            product.colors.set(colors)
+
+    def names(self, **params):
+        response = self.client.get("/products/", {"view": "card", **params})
+        self.assertEqual(response.status_code, 200)
+        return [card["name"] for card in response.data["results"]]
+
+    def test_filters(self):
+        self.assertEqual(sorted(self.names(category="pants")), ["Chinos", "Jeans"])
+        self.assertEqual(sorted(self.names(brand="acme,zeta", min_price="20", max_price="50")), ["Jeans", "Polo"])
+        self.assertEqual(sorted(self.names(sizes=f"{self.small.pk},{self.large.pk}")), ["Jeans", "Polo", "Tee"])
+        self.assertEqual(sorted(self.names(colors=str(self.red.pk), in_stock="true")), ["Jeans", "Tee"])
+        self.assertEqual(self.names(in_stock="false"), ["Polo"])
+        self.assertEqual(self.client.get("/products/", {"min_price": "cheap"}).status_code, 400)
+
+    def test_ordering_with_cursor_pages(self):
+        self.assertEqual(self.names(ordering="price"), ["Tee", "Polo", "Jeans", "Chinos"])
+        self.assertEqual(self.names(ordering="-rating_average")[:2], ["Jeans", "Tee"])
+
+        response = self.client.get("/products/", {"view": "card", "ordering": "-price", "page_size": 3})
+        self.assertEqual([card["name"] for card in response.data["results"]], ["Chinos", "Jeans", "Polo"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([card["name"] for card in response.data["results"]], ["Tee"])
+
+    def test_facets_use_fixed_number_of_queries(self):
+        with self.assertNumQueries(6):  # ETag aggregate + page + one query per facet
+            response = self.client.get("/products/", {"view": "card", "facets": 1, "in_stock": "true"})
+        facets = response.data["facets"]
+        self.assertEqual({row["slug"]: row["count"] for row in facets["categories"]}, {"shirts": 1, "pants": 2})
+        self.assertEqual({row["slug"]: row["count"] for row in facets["brands"]}, {"acme": 2, "zeta": 1})
+        self.assertEqual({row["code"]: row["count"] for row in facets["sizes"]}, {"S": 2, "L": 1})
+        self.assertEqual({row["name"]: row["count"] for row in facets["colors"]}, {"Red": 2})
+
+
+class ProductSearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Shirts", slug="shirts")
+        self.brand = Brand.objects.create(name="Acme", slug="acme")
+
+    def create_product(self, name, description="Plain", sku=None, **kwargs):
+        return Product.objects.create(
+            name=name, slug=name.lower().replace(" ", "-"), category=self.category, brand=self.brand,
+            description=description, sku=sku or name.upper().replace(" ", "-"), price="10.00", **kwargs
+        )
+
+    def search(self, q, **params):
+        response = self.client.get("/products/search/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response, [card["name"] for card in response.data["results"]]
+
+    def test_ranked_prefix_search(self):
+        self.create_product("Linen Trousers", description="Pairs well with a cotton shirt")
+        self.create_product("Cotton Shirt")
+        self.create_product("Silk Scarf")
+        self.create_product("Cotton Hidden", is_active=False)
+
+        self.assertEqual(self.search("cott")[1], ["Cotton Shirt", "Linen Trousers"])
+        self.assertEqual(self.search("cotton shi")[1], ["Cotton Shirt", "Linen Trousers"])
+        self.assertEqual(self.search("SILK-SCARF")[1], ["Silk Scarf"])
+        self.assertEqual(self.search("")[1], [])
+
+    def test_older_exact_match_outranks_newer_partial_matches(self):
+        exact = self.create_product("Cotton", sku="C-1")
+        for idx in range(30):
+            self.create_product(f"Shirt {idx}", description="cotton blend", sku=f"S-{idx}")
+        response, names = self.search("cotton", page_size=5)
+        self.assertEqual(names[0], "Cotton")
+        self.assertEqual(response.data["results"][0]["id"], exact.pk)
+
+    def test_index_follows_product_brand_and_category_changes(self):
+        product = self.create_product("Cotton Shirt", sku="SKU1")
+        product.name = "Wool Sweater"
+        product.save()
+        self.assertEqual(self.search("cotton")[1], [])
+        self.assertEqual(self.search("wool")[1], ["Wool Sweater"])
+
+        self.brand.name = "Northwind"
+        self.brand.save()
+        self.category.name = "Knitwear"
+        self.category.save()
+        self.assertEqual(self.search("northwind knit")[1], ["Wool Sweater"])
+
+        product.delete()
+        self.assertEqual(self.search("wool")[1], [])
+
+    def test_pagination(self):
+        for idx in range(3):
+            self.create_product(f"Cotton Shirt {idx}")
+            # Inactive matches must not take up page slots.
+            self.create_product(f"Cotton Hidden {idx}", is_active=False)
+        response, names = self.search("cotton", page_size=2)
+        self.assertEqual(len(names), 2)
+        self.assertIsNotNone(response.data["next"])
+        response, names = self.search("cotton", page_size=2, page=2)
+        self.assertEqual(len(names), 1)
+        self.assertIsNone(response.data["next"])
+        self.assertIsNotNone(response.data["previous"])
+        # Every match, inactive ones included, when not paging.
+        self.assertEqual(len(search_product_ids("cotton", limit=None, active_only=False)), 6)
+
+    def test_admin_search_uses_a_subquery_and_matches_sku_fragments(self):
+        self.create_product("Cotton Shirt", sku="SHRT-00421")
+        self.create_product("Cotton Hidden", sku="HID-1", is_active=False)
+        self.create_product("Silk Scarf", sku="SCF-2")
+        admin_user = User.objects.create_superuser(phone_number="+8801812345678", password="pass")
+        self.client.force_login(admin_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/admin/product/product/", {"q": "cotton"})
+        self.assertEqual(
+            sorted(product.name for product in response.context["cl"].result_list), ["Cotton Hidden", "Cotton Shirt"]
+        )
+        self.assertTrue(any("MATCH" in query["sql"] for query in queries))
+        response = self.client.get("/admin/product/product/", {"q": "RT-004"})
+        self.assertEqual([product.name for product in response.context["cl"].result_list], ["Cotton Shirt"])
+
+
+class ProductSuggestTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        suggestions.load()  # start from this test's (empty) catalog
+        self.category = Category.objects.create(name="Shirts", slug="shirts")
+        self.brand = Brand.objects.create(name="Cotton Club", slug="cotton-club")
+
+    def create_product(self, name, **kwargs):
+        return Product.objects.create(
+            name=name, slug=name.lower().replace(" ", "-"), category=self.category, brand=self.brand,
+            description="x", sku=name.upper().replace(" ", "-"), price="10.00", **kwargs
+        )
+
+    def suggest(self, q):
+        response = self.client.get("/products/suggest/", {"q": q})
+        return [(row["type"], row["name"]) for row in response.data["results"]]
+
+    def test_prefix_and_word_suggestions_without_queries(self):
+        self.create_product("Cotton Oxford Shirt")
+        self.create_product("Linen Shirt")
+        with self.assertNumQueries(0):
+            names = self.suggest("cot")
+        self.assertCountEqual(names, [("product", "Cotton Oxford Shirt"), ("brand", "Cotton Club")])
+        self.assertEqual(self.suggest("OXFORD sh"), [("product", "Cotton Oxford Shirt")])
+        self.assertCountEqual(
+            self.suggest("shi"), [("product", "Cotton Oxford Shirt"), ("product", "Linen Shirt"), ("category", "Shirts")]
+        )
+        self.assertEqual(self.suggest("xyz"), [])
+
+    def test_ranked_by_popularity_after_reload(self):
+        self.create_product("Shirt Basic", rating_count=1)
+        self.create_product("Shirt Premium", rating_count=9)
+        suggestions.load()
+        # Categories and brands rank by their products' summed popularity.
+        self.assertEqual(
+            self.suggest("shirt"),
+            [("category", "Shirts"), ("product", "Shirt Premium"), ("product", "Shirt Basic")],
+        )
+
+    def test_signals_keep_index_in_sync(self):
+        product = self.create_product("Wool Sweater")
+        product.name = "Silk Scarf"
+        product.save()
+        self.assertEqual(self.suggest("wool"), [])
+        self.assertEqual(self.suggest("silk"), [("product", "Silk Scarf")])
+
+        product.is_active = False
+        product.save()
+        self.assertEqual(self.suggest("silk"), [])
+
+        self.brand.delete()
+        self.assertEqual(self.suggest("cotton"), [])
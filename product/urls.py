@@ -4,8 +4,8 @@ Routes for product, product image, size, and color endpoints.
 """
 from django.urls import path
 from .views import (
-    ProductListView, ProductDetailView, ProductCreateView, create_product_with_images, ProductUpdateView,
-    ProductImageListView, ProductImageDetailView, ProductImageUpdateView,
+    ProductListView, ProductSearchView, ProductSuggestView, ProductDetailView, ProductCreateView, create_product_with_images, ProductUpdateView,
+    ProductImageListView, ProductImageDetailView, ProductImageUpdateView, ProductImageStatusView,
     SizeListCreateView, SizeDetailView, SizeUpdateView, SizeDeleteView,
     ColorListCreateView, ColorDetailView, ColorUpdateView, ColorDeleteView
 )
@@ -13,9 +13,12 @@ from .views import (
 urlpatterns = [
     # Products
     path("products/", ProductListView.as_view(), name="product-list"),
+    path("products/search/", ProductSearchView.as_view(), name="product-search"),
+    path("products/suggest/", ProductSuggestView.as_view(), name="product-suggest"),
     path("products/create/", create_product_with_images, name="product-create"),
     path("products/<int:id>/", ProductDetailView.as_view(), name="product-detail"),
     path("products/<int:id>/update/", ProductUpdateView.as_view(), name="product-update"),
+    path("products/<int:id>/images/status/", ProductImageStatusView.as_view(), name="product-image-status"),
 
     # Images
     path("products/images/", ProductImageListView.as_view(), name="image-list"),
@@ -7,11 +7,23 @@ Views for managing products, product images, sizes, and colors.
 
 
 from rest_framework import generics, permissions
+from config.caching import VersionedCacheMixin, make_etag, namespace_etag, not_modified_response, set_validators
+from config.pagination import KeysetPagination, UncountedPageNumberPagination
+from django.db.models import Count, Max
+from django.http import Http404
+from media_assets.blobs import acquire
+from .filters import ProductFilterBackend, ProductOrderingFilter, product_facets
 from .models import Product, ProductImage, Size, Color
-from .serializers import ProductSerializer, ProductImageSerializer, SizeSerializer, ColorSerializer
+from .search import SearchResults
+from .suggest import TOP_K, suggestions
+from .serializers import (
+    ProductSerializer, ProductDetailSerializer, ProductCardSerializer, ProductImageSerializer,
+    SizeSerializer, ColorSerializer
+)
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework import status
 import json
 
@@ -21,12 +33,38 @@ import json
 
 
 
-class ProductListView(generics.ListCreateAPIView):
+class ProductDetailResponseMixin:
+    """
+    Mixin for product create/update views: the response is rendered from the
+    saved product reloaded with `for_detail()`, so it costs a fixed number of
+    queries and embeds only published reviews, like the read endpoints.
+    """
+    def reload_for_response(self, serializer):
+        serializer.instance = Product.objects.for_detail().get(pk=serializer.instance.pk)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.reload_for_response(serializer)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.reload_for_response(serializer)
+
+
+class ProductListView(ProductDetailResponseMixin, generics.ListCreateAPIView):
     """
     List all products (public) or create a new product (admin only).
+    Pass `?view=card` to get the compact card representation, which is
+    loaded in a fixed number of queries regardless of page size. The full
+    representation embeds at most `review_limit` published reviews per
+    product, like the detail view.
+    Supports the filters in product.filters, `?ordering=` and `?facets=1`.
     """
-    queryset = Product.objects.all().prefetch_related("images", "sizes", "colors")
     serializer_class = ProductSerializer
+    pagination_class = KeysetPagination
+    review_limit = 5
+    filter_backends = [ProductFilterBackend, ProductOrderingFilter]
+    ordering = ("-created_at", "-id")
     http_method_names = ["get", "post"]
 
     def get_permissions(self):
@@ -36,28 +74,112 @@ class ProductListView(generics.ListCreateAPIView):
             return [permissions.IsAdminUser()]
         return super().get_permissions()
 
+    def is_card_view(self):
+        return self.request.method == "GET" and self.request.query_params.get("view") == "card"
+
+    def get_serializer_class(self):
+        if self.is_card_view():
+            return ProductCardSerializer
+        if self.request.method == "GET":
+            return ProductDetailSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        if self.is_card_view():
+            return Product.objects.for_card()
+        return Product.objects.for_detail(review_limit=self.review_limit)
+
+    def list(self, request, *args, **kwargs):
+        # Validate conditional requests with one aggregate over the filtered
+        # products; image and review changes touch Product.updated_at. Only an
+        # ETag is sent: Max(updated_at) alone misses deletions, products leaving
+        # the filter and catalog changes, so it cannot serve as Last-Modified.
+        filtered = self.filter_queryset(Product.objects.all())
+        summary = filtered.order_by().aggregate(last_modified=Max("updated_at"), count=Count("id"))
+        etag = make_etag(
+            request.get_full_path(), summary["last_modified"], summary["count"],
+            namespace_etag("categories", "brands", "sizes", "colors"),
+        )
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get("facets") in ("1", "true"):
+            response.data["facets"] = product_facets(filtered)
+        return set_validators(response, etag)
+
+
+
+class ProductSearchView(generics.ListAPIView):
+    """
+    Ranked full-text search over active products: `?q=cotton shi`.
+    Every term is a prefix match. Returns product cards, `page_size` (max
+    100) per page, with `next`/`previous` links.
+    """
+    serializer_class = ProductCardSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = UncountedPageNumberPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        return SearchResults(self.request.query_params.get("q", "").strip(), Product.objects.for_card())
+
+
+class ProductSuggestView(APIView):
+    """
+    Typeahead suggestions for products, brands and categories:
+    `?q=cot&limit=10`. Served from the in-process index in product.suggest,
+    so it never queries the database.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get("limit", TOP_K)), 1), TOP_K)
+        except ValueError:
+            limit = TOP_K
+        return Response({"results": suggestions.suggest(request.query_params.get("q", ""), limit)})
 
 
 class ProductDetailView(generics.RetrieveAPIView):
     """
     Retrieve a single product by its ID (public).
+    Embeds at most `review_limit` published reviews plus the rating summary.
     """
-
-    # Prefetch related objects to optimize database queries.
-    queryset = Product.objects.filter(is_active=True).prefetch_related(
-        "images", "sizes", "colors", "reviews"
-    )
-    serializer_class = ProductSerializer
+    serializer_class = ProductDetailSerializer
     lookup_field = "id"
+    review_limit = 5
+
+    def get_queryset(self):
+        # The review prefetch is sliced in SQL so its cost does not grow with the product.
+        return Product.objects.filter(is_active=True).for_detail(review_limit=self.review_limit)
+
+    def retrieve(self, request, *args, **kwargs):
+        version = (
+            Product.objects.filter(id=kwargs[self.lookup_field], is_active=True)
+            .values_list("updated_at", "rating_count", "rating_sum")
+            .first()
+        )
+        if version is None:
+            raise Http404
+        updated_at = version[0]
+        etag = make_etag(
+            kwargs[self.lookup_field], *version, namespace_etag("categories", "brands", "sizes", "colors")
+        )
+        not_modified = not_modified_response(request, etag, updated_at)
+        if not_modified is not None:
+            return not_modified
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, updated_at)
 
 
 # Create product (POST)
 
-class ProductCreateView(generics.CreateAPIView):
+class ProductCreateView(ProductDetailResponseMixin, generics.CreateAPIView):
     """
     Create a new product (authenticated users only).
     """
-    queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -72,6 +194,7 @@ def create_product_with_images(request):
     """
     Create a product with its images in a single request (admin only).
     Expects multipart form data with product fields and image files.
+    Returns once the originals are stored; images start out `pending`.
     """
     try:
         # Extract and validate product data
@@ -99,19 +222,25 @@ def create_product_with_images(request):
             try:
                 images_list = json.loads(images_json)
 
+                # Only the originals are stored here, in one INSERT; resizing
+                # happens in the `process_images` worker. Poll
+                # /products/<id>/images/status/ for progress.
+                images = []
                 for idx, image_data in enumerate(images_list):
                     # Get the image file for this image index
                     image_file = request.FILES.get(f"image_{idx}")
                     
                     if image_file:
-                        # Create product image
-                        ProductImage.objects.create(
+                        images.append(ProductImage(
                             product=product,
                             image=image_file,
                             alt_text=image_data.get("alt_text", ""),
                             is_primary=image_data.get("is_primary", idx == 0),
                             order=image_data.get("order", idx),
-                        )
+                        ))
+                ProductImage.objects.bulk_create(images)
+                # bulk_create sends no signals; count the blob references here.
+                acquire(image.image.name for image in images)
 
             except json.JSONDecodeError:
                 return Response(
@@ -125,9 +254,7 @@ def create_product_with_images(request):
                 )
 
         # Return the complete product with images
-        product_with_images = Product.objects.prefetch_related("images").get(
-            id=product.id
-        )
+        product_with_images = Product.objects.for_detail().get(id=product.id)
         return Response(
             ProductSerializer(product_with_images).data,
             status=status.HTTP_201_CREATED,
@@ -141,11 +268,36 @@ def create_product_with_images(request):
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class ProductImageStatusView(APIView):
+    """
+    Processing status of a product's images (admin only), for polling after
+    an upload. `status` is `ready` once every image is, `failed` if any failed.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, id):
+        if not Product.objects.filter(id=id).exists():
+            raise Http404
+        images = ProductImage.objects.filter(product_id=id)
+        statuses = {image.processing_status for image in images}
+        if "failed" in statuses:
+            overall = "failed"
+        elif statuses - {"ready"}:
+            overall = "processing"
+        else:
+            overall = "ready"
+        return Response({
+            "status": overall,
+            "images": ProductImageSerializer(images, many=True, context={"request": request}).data,
+        })
+
+
 # Update product (PUT/PATCH)
 
-class ProductUpdateView(generics.UpdateAPIView):
+class ProductUpdateView(ProductDetailResponseMixin, generics.UpdateAPIView):
     """
-    Update an existing product (authenticated users only).
+    Update an existing product (authenticated users only). The product is
+    looked up without prefetches; the response reloads it with `for_detail()`.
     """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
@@ -197,10 +349,11 @@ class ProductImageUpdateView(generics.UpdateAPIView):
 # ------------------- SIZE VIEWS -------------------
 
 
-class SizeListCreateView(generics.ListCreateAPIView):
+class SizeListCreateView(VersionedCacheMixin, generics.ListCreateAPIView):
     """
-    List all sizes (public) or create a new size (admin only).
+    List all sizes (public, cached) or create a new size (admin only).
     """
+    cache_namespace = "sizes"
     queryset = Size.objects.filter(is_active=True)
     serializer_class = SizeSerializer
     http_method_names = ["get", "post"]
@@ -246,10 +399,11 @@ class SizeDeleteView(generics.DestroyAPIView):
 # ------------------- COLOR VIEWS -------------------
 
 
-class ColorListCreateView(generics.ListCreateAPIView):
+class ColorListCreateView(VersionedCacheMixin, generics.ListCreateAPIView):
     """
-    List all colors (public) or create a new color (admin only).
+    List all colors (public, cached) or create a new color (admin only).
     """
+    cache_namespace = "colors"
     queryset = Color.objects.filter(is_active=True)
     serializer_class = ColorSerializer
     http_method_names = ["get", "post"]
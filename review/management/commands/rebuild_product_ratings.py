@@ -0,0 +1,17 @@
+"""
+Rebuild the denormalized rating summary on every product from published reviews.
+"""
+from django.core.management.base import BaseCommand
+
+from review.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute rating count, average and star histogram for products from published reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument("product_ids", nargs="*", type=int, help="Limit the rebuild to these product IDs.")
+
+    def handle(self, *args, **options):
+        count = rebuild_ratings(options["product_ids"] or None)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating summaries for {count} product(s)."))
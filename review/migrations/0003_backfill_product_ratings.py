@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+
+
+def backfill_product_ratings(apps, schema_editor):
+    Product = apps.get_model("product", "Product")
+    Review = apps.get_model("review", "Review")
+
+    aggregates = (
+        Review.objects.filter(status="published")
+        .values("product")
+        .annotate(
+            count=Count("id"),
+            total=Sum("rating"),
+            **{f"star_{star}": Count("id", filter=Q(rating=star)) for star in range(1, 6)},
+        )
+    )
+    for row in aggregates.iterator():
+        Product.objects.filter(pk=row["product"]).update(
+            rating_count=row["count"],
+            rating_sum=row["total"],
+            rating_average=row["total"] / row["count"],
+            **{f"rating_{star}": row[f"star_{star}"] for star in range(1, 6)},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0003_product_rating_summary'),
+        ('review', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_product_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+"""
+Helpers for maintaining the denormalized rating summary stored on Product.
+Only published reviews are counted.
+"""
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+from product.models import Product
+from .models import Review
+
+
+def apply_rating_change(product_id, rating, delta):
+    """
+    Add (delta=1) or remove (delta=-1) one published review of `rating`
+    stars from a product's summary in a single UPDATE.
+    """
+    if not product_id or rating not in range(1, 6):
+        return
+    star_field = f"rating_{rating}"
+    new_count = F("rating_count") + delta
+    new_sum = F("rating_sum") + delta * rating
+    Product.objects.filter(pk=product_id).update(
+        rating_count=new_count,
+        rating_sum=new_sum,
+        rating_average=Case(
+            # The right-hand side sees the old row, so this is "new count == 0".
+            When(rating_count=-delta, then=Value(0.0)),
+            default=Cast(new_sum, FloatField()) / Cast(new_count, FloatField()),
+        ),
+        **{star_field: F(star_field) + delta},
+    )
+
+
+def rebuild_ratings(product_ids=None):
+    """
+    Recompute the rating summary from scratch for the given products
+    (or every product) and return the number of products updated.
+    """
+    products = Product.objects.all()
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+
+    aggregates = (
+        Review.objects.filter(status="published", product__in=products)
+        .values("product")
+        .annotate(
+            count=Count("id"),
+            total=Sum("rating"),
+            **{f"star_{star}": Count("id", filter=Q(rating=star)) for star in range(1, 6)},
+        )
+    )
+    summaries = {row["product"]: row for row in aggregates}
+
+    updated = []
+    for product in products.only("id").iterator(chunk_size=2000):
+        row = summaries.get(product.id, {})
+        product.rating_count = row.get("count", 0)
+        product.rating_sum = row.get("total") or 0
+        product.rating_average = product.rating_sum / product.rating_count if product.rating_count else 0
+        for star in range(1, 6):
+            setattr(product, f"rating_{star}", row.get(f"star_{star}", 0))
+        updated.append(product)
+
+    fields = ["rating_count", "rating_sum", "rating_average"] + [f"rating_{star}" for star in range(1, 6)]
+    Product.objects.bulk_update(updated, fields, batch_size=1000)
+    return len(updated)
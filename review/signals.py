@@ -0,0 +1,62 @@
+"""
+Signal handlers that keep Product rating summaries in sync with review writes.
+Covers the review API views as well as the Django admin, since both go
+through Review.save() / Review.delete().
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from product.models import Product
+from .models import Review
+from .ratings import apply_rating_change
+
+
+def _contribution(product_id, rating, status):
+    """
+    Return the (product_id, rating) a review contributes to a summary, or None.
+    """
+    if status == "published" and product_id:
+        return product_id, rating
+    return None
+
+
+def _touch_products(*contributions):
+    """
+    Bump updated_at of products whose published reviews changed, so the
+    product ETag/Last-Modified headers change with them.
+    """
+    product_ids = {contribution[0] for contribution in contributions if contribution}
+    if product_ids:
+        Product.objects.filter(pk__in=product_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_init, sender=Review)
+def remember_loaded_state(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields are not fetched here.
+    values = instance.__dict__
+    instance._rating_contribution = _contribution(
+        values.get("product_id"), values.get("rating"), values.get("status")
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, **kwargs):
+    old = getattr(instance, "_rating_contribution", None) if not kwargs.get("created") else None
+    new = _contribution(instance.product_id, instance.rating, instance.status)
+    if old != new:
+        if old:
+            apply_rating_change(old[0], old[1], -1)
+        if new:
+            apply_rating_change(new[0], new[1], 1)
+    _touch_products(old, new)
+    instance._rating_contribution = new
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    old = getattr(instance, "_rating_contribution", None)
+    if old:
+        apply_rating_change(old[0], old[1], -1)
+        _touch_products(old)
+    instance._rating_contribution = None
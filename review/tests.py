@@ -1,3 +1,116 @@
+"""
+Tests for the review app.
+These tests ensure product rating summaries follow review writes.
+"""
+from io import StringIO
 
-# Tests for the review app.
-# Add test cases here to ensure review logic works as expected.
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from brand.models import Brand
+from category.models import Category
+from product.models import Product
+from review.models import Review
+from user.models import User
+
+
+class ProductRatingSummaryTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Shirts", slug="shirts")
+        brand = Brand.objects.create(name="Acme", slug="acme")
+        self.product = Product.objects.create(
+            name="Shirt", slug="shirt", category=category, brand=brand,
+            description="Cotton", sku="SKU1", price="10.00",
+        )
+        self.user = User.objects.create_user(phone_number="+8801712345678", password="pass")
+
+    def summary(self):
+        self.product.refresh_from_db()
+        return self.product.rating_count, self.product.rating_average, self.product.rating_histogram
+
+    def test_only_published_reviews_are_counted(self):
+        review = Review.objects.create(product=self.product, user=self.user, rating=4, comment="ok")
+        self.assertEqual(self.summary()[0], 0)
+
+        review.status = "published"
+        review.save()
+        Review.objects.create(product=self.product, user=self.user, rating=2, comment="meh", status="published")
+        count, average, histogram = self.summary()
+        self.assertEqual(count, 2)
+        self.assertEqual(average, 3.0)
+        self.assertEqual(histogram, {1: 0, 2: 1, 3: 0, 4: 1, 5: 0})
+
+    def test_rating_change_unpublish_and_delete(self):
+        review = Review.objects.create(product=self.product, user=self.user, rating=5, comment="great", status="published")
+
+        review = Review.objects.get(pk=review.pk)
+        review.rating = 3
+        review.save()
+        self.assertEqual(self.summary()[:2], (1, 3.0))
+
+        review.status = "pending"
+        review.save()
+        self.assertEqual(self.summary()[:2], (0, 0.0))
+
+        review.status = "published"
+        review.save()
+        Review.objects.get(pk=review.pk).delete()
+        count, average, histogram = self.summary()
+        self.assertEqual((count, average), (0, 0.0))
+        self.assertEqual(sum(histogram.values()), 0)
+
+    def test_status_update_endpoint_updates_summary(self):
+        admin = User.objects.create_superuser(phone_number="+8801812345678", password="pass")
+        review = Review.objects.create(product=self.product, user=self.user, rating=4, comment="ok")
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.patch(f"/reviews/{review.pk}/", {"status": "published"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.summary()[:2], (1, 4.0))
+
+    def test_rebuild_command(self):
+        Review.objects.create(product=self.product, user=self.user, rating=5, comment="a", status="published")
+        Review.objects.create(product=self.product, user=self.user, rating=4, comment="b", status="published")
+        Product.objects.filter(pk=self.product.pk).update(rating_count=0, rating_sum=0, rating_average=0, rating_5=0)
+
+        call_command("rebuild_product_ratings", stdout=StringIO())
+        count, average, histogram = self.summary()
+        self.assertEqual((count, average), (2, 4.5))
+        self.assertEqual(histogram[5], 1)
+
+
+class ProductReviewFeedTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Shirts", slug="shirts")
+        brand = Brand.objects.create(name="Acme", slug="acme")
+        self.product = Product.objects.create(
+            name="Shirt", slug="shirt", category=category, brand=brand,
+            description="Cotton", sku="SKU1", price="10.00",
+        )
+        user = User.objects.create_user(phone_number="+8801712345678", password="pass")
+        for idx in range(12):
+            Review.objects.create(product=self.product, user=user, rating=5, comment=f"r{idx}", status="published")
+        Review.objects.create(product=self.product, user=user, rating=1, comment="hidden")
+        self.client = APIClient()
+
+    def test_feed_is_published_only_and_cursor_paginated(self):
+        response = self.client.get(f"/products/{self.product.pk}/reviews/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertNotIn("count", response.data)
+
+        response = self.client.get(response.data["next"])
+        comments = [review["comment"] for review in response.data["results"]]
+        self.assertEqual(comments, ["r1", "r0"])
+
+    def test_product_detail_embeds_latest_reviews_only(self):
+        response = self.client.get(f"/products/{self.product.pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["reviews"]), 5)
+        self.assertEqual(response.data["reviews"][0]["comment"], "r11")
+        self.assertEqual(response.data["rating_count"], 12)
+
+    def test_unknown_product_returns_404(self):
+        response = self.client.get("/products/999/reviews/")
+        self.assertEqual(response.status_code, 404)
@@ -4,9 +4,10 @@ Routes for review and review status endpoints.
 """
 from django.urls import path
 
-from .views import ReviewAPIView
+from .views import ReviewAPIView, ProductReviewListView
 
 urlpatterns = [
     path("reviews/", ReviewAPIView.as_view(), name="review-list"),
     path("reviews/<int:pk>/", ReviewAPIView.as_view(), name="review-detail"),
+    path("products/<int:product_id>/reviews/", ProductReviewListView.as_view(), name="product-review-list"),
 ]
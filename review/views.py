@@ -3,9 +3,13 @@ Views for managing product reviews, including listing, updating, and status chan
 """
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, permissions
+from rest_framework import generics, status, permissions
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
+from config.pagination import CreatedAtCursorPagination
+from product.models import Product
+from product.serializers import ReviewTobeIncludedInProductSerializer
 from .models import Review
 from .serializers import ReviewSerializer
 
@@ -88,3 +92,19 @@ class ReviewStatusUpdateAPIView(APIView):
         review.status = status_value
         review.save()
         return Response({"status": review.status})
+
+
+
+class ProductReviewListView(generics.ListAPIView):
+    """
+    Cursor-paginated feed of published reviews for one product (public), newest first.
+    """
+    serializer_class = ReviewTobeIncludedInProductSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = CreatedAtCursorPagination
+
+    def get_queryset(self):
+        product_id = self.kwargs["product_id"]
+        if not Product.objects.filter(pk=product_id, is_active=True).exists():
+            raise Http404
+        return Review.objects.filter(product_id=product_id, status="published").select_related("user__profile")
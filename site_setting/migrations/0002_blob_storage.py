@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:05
+
+import media_assets.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('site_setting', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sitesetting',
+            name='dark_logo',
+            field=models.ImageField(storage=media_assets.storage.get_blob_storage, upload_to='logos/dark/'),
+        ),
+        migrations.AlterField(
+            model_name='sitesetting',
+            name='favicon',
+            field=models.ImageField(storage=media_assets.storage.get_blob_storage, upload_to='favicons/'),
+        ),
+        migrations.AlterField(
+            model_name='sitesetting',
+            name='white_logo',
+            field=models.ImageField(storage=media_assets.storage.get_blob_storage, upload_to='logos/white/'),
+        ),
+    ]
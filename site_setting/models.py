@@ -1,5 +1,6 @@
 
 from django.db import models
+from media_assets.storage import get_blob_storage
 
 
 class SiteSetting(models.Model):
@@ -7,9 +8,10 @@ class SiteSetting(models.Model):
     Model for storing site-wide settings such as logos and status.
     """
     site_name = models.CharField(max_length=255)
-    white_logo = models.ImageField(upload_to='logos/white/')
-    dark_logo = models.ImageField(upload_to='logos/dark/')
-    favicon = models.ImageField(upload_to='favicons/')
+    # Stored content-addressed, so re-uploaded logos share one file.
+    white_logo = models.ImageField(upload_to='logos/white/', storage=get_blob_storage)
+    dark_logo = models.ImageField(upload_to='logos/dark/', storage=get_blob_storage)
+    favicon = models.ImageField(upload_to='favicons/', storage=get_blob_storage)
     status = models.BooleanField(default=True)
 
     def __str__(self):
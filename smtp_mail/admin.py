@@ -1,8 +1,16 @@
 
 from django.contrib import admin
-from .models import SMTPMail
+from .models import OutboundEmail, SMTPMail
 
 @admin.register(SMTPMail)
 class SMTPMailAdmin(admin.ModelAdmin):
-	list_display = ("host", "username", "is_active")
-	search_fields = ("host", "username")
\ No newline at end of file
+	list_display = ("host", "port", "username", "is_active")
+	search_fields = ("host", "username")
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+	list_display = ("subject", "status", "attempts", "created_at", "sent_at")
+	list_filter = ("status",)
+	search_fields = ("subject", "to")
+	readonly_fields = ("attempts", "last_error", "created_at", "sent_at")
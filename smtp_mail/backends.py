@@ -0,0 +1,50 @@
+"""
+Email backend that queues messages in the database instead of sending them.
+
+Request handlers (Djoser password reset, order notifications, ...) only pay
+for one INSERT; the `send_queued_mail` command delivers the outbox over SMTP.
+"""
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .models import OutboundEmail
+
+
+def outbound_email_from_message(message):
+    """
+    Build an unsaved OutboundEmail from an EmailMessage/EmailMultiAlternatives.
+    """
+    if message.attachments:
+        raise ValueError("OutboxEmailBackend does not support attachments.")
+    html_body = ""
+    for content, mimetype in getattr(message, "alternatives", []):
+        if mimetype == "text/html":
+            html_body = content
+    from_email = message.from_email
+    if from_email == settings.DEFAULT_FROM_EMAIL:
+        from_email = ""
+    return OutboundEmail(
+        subject=message.subject,
+        body=message.body,
+        html_body=html_body,
+        from_email=from_email,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+    )
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        outbound = [outbound_email_from_message(message) for message in email_messages if message.recipients()]
+        if not outbound:
+            return 0
+        try:
+            OutboundEmail.objects.bulk_create(outbound)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(outbound)
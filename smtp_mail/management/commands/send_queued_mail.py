@@ -0,0 +1,33 @@
+"""
+Deliver queued outbound email.
+
+Run it from cron (`send_queued_mail`) or as a long-lived worker
+(`send_queued_mail --loop`).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from smtp_mail.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Send queued emails from the outbox in batches over one SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--loop", action="store_true", help="Keep polling the outbox.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver_batch(options["batch_size"])
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < options["batch_size"]:
+                # Outbox drained (failures are rescheduled, not retried immediately).
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Sent {total_sent} emails, {total_failed} failed."))
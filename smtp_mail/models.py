@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 
@@ -17,6 +18,7 @@ class SMTPMail(models.Model):
 
     mailer = models.CharField(max_length=50, choices=MAILER_CHOICES)
     host = models.CharField(max_length=255)
+    port = models.PositiveIntegerField(default=587)
     username = models.CharField(max_length=255)
     password = models.CharField(max_length=255)
     encryption = models.CharField(max_length=50, choices=[('ssl', 'SSL'), ('tls', 'TLS'), ('none', 'None')], default='none')
@@ -29,3 +31,55 @@ class SMTPMail(models.Model):
         Returns a string representation of the SMTP mail configuration.
         """
         return f"{self.mailer} - {self.from_address}"
+
+    @classmethod
+    def get_active(cls):
+        """
+        Returns the most recently added active configuration, or None.
+        """
+        return cls.objects.filter(is_active=True).order_by("-id").first()
+
+    @property
+    def from_email(self):
+        return f"{self.from_name} <{self.from_address}>" if self.from_name else self.from_address
+
+
+class OutboundEmail(models.Model):
+    """
+    An email waiting in (or sent from) the outbox. Rows are written by
+    `smtp_mail.backends.OutboxEmailBackend` and delivered by the
+    `send_queued_mail` management command.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=998)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    # Blank means "use the active SMTPMail sender" at delivery time.
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            # The worker polls for due rows by status and time.
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
@@ -0,0 +1,124 @@
+"""
+Delivery side of the email outbox.
+
+`deliver_batch()` claims due OutboundEmail rows, sends them over a single
+SMTP connection configured from the active SMTPMail row (falling back to
+the EMAIL_* settings), and reschedules failures with exponential backoff.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail, SMTPMail
+
+
+def get_delivery_connection(config=None):
+    """
+    Open-on-demand SMTP connection for the active SMTPMail configuration.
+    """
+    backend = getattr(settings, "OUTBOX_DELIVERY_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+    if config is None:
+        return get_connection(backend, fail_silently=False)
+    return get_connection(
+        backend,
+        fail_silently=False,
+        host=config.host,
+        port=config.port,
+        username=config.username,
+        password=config.password,
+        use_tls=config.encryption == "tls",
+        use_ssl=config.encryption == "ssl",
+        timeout=getattr(settings, "EMAIL_TIMEOUT", None) or 30,
+    )
+
+
+def build_message(email, default_from, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or default_from,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def claim_batch(batch_size):
+    """
+    Mark up to `batch_size` due emails as sending and return them. The claim
+    is a lease: rows left in "sending" by a crashed worker become due again
+    once OUTBOX_LEASE seconds have passed.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, "OUTBOX_LEASE", 600))
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status__in=("queued", "sending"), next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            status="sending", next_attempt_at=now + lease
+        )
+    return emails
+
+
+def retry_delay(attempts):
+    base = getattr(settings, "OUTBOX_RETRY_BACKOFF", 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 6 * 60 * 60))
+
+
+def deliver_batch(batch_size=100, config=None):
+    """
+    Send one batch from the outbox. Returns (sent, failed) counts; failed
+    emails are retried later until OUTBOX_MAX_ATTEMPTS is reached.
+    `config` overrides the active SMTPMail row.
+    """
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+
+    config = config or SMTPMail.get_active()
+    default_from = config.from_email if config else settings.DEFAULT_FROM_EMAIL
+    max_attempts = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 5)
+    connection = get_delivery_connection(config)
+    sent, failed = [], []
+    try:
+        for email in emails:
+            email.attempts += 1
+            try:
+                # Keep one connection open for the batch; an unopened backend
+                # would connect and disconnect around every message.
+                if getattr(connection, "connection", True) is None:
+                    connection.open()
+                connection.send_messages([build_message(email, default_from, connection)])
+            except Exception as exc:
+                email.last_error = f"{type(exc).__name__}: {exc}"
+                if email.attempts >= max_attempts:
+                    email.status = "failed"
+                else:
+                    email.status = "queued"
+                    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+                failed.append(email)
+                # Drop the (possibly broken) connection; the next email reopens it.
+                connection.close()
+            else:
+                email.status = "sent"
+                email.sent_at = timezone.now()
+                email.last_error = ""
+                sent.append(email)
+    finally:
+        connection.close()
+        OutboundEmail.objects.bulk_update(
+            sent + failed, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"]
+        )
+    return len(sent), len(failed)
@@ -0,0 +1,91 @@
+"""
+A minimal in-process SMTP server for tests and local benchmarks.
+
+    with LocalSMTPServer() as server:
+        SMTPMail.objects.create(host=server.host, port=server.port, ...)
+        call_command("send_queued_mail")
+        server.messages  # [(mail_from, rcpt_tos, raw_bytes), ...]
+
+It speaks just enough plain SMTP (no TLS/AUTH) for smtplib. Set
+`fail_next` to reject the next N messages with a 451 reply.
+"""
+import socketserver
+import threading
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server.owner
+        self.reply("220 localhost ESMTP test server")
+        mail_from, rcpt_tos = None, []
+        for raw in self.rfile:
+            command = raw.decode("utf-8", "replace").strip()
+            verb = command[:4].upper()
+            if verb == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif verb == "HELO":
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                mail_from, rcpt_tos = command.split(":", 1)[1].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                rcpt_tos.append(command.split(":", 1)[1].strip())
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                for data_line in self.rfile:
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                with server.lock:
+                    if server.fail_next:
+                        server.fail_next -= 1
+                        self.reply("451 Temporary failure")
+                        continue
+                    server.messages.append((mail_from, rcpt_tos, b"".join(lines)))
+                self.reply("250 OK")
+            elif verb == "RSET":
+                mail_from, rcpt_tos = None, []
+                self.reply("250 OK")
+            elif verb == "NOOP":
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalSMTPServer:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.messages = []
+        self.fail_next = 0
+        self.lock = threading.Lock()
+        self._server = _ThreadingServer((host, port), _SMTPHandler)
+        self._server.owner = self
+        self.host, self.port = self._server.server_address[:2]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -1,3 +1,70 @@
+"""
+Tests for the smtp_mail app.
+These tests cover queueing email in the outbox and delivering it over SMTP.
+"""
+from io import StringIO
 
-# Tests for the SMTPMail app.
-# Add test cases here to ensure SMTP mail logic works as expected.
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from smtp_mail.models import OutboundEmail, SMTPMail
+from smtp_mail.testing import LocalSMTPServer
+from user.models import User
+
+
+@override_settings(EMAIL_BACKEND="smtp_mail.backends.OutboxEmailBackend")
+class OutboxTest(TestCase):
+    def setUp(self):
+        self.server = LocalSMTPServer().start()
+        self.addCleanup(self.server.stop)
+        SMTPMail.objects.create(
+            mailer="smtp", host=self.server.host, port=self.server.port, username="", password="",
+            from_address="shop@example.com", from_name="Shundor",
+        )
+
+    def test_send_mail_only_enqueues(self):
+        mail.send_mail("Hello", "Body", None, ["a@example.com"], html_message="<p>Body</p>")
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, "queued")
+        self.assertEqual(email.html_body, "<p>Body</p>")
+        self.assertEqual(self.server.messages, [])
+
+    def test_worker_sends_batch_with_active_sender(self):
+        for idx in range(3):
+            mail.send_mail(f"Hello {idx}", "Body", None, [f"user{idx}@example.com"])
+        call_command("send_queued_mail", stdout=StringIO())
+
+        self.assertEqual(len(self.server.messages), 3)
+        mail_from, rcpt_tos, raw = self.server.messages[0]
+        self.assertIn("shop@example.com", mail_from)
+        self.assertIn(b"From: Shundor <shop@example.com>", raw)
+        self.assertEqual(OutboundEmail.objects.filter(status="sent").count(), 3)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_BACKOFF=0)
+    def test_failures_are_retried_then_given_up(self):
+        mail.send_mail("Hello", "Body", None, ["a@example.com"])
+        self.server.fail_next = 1
+        call_command("send_queued_mail", stdout=StringIO())
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), ("queued", 1))
+        self.assertIn("451", email.last_error)
+
+        call_command("send_queued_mail", stdout=StringIO())
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ("sent", 2))
+
+        mail.send_mail("Again", "Body", None, ["b@example.com"])
+        self.server.fail_next = 2
+        call_command("send_queued_mail", stdout=StringIO())
+        call_command("send_queued_mail", stdout=StringIO())
+        self.assertEqual(OutboundEmail.objects.get(subject="Again").status, "failed")
+
+    def test_password_reset_is_queued(self):
+        cache.clear()  # rate limit buckets
+        User.objects.create_user(phone_number="+8801712345678", email="a@example.com", password="pass")
+        response = APIClient().post("/auth/users/reset_password/", {"email": "a@example.com"}, format="json")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(list(OutboundEmail.objects.values_list("to", flat=True)), [["a@example.com"]])